@@ -0,0 +1,132 @@
+"""Compare request throughput while render threads write progress, old vs pooled SQLite.
+
+Run from apps/api:
+
+    python -m benchmarks.db_concurrency --seconds 5 --renderers 4 --clients 8
+
+"legacy" opens a fresh rollback-journal connection per call, as db.get_connection
+used to; "pooled" is the current per-thread WAL connection. Each mode gets its own
+temporary database, driven through the real services.projects functions.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import db
+from migrations import migrate
+from services import projects
+
+
+def legacy_connection(db_path: str | None = None) -> sqlite3.Connection:
+    resolved_path = db_path or os.getenv("KINO_DB_PATH", "data/kinopro.db")
+    path = Path(resolved_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(mode: str, args: argparse.Namespace, workdir: str) -> dict:
+    os.environ["KINO_DB_PATH"] = str(Path(workdir) / f"{mode}.db")
+    projects.get_connection = legacy_connection if mode == "legacy" else db.get_connection
+    if mode == "legacy":
+        # Keep this file in rollback-journal mode; db.get_connection would switch it to WAL.
+        migrate(legacy_connection())
+
+    project_ids = [
+        projects.create_project(f"Film {idx}", None, None, 0, None).id
+        for idx in range(args.projects)
+    ]
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies: list[float] = []
+    writes = [0]
+    errors = [0]
+
+    def render(project_id: str) -> None:
+        progress = 20
+        while not stop.is_set():
+            try:
+                projects.update_project(project_id, progress=progress)
+                with lock:
+                    writes[0] += 1
+            except sqlite3.OperationalError:
+                with lock:
+                    errors[0] += 1
+            progress = 20 + (progress - 19) % 70
+            time.sleep(args.write_interval)
+
+    def client(offset: int) -> None:
+        idx = offset
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                projects.get_project(project_ids[idx % len(project_ids)])
+                projects.list_projects()
+            except sqlite3.OperationalError:
+                with lock:
+                    errors[0] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+            idx += 1
+
+    threads = [
+        threading.Thread(target=render, args=(project_ids[idx % len(project_ids)],))
+        for idx in range(args.renderers)
+    ] + [threading.Thread(target=client, args=(idx,)) for idx in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "requests_per_second": len(latencies) / args.seconds,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "writes_per_second": writes[0] / args.seconds,
+        "errors": errors[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--renderers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--write-interval", type=float, default=0.005)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {mode: run(mode, args, workdir) for mode in ("legacy", "pooled")}
+
+    for mode, result in results.items():
+        print(
+            f"{mode:>7}: {result['requests_per_second']:.0f} req/s "
+            f"(p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms), "
+            f"{result['writes_per_second']:.0f} progress writes/s, errors={result['errors']}"
+        )
+    legacy, pooled = results["legacy"], results["pooled"]
+    if legacy["requests_per_second"]:
+        print(f"throughput: {pooled['requests_per_second'] / legacy['requests_per_second']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measure per-request database overhead with and without per-call schema checks.
+
+Run from apps/api:
+
+    python -m benchmarks.db_request_overhead --requests 5000
+
+A "request" is what an authenticated project read does against SQLite: look up the
+user row, then fetch the project. "per-call DDL" replays the old ensure_users_table /
+ensure_projects_table work (CREATE TABLE IF NOT EXISTS, PRAGMA table_info and the
+column checks) before each of those queries, as every service call used to.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import db
+import migrations
+from services import projects
+
+
+def _old_schema_checks(conn) -> None:
+    with conn:
+        migrations._create_projects_and_users(conn)
+
+
+def run(requests: int, project_id: str, per_call_ddl: bool) -> float:
+    conn = db.get_connection()
+    started = time.perf_counter()
+    for _ in range(requests):
+        if per_call_ddl:
+            _old_schema_checks(conn)
+        with conn:
+            conn.execute(
+                "SELECT username, password_hash, salt FROM users WHERE username = ?",
+                ("demouser",),
+            ).fetchone()
+        if per_call_ddl:
+            _old_schema_checks(conn)
+        projects.get_project(project_id)
+    return (time.perf_counter() - started) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["KINO_DB_PATH"] = str(Path(workdir) / "overhead.db")
+        db.init_db()
+        project_id = projects.create_project("Film", None, None, 0, None).id
+        timings = {
+            label: min(run(args.requests, project_id, per_call_ddl) for _ in range(args.repeat))
+            for label, per_call_ddl in (("per-call DDL", True), ("migrated once", False))
+        }
+
+    for label, seconds in timings.items():
+        print(f"{label:>13}: {seconds * 1_000_000:.1f} us per request")
+    print(f"overhead removed: {timings['per-call DDL'] / timings['migrated once']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
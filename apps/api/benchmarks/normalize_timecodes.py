@@ -0,0 +1,99 @@
+"""Compare per-scene and columnar timecode normalization on a synthetic payload.
+
+Run from apps/api:
+
+    python -m benchmarks.normalize_timecodes --scenes 20000
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import time
+
+from services.normalization import normalize_payload_timecodes, normalize_poster_timestamps, normalize_scene
+
+
+def _random_timecode(rng: random.Random) -> str:
+    hours, minutes = rng.randint(0, 2), rng.randint(0, 70)
+    seconds, frames = rng.randint(0, 70), rng.randint(0, 30)
+    roll = rng.random()
+    if roll < 0.6:
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{frames:02d}"
+    if roll < 0.75:
+        return f"{minutes:02d}:{seconds:02d}:{frames:02d}"
+    if roll < 0.85:
+        return f"{minutes:02d}:{seconds:02d}.{frames:02d}"
+    if roll < 0.9:
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}:{frames:02d}"
+    if roll < 0.95:
+        return f"{seconds}.{frames}"
+    return rng.choice(["", "n/a", "00:00:01."])
+
+
+def build_payload(scene_count: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    boards = []
+    per_board = 25
+    for board_idx in range(max(1, scene_count // per_board)):
+        scenes = [
+            {
+                "scene_number": scene_idx,
+                "start_tc": _random_timecode(rng),
+                "end_tc": _random_timecode(rng),
+                "thumbnail_tc": _random_timecode(rng),
+                "duration_seconds": 2.0,
+            }
+            for scene_idx in range(1, per_board + 1)
+        ]
+        boards.append({"name": f"Board {board_idx + 1}", "scenes": scenes})
+    posters = [{"timestamp": _random_timecode(rng)} for _ in range(max(20, scene_count // 50))]
+    return {"storyboards": boards, "poster_candidates": posters}
+
+
+def _per_scene(payload: dict, duration_seconds: float, fps: int) -> tuple[dict, int]:
+    repaired = 0
+    for board in payload["storyboards"]:
+        for scene in board["scenes"]:
+            if normalize_scene(scene, duration_seconds, fps):
+                repaired += 1
+    repaired += normalize_poster_timestamps(payload, duration_seconds, fps)
+    return payload, repaired
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, default=12000)
+    parser.add_argument("--duration", type=float, default=5400.0)
+    parser.add_argument("--fps", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    source = build_payload(args.scenes)
+    scene_count = sum(len(board["scenes"]) for board in source["storyboards"])
+    for duration in (args.duration, 1800.0, 0.0):
+        timings: dict[str, float] = {}
+        results: dict[str, tuple[dict, int]] = {}
+        for name, func in (("per-scene", _per_scene), ("columnar", normalize_payload_timecodes)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                payload = copy.deepcopy(source)
+                started = time.perf_counter()
+                results[name] = func(payload, duration, args.fps)
+                best = min(best, time.perf_counter() - started)
+            timings[name] = best
+
+        identical = results["per-scene"] == results["columnar"]
+        print(
+            f"{scene_count} scenes, duration={duration:.0f}s, fps={args.fps}: "
+            f"per-scene {timings['per-scene'] * 1000:.1f} ms, "
+            f"columnar {timings['columnar'] * 1000:.1f} ms "
+            f"({timings['per-scene'] / timings['columnar']:.1f}x), "
+            f"repaired={results['columnar'][1]}, identical={identical}"
+        )
+        if not identical:
+            raise SystemExit("columnar normalization diverged from the per-scene path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Time repeated project detail reads with and without the parsed-payload cache.
+
+Run from apps/api:
+
+    python -m benchmarks.project_detail_reads --boards 5 --scenes 40 --reads 500
+
+"uncached" rebuilds the response as before: parse the storyboards and poster JSON,
+validate them through the Project model and serialize. "cached" is the current
+GET /projects/{id} path, which serves an unchanged project from its stored bytes.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from starlette.requests import Request
+
+from benchmarks.normalize_timecodes import build_payload
+from routes.storyboards import _project_to_model, get_project_detail
+from services import projects
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--boards", type=int, default=5)
+    parser.add_argument("--scenes", type=int, default=40)
+    parser.add_argument("--reads", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["KINO_DB_PATH"] = str(Path(workdir) / "detail.db")
+        project_id = projects.create_project("Film", None, "film.mp4", 5400, None).id
+        payload = build_payload(args.boards * 25)
+        for board in payload["storyboards"]:
+            board.update(target_length="60s", tone="tense", description="A board.")
+            for scene in board["scenes"]:
+                scene.update(description="A scene.", emotional_beat="calm", music_idea="strings")
+            board["scenes"] = (board["scenes"] * (args.scenes // 25 + 1))[: args.scenes]
+        projects.set_storyboards(project_id, payload)
+        candidates = [
+            {"id": f"poster_{idx:02d}", "timestamp": entry["timestamp"]}
+            for idx, entry in enumerate(payload.pop("poster_candidates"), start=1)
+        ]
+        projects.set_poster_candidates(project_id, candidates)
+        projects.update_project(project_id, status="ready", progress=100)
+
+        started = time.perf_counter()
+        for _ in range(args.reads):
+            record = projects.get_project(project_id)
+            uncached = _project_to_model(record, True).model_dump_json().encode("utf-8")
+        uncached_seconds = (time.perf_counter() - started) / args.reads
+
+        request = Request({"type": "http", "method": "GET", "headers": []})
+        started = time.perf_counter()
+        for _ in range(args.reads):
+            cached = get_project_detail(project_id, request, True, "benchmark").body
+        cached_seconds = (time.perf_counter() - started) / args.reads
+
+    scene_count = args.boards * args.scenes
+    print(f"{scene_count} scenes, {len(cached)} byte response, identical={cached == uncached}")
+    print(f"uncached: {uncached_seconds * 1000:.2f} ms per read")
+    print(f"  cached: {cached_seconds * 1000:.2f} ms per read ({uncached_seconds / cached_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
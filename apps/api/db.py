@@ -1,12 +1,60 @@
 import os
 import sqlite3
+import threading
 from pathlib import Path
 
+from migrations import migrate
+
+# One connection per thread and database file, reused for the life of the thread.
+# Request handlers, render workers and the Gemini pipeline each get their own, so
+# nothing is shared across threads and sqlite3's same-thread check stays on.
+_local = threading.local()
+# Databases already brought up to date in this process.
+_migrated: set[str] = set()
+_migrate_lock = threading.Lock()
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _configure(conn: sqlite3.Connection) -> None:
+    # WAL lets readers proceed while a render thread is writing progress.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={max(0, _int_env('KINO_DB_BUSY_TIMEOUT_MS', 5000))}")
+    conn.execute(f"PRAGMA mmap_size={max(0, _int_env('KINO_DB_MMAP_MB', 64)) * 1024 * 1024}")
+    conn.execute(f"PRAGMA cache_size=-{max(0, _int_env('KINO_DB_CACHE_MB', 16)) * 1024}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
 
 def get_connection(db_path: str | None = None) -> sqlite3.Connection:
     resolved_path = db_path or os.getenv("KINO_DB_PATH", "data/kinopro.db")
+    connections: dict[str, sqlite3.Connection] | None = getattr(_local, "connections", None)
+    if connections is None:
+        connections = {}
+        _local.connections = connections
+    conn = connections.get(resolved_path)
+    if conn is not None:
+        return conn
+
     path = Path(resolved_path)
     path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(path))
+    conn = sqlite3.connect(str(path), timeout=_int_env("KINO_DB_BUSY_TIMEOUT_MS", 5000) / 1000)
     conn.row_factory = sqlite3.Row
+    _configure(conn)
+    if resolved_path not in _migrated:
+        with _migrate_lock:
+            if resolved_path not in _migrated:
+                migrate(conn)
+                _migrated.add(resolved_path)
+    connections[resolved_path] = conn
     return conn
+
+
+def init_db(db_path: str | None = None) -> None:
+    """Apply pending migrations; called once at startup."""
+    get_connection(db_path)
@@ -1,13 +1,17 @@
 import os
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from routes.auth import router as auth_router
+from db import init_db
+from routes.auth import require_basic_auth, router as auth_router
 from routes.storyboards import router as storyboard_router
 from routes.uploads import router as uploads_router
+from services import metrics
 from services.auth import create_user, user_exists
+from services.generation_cache import move_legacy_cache
+from services.sources import move_legacy_store
 from services.storage import get_storage_root
 
 app = FastAPI(title="KinoPro API", version="0.1.0")
@@ -21,6 +25,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Upload-Offset"],
 )
 
 app.include_router(storyboard_router, prefix="/v1")
@@ -30,6 +35,17 @@ app.include_router(uploads_router, prefix="/v1")
 app.mount("/media", StaticFiles(directory=str(get_storage_root())), name="media")
 
 
+@app.on_event("startup")
+def run_migrations() -> None:
+    init_db()
+
+
+@app.on_event("startup")
+def move_shared_files() -> None:
+    move_legacy_store()
+    move_legacy_cache()
+
+
 @app.on_event("startup")
 def ensure_demo_user() -> None:
     if not user_exists("demouser"):
@@ -39,3 +55,8 @@ def ensure_demo_user() -> None:
 @app.get("/health")
 def health_check() -> dict:
     return {"status": "ok"}
+
+
+@app.get("/metrics")
+def metrics_snapshot(_: str = Depends(require_basic_auth)) -> dict:
+    return metrics.snapshot()
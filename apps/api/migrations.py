@@ -0,0 +1,410 @@
+import json
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+# Schema changes, applied in order and recorded in PRAGMA user_version. Append new
+# steps; never edit one that has shipped. Databases created before versioning
+# (user_version 0) may already have some of these tables, hence IF NOT EXISTS and
+# the column checks in the first step.
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _create_projects_and_users(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS projects (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT,
+            video_filename TEXT,
+            duration_seconds REAL DEFAULT 0,
+            poster_url TEXT,
+            status TEXT NOT NULL,
+            progress INTEGER NOT NULL DEFAULT 0,
+            error_message TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            processing_started_at TEXT,
+            processing_estimate_seconds INTEGER,
+            storyboards_json TEXT,
+            storyboards_count INTEGER DEFAULT 0,
+            frames_count INTEGER DEFAULT 0,
+            poster_candidates_json TEXT,
+            poster_outputs_json TEXT,
+            source_hash TEXT,
+            queue_position INTEGER
+        )
+        """
+    )
+    columns = _columns(conn, "projects")
+    for name, kind in (
+        ("error_message", "TEXT"),
+        ("poster_candidates_json", "TEXT"),
+        ("poster_outputs_json", "TEXT"),
+        ("source_hash", "TEXT"),
+        ("queue_position", "INTEGER"),
+    ):
+        if name not in columns:
+            conn.execute(f"ALTER TABLE projects ADD COLUMN {name} {kind}")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password_hash TEXT NOT NULL,
+            salt TEXT NOT NULL
+        )
+        """
+    )
+
+
+def _create_generation_cache(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS generation_cache (
+            cache_key TEXT PRIMARY KEY,
+            source_hash TEXT NOT NULL,
+            prompt_hash TEXT NOT NULL,
+            schema_version TEXT NOT NULL,
+            model TEXT NOT NULL,
+            temperature REAL NOT NULL,
+            payload_json TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_generation_cache_source ON generation_cache (source_hash)"
+    )
+
+
+def _create_film_indexes(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS film_indexes (
+            project_id TEXT PRIMARY KEY,
+            source_hash TEXT,
+            prompt_hash TEXT NOT NULL,
+            schema_version TEXT NOT NULL,
+            model TEXT NOT NULL,
+            shots_count INTEGER NOT NULL DEFAULT 0,
+            shot_log_json TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_film_indexes_source ON film_indexes (source_hash)"
+    )
+
+
+def _create_keyframe_indexes(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS keyframe_indexes (
+            project_id TEXT PRIMARY KEY,
+            keyframe_count INTEGER NOT NULL,
+            gop_seconds REAL NOT NULL,
+            keyframes BLOB NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+
+
+def _create_media_info(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS media_info (
+            project_id TEXT PRIMARY KEY,
+            duration_seconds REAL NOT NULL,
+            fps REAL NOT NULL,
+            timecode_fps INTEGER NOT NULL,
+            width INTEGER,
+            height INTEGER,
+            video_codec TEXT,
+            audio_codec TEXT,
+            info_json TEXT NOT NULL,
+            probed_at TEXT NOT NULL
+        )
+        """
+    )
+
+
+# Migration 6 moves storyboard documents into rows. What follows is a frozen copy of
+# how the services read and wrote those documents when it shipped; keep it as it is
+# even if services/projects.py or services/storyboard_store.py change.
+_V6_BOARD_COLUMNS: dict[str, type] = {
+    "name": str,
+    "target_length": str,
+    "tone": str,
+    "description": str,
+}
+
+_V6_SCENE_COLUMNS: dict[str, type] = {
+    "scene_number": int,
+    "start_tc": str,
+    "end_tc": str,
+    "duration_seconds": float,
+    "thumbnail_tc": str,
+    "description": str,
+    "emotional_beat": str,
+    "music_idea": str,
+    "camera_move": str,
+    "shot_type": str,
+    "clip_url": str,
+    "thumbnail_url": str,
+}
+
+
+def _v6_storyboards_payload(payload: Any) -> dict | None:
+    if isinstance(payload, dict):
+        return payload
+    if isinstance(payload, list):
+        if (
+            len(payload) == 1
+            and isinstance(payload[0], dict)
+            and (
+                "storyboards" in payload[0]
+                or "movie_title" in payload[0]
+                or "poster_candidates" in payload[0]
+            )
+        ):
+            return payload[0]
+        return {"storyboards": payload}
+    return None
+
+
+def _v6_split(item: dict, columns: dict[str, type], skip: str | None = None) -> tuple[list[Any], str | None]:
+    values = [item.get(key) if type(item.get(key)) is kind else None for key, kind in columns.items()]
+    extra = {
+        key: value
+        for key, value in item.items()
+        if key != skip and (key not in columns or type(value) is not columns[key])
+    }
+    return values, json.dumps(extra) if extra else None
+
+
+def _v6_write_payload(conn: sqlite3.Connection, project_id: str, payload: dict) -> tuple[str, int, int]:
+    conn.execute("DELETE FROM scenes WHERE project_id = ?", (project_id,))
+    conn.execute("DELETE FROM storyboards WHERE project_id = ?", (project_id,))
+    header = dict(payload)
+    boards = header.get("storyboards")
+    if not isinstance(boards, list):
+        return json.dumps(header), 0, 0
+
+    header["storyboards"] = None
+    now = datetime.now(timezone.utc).isoformat()
+    boards = [board for board in boards if isinstance(board, dict)]
+    scenes_count = 0
+    for position, board in enumerate(boards, start=1):
+        board_id = f"sb_{uuid.uuid4().hex[:12]}"
+        raw_scenes = board.get("scenes")
+        values, extra = _v6_split(board, _V6_BOARD_COLUMNS, skip="scenes" if isinstance(raw_scenes, list) else None)
+        conn.execute(
+            """
+            INSERT INTO storyboards (id, project_id, position, name, target_length, tone, description, extra_json, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (board_id, project_id, position, *values, extra, now),
+        )
+        scenes = [scene for scene in raw_scenes if isinstance(scene, dict)] if isinstance(raw_scenes, list) else []
+        for scene_position, scene in enumerate(scenes, start=1):
+            values, extra = _v6_split(scene, _V6_SCENE_COLUMNS)
+            conn.execute(
+                """
+                INSERT INTO scenes (
+                    id, storyboard_id, project_id, position, scene_number, start_tc, end_tc,
+                    duration_seconds, thumbnail_tc, description, emotional_beat, music_idea,
+                    camera_move, shot_type, clip_url, thumbnail_url, extra_json
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (f"scn_{uuid.uuid4().hex[:12]}", board_id, project_id, scene_position, *values, extra),
+            )
+        scenes_count += len(scenes)
+    return json.dumps(header), len(boards), scenes_count
+
+
+def _create_storyboards_and_scenes(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS storyboards (
+            id TEXT PRIMARY KEY,
+            project_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            name TEXT,
+            target_length TEXT,
+            tone TEXT,
+            description TEXT,
+            extra_json TEXT,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_storyboards_project ON storyboards (project_id, position)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS scenes (
+            id TEXT PRIMARY KEY,
+            storyboard_id TEXT NOT NULL,
+            project_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            scene_number INTEGER,
+            start_tc TEXT,
+            end_tc TEXT,
+            duration_seconds REAL,
+            thumbnail_tc TEXT,
+            description TEXT,
+            emotional_beat TEXT,
+            music_idea TEXT,
+            camera_move TEXT,
+            shot_type TEXT,
+            clip_url TEXT,
+            thumbnail_url TEXT,
+            extra_json TEXT
+        )
+        """
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_scenes_storyboard ON scenes (storyboard_id, position)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scenes_project ON scenes (project_id)")
+
+    # Move existing storyboard documents into rows.
+    rows = conn.execute(
+        "SELECT id, storyboards_json FROM projects WHERE storyboards_json IS NOT NULL"
+    ).fetchall()
+    for project_id, raw in rows:
+        try:
+            payload = _v6_storyboards_payload(json.loads(raw))
+        except json.JSONDecodeError:
+            continue
+        if payload is None:
+            continue
+        header, boards_count, scenes_count = _v6_write_payload(conn, project_id, payload)
+        conn.execute(
+            "UPDATE projects SET storyboards_json = ?, storyboards_count = ?, frames_count = ? WHERE id = ?",
+            (header, boards_count, scenes_count, project_id),
+        )
+
+
+def _index_projects_by_update(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_projects_updated ON projects (updated_at DESC, id DESC)"
+    )
+
+
+def _create_upload_sessions(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS upload_sessions (
+            id TEXT PRIMARY KEY,
+            project_id TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            received_bytes INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_upload_sessions_project ON upload_sessions (project_id)")
+
+
+def _create_source_store(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sources (
+            source_hash TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS source_refs (
+            project_id TEXT PRIMARY KEY,
+            source_hash TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_source_refs_hash ON source_refs (source_hash)")
+
+
+def _create_exports(conn: sqlite3.Connection) -> None:
+    # Columns as in packages/db/schema.ts; the artifact's details live in payload.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS exports (
+            id TEXT PRIMARY KEY,
+            project_id TEXT NOT NULL,
+            format TEXT NOT NULL,
+            status TEXT NOT NULL,
+            payload TEXT,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_exports_project ON exports (project_id, format, created_at)")
+
+
+def _add_user_token_version(conn: sqlite3.Connection) -> None:
+    # Bumped on every password change; session tokens carry the value they were
+    # issued with, so older ones stop verifying.
+    if "token_version" not in _columns(conn, "users"):
+        conn.execute("ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0")
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "projects and users", _create_projects_and_users),
+    (2, "generation cache", _create_generation_cache),
+    (3, "film indexes", _create_film_indexes),
+    (4, "keyframe indexes", _create_keyframe_indexes),
+    (5, "media info", _create_media_info),
+    (6, "storyboard and scene rows", _create_storyboards_and_scenes),
+    (7, "projects listing index", _index_projects_by_update),
+    (8, "upload sessions", _create_upload_sessions),
+    (9, "content-addressed sources", _create_source_store),
+    (10, "exports", _create_exports),
+    (11, "user token versions", _add_user_token_version),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Bring the database up to SCHEMA_VERSION; returns how many steps ran."""
+    if schema_version(conn) >= SCHEMA_VERSION:
+        return 0
+    applied = 0
+    # IMMEDIATE takes the write lock up front, so two processes starting together
+    # cannot both apply the same step.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = schema_version(conn)
+        for version, name, step in MIGRATIONS:
+            if version <= current:
+                continue
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            print(f"[DB] Applied migration {version}: {name}")
+            applied += 1
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return applied
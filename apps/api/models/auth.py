@@ -9,3 +9,6 @@ class UserCreate(BaseModel):
 class AuthResponse(BaseModel):
     username: str
     status: str
+    token: str | None = None
+    token_type: str | None = None
+    expires_at: int | None = None
@@ -64,6 +64,7 @@ class Project(BaseModel):
     status: Literal["created", "uploading", "processing", "ready", "failed"]
     progress: int = Field(0, ge=0, le=100)
     error_message: str | None = None
+    queue_position: int | None = None
     storyboards: List[Storyboard] | None = None
     storyboards_count: int = 0
     frames_count: int = 0
@@ -77,6 +78,9 @@ class ExportRequest(BaseModel):
     project_id: str
     format: str
     frames: List[Scene] | None = None
+    # Video only: "source" or "clips", and the audio crossfade between scenes.
+    assembly: str | None = None
+    crossfade_seconds: float | None = Field(None, ge=0, le=5)
 
 
 class PosterWallResponse(BaseModel):
@@ -85,6 +89,10 @@ class PosterWallResponse(BaseModel):
     posters: List[PosterGeneration]
 
 
+class StoryboardRegenerateRequest(BaseModel):
+    direction: str | None = None
+
+
 class PosterGenerateRequest(BaseModel):
     candidate_ids: List[str] = Field(default_factory=list)
     prompt: str | None = None
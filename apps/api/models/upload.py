@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str = Field(..., min_length=1)
+    size: int = Field(..., gt=0)
+
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    project_id: str
+    filename: str
+    size: int
+    offset: int
+    chunk_size: int
+    status: str
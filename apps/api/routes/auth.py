@@ -1,28 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBasic, HTTPBasicCredentials, HTTPBearer
 
 from models.auth import AuthResponse, UserCreate
-from services.auth import authenticate_user, create_user, user_exists
+from services.auth import (
+    authenticate_user_cached,
+    cached_user,
+    create_user,
+    issue_session_token,
+    user_exists,
+    verify_session_token,
+)
 
 router = APIRouter(tags=["auth"])
-security = HTTPBasic()
+security = HTTPBasic(auto_error=False)
+bearer = HTTPBearer(auto_error=False)
 
 # Clerk integration (commented for MVP).
 # from clerk_backend_api import Clerk
 # clerk_client = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
 
 
-def require_basic_auth(credentials: HTTPBasicCredentials = Depends(security)) -> str:
-    user = authenticate_user(credentials.username, credentials.password)
+def _unauthorized() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid credentials",
+        headers={"WWW-Authenticate": "Basic"},
+    )
+
+
+async def require_password(credentials: HTTPBasicCredentials | None = Depends(security)) -> str:
+    """Basic credentials only; a session token cannot stand in for the password."""
+    # Recently verified credentials are checked here on the event loop; only a cache
+    # miss pays for the PBKDF2 hash, in the threadpool.
+    if credentials is None:
+        raise _unauthorized()
+    username = cached_user(credentials.username, credentials.password)
+    if username is not None:
+        return username
+    user = await run_in_threadpool(authenticate_user_cached, credentials.username, credentials.password)
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid credentials",
-            headers={"WWW-Authenticate": "Basic"},
-        )
+        raise _unauthorized()
     return user.username
 
 
+async def require_basic_auth(
+    token: HTTPAuthorizationCredentials | None = Depends(bearer),
+    credentials: HTTPBasicCredentials | None = Depends(security),
+) -> str:
+    if token is not None:
+        username = verify_session_token(token.credentials)
+        if username is None:
+            raise _unauthorized()
+        return username
+    return await require_password(credentials)
+
+
 @router.post("/auth/register", response_model=AuthResponse)
 def register(payload: UserCreate) -> AuthResponse:
     if user_exists(payload.username):
@@ -32,5 +65,6 @@ def register(payload: UserCreate) -> AuthResponse:
 
 
 @router.post("/auth/login", response_model=AuthResponse)
-def login(username: str = Depends(require_basic_auth)) -> AuthResponse:
-    return AuthResponse(username=username, status="ok")
+def login(username: str = Depends(require_password)) -> AuthResponse:
+    token, expires_at = issue_session_token(username)
+    return AuthResponse(username=username, status="ok", token=token, token_type="bearer", expires_at=expires_at)
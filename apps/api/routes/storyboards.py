@@ -1,19 +1,21 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
 import json
 import os
+import re
 import shutil
 import subprocess
+import tempfile
 import time
-import zipfile
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Callable, Iterator
+from typing import AsyncIterator, Callable, Iterator
 from urllib.parse import urlparse
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
 
 from models.storyboard import (
     ExportRequest,
@@ -21,39 +23,133 @@ from models.storyboard import (
     PosterWallResponse,
     Project,
     ProjectCreate,
+    StoryboardRegenerateRequest,
     StoryboardResponse,
 )
 from routes.auth import require_basic_auth
+from services.archive import stream_zip
+from services.config import bool_env
+from services.contact_sheet import SheetEntry, contact_sheet_pdf
 from services.ffmpeg import (
     ClipRequest,
+    build_copy_clip_command,
     build_nvenc_clip_command,
     build_thumbnail_commands,
+    build_trailer_command,
     build_x264_clip_command,
-    probe_duration,
-    seconds_to_timecode,
-    timecode_to_seconds,
 )
-from services.gemini import generate_storyboards_from_file, upload_file_to_gemini
+from services.film_index import delete_film_index, get_film_index, save_film_index
+from services.gemini import (
+    generate_poster_candidates_from_shot_log,
+    generate_shot_log_from_file,
+    generate_storyboards_from_file,
+    generate_storyboards_from_shot_log,
+    generation_fingerprint,
+    generation_mode,
+    regenerate_storyboard_from_shot_log,
+    shot_log_fingerprint,
+    stream_storyboards_from_file,
+    upload_file_to_gemini,
+)
 from services.projects import (
+    clear_storyboards,
+    append_poster_outputs,
     compute_progress,
     create_project,
     delete_project,
     get_project,
+    get_projects_with_storyboards,
+    get_storyboard,
     list_projects,
+    list_storyboard_headers,
     parse_poster_candidates,
     parse_poster_outputs,
     parse_storyboards,
+    remove_poster_output,
+    replace_storyboard,
     set_poster_candidates,
-    set_poster_outputs,
     set_storyboards,
     update_project,
 )
-from services.storage import get_project_dir
+from services.generation_cache import (
+    GenerationKey,
+    build_generation_key,
+    generation_cache_enabled,
+    invalidate_generations,
+    load_cached_generation,
+    store_generation,
+)
+from services.governor import get_governor
+from services.progress import estimate_processing_seconds, get_progress_tracker
+from services.regenerations import RegenerationJob, get_regeneration_state, start_regeneration
+from services import events, project_cache
+from services.storage import HASH_CHUNK_SIZE, get_project_dir, hash_file
 from services.thumbnails import pick_sharpest
+from services.media_info import (
+    delete_media_info,
+    fallback_fps,
+    get_media_info,
+    load_or_probe_media_info,
+    save_media_info,
+)
+from services.keyframes import (
+    KeyframeIndex,
+    delete_keyframe_index,
+    get_keyframe_index,
+    load_or_build_keyframe_index,
+    save_keyframe_index,
+)
+from services.normalization import (
+    normalize_payload_timecodes,
+    normalize_poster_timestamps,
+    normalize_scene,
+    normalize_timestamps,
+    snap_payload_to_keyframes,
+    snap_scene_to_keyframes,
+)
+from services.timecode import Timecode
 from services.posters import generate_posters
+from services.uploads import (
+    begin_upload,
+    delete_project_sessions,
+    finish_upload,
+    safe_filename,
+    set_source_processor,
+)
+from services.exports import (
+    BACKGROUND_FORMATS,
+    STREAMED_FORMATS,
+    ExportArtifact,
+    ExportJob,
+    VideoAssembly,
+    asset_version,
+    delete_project_exports,
+    export_extension,
+    export_filename,
+    export_key,
+    find_export,
+    get_export_job,
+    get_export_state,
+    prebuild_formats,
+    record_export,
+    start_export_job,
+    video_assembly,
+)
+from services.ingest import UploadTee, ingest_tee_enabled
+from services.sources import (
+    adopt_source,
+    link_cached_render,
+    release_source,
+    render_key,
+    source_store_enabled,
+    store_render,
+)
 
 router = APIRouter(tags=["projects"])
 
+_keyframe_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="keyframes")
+_prebuild_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export-prebuild")
+
 
 def _media_url(project_id: str, relative_path: str) -> str:
     base = os.getenv("KINO_MEDIA_BASE_URL", "/media").rstrip("/")
@@ -61,179 +157,125 @@ def _media_url(project_id: str, relative_path: str) -> str:
     return f"{base}/{project_id}/{normalized}"
 
 
-def _estimate_processing_seconds(duration_seconds: float) -> int:
-    if duration_seconds <= 0:
-        return 720
-    # Includes Gemini upload/inference plus local FFmpeg rendering.
-    return int(max(480, min(2400, duration_seconds * 1.0)))
-
-
-def _bool_env(name: str, default: bool = False) -> bool:
-    raw = os.getenv(name)
-    if raw is None:
-        return default
-    return raw.strip().lower() in {"1", "true", "yes", "on"}
-
-
-def _render_workers() -> int:
-    cpu_count = os.cpu_count() or 1
-    default_workers = 2 if cpu_count >= 2 else 1
-    raw = os.getenv("KINO_RENDER_WORKERS")
-    if raw is None:
-        return default_workers
+def _keyframe_snap_tolerance() -> float | None:
+    if not bool_env("KINO_SNAP_TO_KEYFRAMES", default=False):
+        return None
     try:
-        return max(1, int(raw))
+        return max(0.0, float(os.getenv("KINO_KEYFRAME_TOLERANCE", "0.5")))
     except ValueError:
-        return default_workers
+        return 0.5
 
 
-def _safe_timecode_seconds(value: str | None, fps: int) -> float | None:
-    if not value:
-        return None
-    try:
-        return max(0.0, float(timecode_to_seconds(str(value), fps)))
-    except Exception:
-        return None
+def _media_profile(record, video_path: str | None) -> tuple[float, int]:
+    """Duration and timecode fps of a project's source, from its stored probe."""
+    info = load_or_probe_media_info(record.id, video_path)
+    if info is None:
+        return record.duration_seconds, fallback_fps()
+    duration_seconds = info.duration_seconds if info.duration_seconds > 0 else record.duration_seconds
+    return duration_seconds, info.timecode_fps
 
 
-def _mm_ss_ff_seconds(value: str | None, fps: int) -> float | None:
-    if not value:
+def _start_keyframe_scan(project_id: str, file_path: str) -> Future | None:
+    if not bool_env("KINO_KEYFRAME_INDEX", default=True):
         return None
+    return _keyframe_executor.submit(load_or_build_keyframe_index, project_id, file_path)
 
-    text = str(value).strip()
-    parts = text.split(":")
-    if len(parts) != 3:
-        return None
 
-    first, second, third = parts
-    if not first.isdigit() or not second.isdigit():
-        return None
-    frames_token = third.split(".", 1)[0]
-    if not frames_token.isdigit():
+def _resolve_keyframes(project_id: str, future: Future | None) -> KeyframeIndex | None:
+    if future is None:
         return None
-
-    minutes = int(first)
-    seconds = int(second)
-    frames = int(frames_token)
-    if seconds >= 60:
+    try:
+        return future.result()
+    except Exception as exc:
+        print(f"[Pipeline:{project_id}] Keyframe scan failed: {exc}")
         return None
 
-    return max(0.0, (minutes * 60) + seconds + (frames / max(fps, 1)))
-
 
-def _normalized_timestamp_seconds(
-    value: str | None,
-    *,
+def _prepare_scene(
+    scene: dict,
     duration_seconds: float,
     fps: int,
-) -> float:
-    parsed = _safe_timecode_seconds(value, fps)
-    if parsed is None:
-        return 0.0
-
-    # Gemini can output MM:SS:FF even when asked for HH:MM:SS.FF.
-    # For short videos, reinterpret huge values using MM:SS:FF if it fits duration.
-    if duration_seconds > 0 and duration_seconds < 3600 and parsed > (duration_seconds + 1):
-        alt = _mm_ss_ff_seconds(value, fps)
-        if alt is not None and alt <= (duration_seconds + 1):
-            parsed = alt
-
-    if duration_seconds <= 0:
-        return parsed
-
-    max_start = max(0.0, duration_seconds - (1 / max(fps, 1)))
-    return min(max(parsed, 0.0), max_start)
-
-
-def _normalize_scene_timecodes(payload: dict, duration_seconds: float, fps: int) -> tuple[dict, int]:
-    storyboards = payload.get("storyboards")
-
-    repaired = 0
-    min_clip = 1 / max(fps, 1)
-    default_clip = max(1.0, 12 / max(fps, 1))
-
-    if isinstance(storyboards, list):
-        for board in storyboards:
-            if not isinstance(board, dict):
-                continue
-            scenes = board.get("scenes")
-            if not isinstance(scenes, list):
-                continue
-
-            for scene in scenes:
-                if not isinstance(scene, dict):
-                    continue
-
-                original = (
-                    str(scene.get("start_tc") or ""),
-                    str(scene.get("end_tc") or ""),
-                    str(scene.get("thumbnail_tc") or ""),
-                )
-
-                start_sec = _normalized_timestamp_seconds(
-                    scene.get("start_tc"),
-                    duration_seconds=duration_seconds,
-                    fps=fps,
-                )
-                end_sec = _normalized_timestamp_seconds(
-                    scene.get("end_tc"),
-                    duration_seconds=duration_seconds,
-                    fps=fps,
-                )
-
-                if end_sec <= start_sec + min_clip:
-                    end_sec = start_sec + max(default_clip, min_clip)
-                if duration_seconds > 0:
-                    end_sec = min(end_sec, duration_seconds)
-                if end_sec <= start_sec + min_clip:
-                    start_sec = max(0.0, end_sec - max(default_clip, min_clip))
-
-                thumb_sec = _normalized_timestamp_seconds(
-                    scene.get("thumbnail_tc") or scene.get("start_tc"),
-                    duration_seconds=duration_seconds,
-                    fps=fps,
-                )
-                if thumb_sec < start_sec or thumb_sec > end_sec:
-                    thumb_sec = start_sec + ((end_sec - start_sec) / 2)
-
-                scene["start_tc"] = seconds_to_timecode(start_sec, fps)
-                scene["end_tc"] = seconds_to_timecode(end_sec, fps)
-                scene["thumbnail_tc"] = seconds_to_timecode(thumb_sec, fps)
-                scene["duration_seconds"] = round(max(end_sec - start_sec, min_clip), 2)
-
-                updated = (
-                    str(scene.get("start_tc") or ""),
-                    str(scene.get("end_tc") or ""),
-                    str(scene.get("thumbnail_tc") or ""),
-                )
-                if original != updated:
-                    repaired += 1
+    keyframes: KeyframeIndex | None = None,
+) -> bool:
+    """Normalize one scene and, when enabled, snap it to keyframes. Returns whether it was repaired."""
+    repaired = normalize_scene(scene, duration_seconds, fps)
+    tolerance = _keyframe_snap_tolerance()
+    if keyframes is not None and tolerance is not None:
+        snap_scene_to_keyframes(
+            scene,
+            keyframes,
+            tolerance_seconds=tolerance,
+            duration_seconds=duration_seconds,
+            fps=fps,
+        )
+    return repaired
 
-    raw_candidates = payload.get("poster_candidates")
-    if isinstance(raw_candidates, list):
-        for entry in raw_candidates:
-            if not isinstance(entry, dict):
-                continue
-            source = entry.get("timestamp") or entry.get("timecode") or entry.get("tc")
-            if not source:
-                continue
-            normalized = seconds_to_timecode(
-                _normalized_timestamp_seconds(
-                    str(source),
-                    duration_seconds=duration_seconds,
-                    fps=fps,
-                ),
-                fps,
-            )
-            if str(entry.get("timestamp") or "") != normalized:
-                repaired += 1
-            entry["timestamp"] = normalized
 
-    return payload, repaired
+def _render_workers() -> int:
+    cpu_count = os.cpu_count() or 1
+    default_workers = 2 if cpu_count >= 2 else 1
+    raw = os.getenv("KINO_RENDER_WORKERS")
+    if raw is None:
+        return default_workers
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        return default_workers
 
 
-def _project_to_model(record, include_storyboards: bool) -> Project:
-    storyboards_payload = parse_storyboards(record) if include_storyboards else None
+def _gzip_min_bytes() -> int:
+    try:
+        return max(0, int(os.getenv("KINO_GZIP_MIN_BYTES", "1024")))
+    except ValueError:
+        return 1024
+
+
+def _conditional_json(
+    request: Request,
+    cached: project_cache.CachedResponse,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Serve ``cached`` with its ETag, or 304 when the client already has it.
+
+    Large bodies are gzipped here rather than by the middleware, so the compressed
+    form gets its own strong ETag.
+    """
+    use_gzip = (
+        len(cached.body) >= _gzip_min_bytes()
+        and "gzip" in request.headers.get("accept-encoding", "").lower()
+    )
+    etag = f'{cached.etag[:-1]}-gzip"' if use_gzip else cached.etag
+    response_headers = {
+        **(headers or {}),
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison (RFC 9110), and either encoding of the same body counts.
+        tags = {tag.strip().removeprefix("W/").replace('-gzip"', '"') for tag in if_none_match.split(",")}
+        if "*" in tags or cached.etag in tags:
+            return Response(status_code=304, headers=response_headers)
+    if use_gzip:
+        response_headers["Content-Encoding"] = "gzip"
+        return Response(content=cached.gzipped(), media_type="application/json", headers=response_headers)
+    return Response(content=cached.body, media_type="application/json", headers=response_headers)
+
+
+def _project_to_model(
+    record,
+    include_storyboards: bool,
+    parsed: tuple | None = None,
+) -> Project:
+    if include_storyboards and parsed is not None:
+        storyboards_payload, poster_candidates, poster_outputs = parsed
+    elif include_storyboards:
+        storyboards_payload = parse_storyboards(record)
+        poster_candidates = parse_poster_candidates(record)
+        poster_outputs = parse_poster_outputs(record)
+    else:
+        storyboards_payload = poster_candidates = poster_outputs = None
     storyboards = (
         storyboards_payload.get("storyboards")
         if isinstance(storyboards_payload, dict)
@@ -248,8 +290,6 @@ def _project_to_model(record, include_storyboards: bool) -> Project:
             frames_count = sum(
                 len(board.get("scenes", [])) for board in storyboards if isinstance(board, dict)
             )
-    poster_candidates = parse_poster_candidates(record) if include_storyboards else None
-    poster_outputs = parse_poster_outputs(record) if include_storyboards else None
     return Project(
         id=record.id,
         name=record.name,
@@ -258,8 +298,9 @@ def _project_to_model(record, include_storyboards: bool) -> Project:
         duration_seconds=record.duration_seconds,
         poster_url=record.poster_url,
         status=record.status,
-        progress=compute_progress(record),
+        progress=compute_progress(record, get_progress_tracker().current(record.id)),
         error_message=record.error_message,
+        queue_position=record.queue_position,
         storyboards=storyboards,
         storyboards_count=storyboards_count,
         frames_count=frames_count,
@@ -334,86 +375,61 @@ def _gather_scenes(record, frames: list[object] | None) -> list[dict]:
     return selected or all_scenes
 
 
-def _write_simple_pdf(path: Path, title: str, lines: list[str]) -> None:
-    safe_lines = [line.replace("(", "\\(").replace(")", "\\)") for line in lines]
-    content = ["BT", "/F1 16 Tf", "50 760 Td", f"({title}) Tj"]
-    for line in safe_lines[:30]:
-        content.append("0 -18 Td")
-        content.append(f"({line}) Tj")
-    content.append("ET")
-    content_bytes = "\n".join(content).encode("ascii", "ignore")
-
-    objects: list[bytes] = []
-    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
-    objects.append(b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>")
-    objects.append(
-        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
-        b"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>"
-    )
-    objects.append(b"<< /Length " + str(len(content_bytes)).encode() + b" >>\nstream\n" + content_bytes + b"\nendstream")
-    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
-
-    xref_positions = []
-    output = bytearray(b"%PDF-1.4\n")
-    for idx, obj in enumerate(objects, start=1):
-        xref_positions.append(len(output))
-        output.extend(f"{idx} 0 obj\n".encode())
-        output.extend(obj)
-        output.extend(b"\nendobj\n")
-
-    xref_start = len(output)
-    output.extend(f"xref\n0 {len(objects)+1}\n".encode())
-    output.extend(b"0000000000 65535 f \n")
-    for pos in xref_positions:
-        output.extend(f"{pos:010d} 00000 n \n".encode())
-
-    output.extend(
-        b"trailer\n<< /Size "
-        + str(len(objects) + 1).encode()
-        + b" /Root 1 0 R >>\nstartxref\n"
-        + str(xref_start).encode()
-        + b"\n%%EOF\n"
-    )
-    path.write_bytes(output)
-
-
 def _render_scene_assets(
     input_path: Path,
     board_clip_dir: Path,
     board_thumb_dir: Path,
     scene_asset_index: int,
-    start_tc: str,
-    end_tc: str,
-    thumbnail_tc: str,
+    start_tc: str | Timecode,
+    end_tc: str | Timecode,
+    thumbnail_tc: str | Timecode,
     fps: int,
     use_nvenc: bool,
+    stream_copy: bool = False,
+    source_hash: str | None = None,
 ) -> tuple[str, str]:
     clip_name = f"scene_{scene_asset_index:02d}.mp4"
     thumb_name = f"scene_{scene_asset_index:02d}.webp"
     clip_path = board_clip_dir / clip_name
     thumb_path = board_thumb_dir / thumb_name
+    # Earlier renders may be links into the shared store; write new files instead.
+    clip_path.unlink(missing_ok=True)
+    thumb_path.unlink(missing_ok=True)
 
     clip_request = ClipRequest(
         input_path=str(input_path),
-        start_tc=start_tc,
-        end_tc=end_tc,
+        start_tc=Timecode.parse(start_tc, fps),
+        end_tc=Timecode.parse(end_tc, fps),
         output_path=str(clip_path),
+        fps=fps,
     )
-    clip_command = (
-        build_nvenc_clip_command(clip_request)
-        if use_nvenc
-        else build_x264_clip_command(clip_request)
-    )
-    _run_command(clip_command)
+    if stream_copy:
+        clip_command = build_copy_clip_command(clip_request)
+    elif use_nvenc:
+        clip_command = build_nvenc_clip_command(clip_request)
+    else:
+        clip_command = build_x264_clip_command(clip_request)
 
     candidate_dir = board_thumb_dir / f"scene_{scene_asset_index:02d}_candidates"
-    candidate_dir.mkdir(parents=True, exist_ok=True)
     thumbnail_commands = build_thumbnail_commands(
         str(input_path),
-        thumbnail_tc,
+        Timecode.parse(thumbnail_tc, fps),
         str(candidate_dir),
         fps=fps,
     )
+
+    cache_key = None
+    if source_hash and source_store_enabled():
+        cache_key = render_key(
+            source_hash,
+            [clip_command, *thumbnail_commands],
+            {str(input_path): "{input}", str(clip_path): "{clip}", str(candidate_dir): "{thumbs}"},
+        )
+        if link_cached_render(source_hash, cache_key, [clip_path, thumb_path]):
+            return clip_name, thumb_name
+
+    _run_command(clip_command)
+    candidate_dir.mkdir(parents=True, exist_ok=True)
     candidate_paths: list[str] = []
     for command in thumbnail_commands:
         _run_command(command)
@@ -432,104 +448,131 @@ def _render_scene_assets(
     except OSError:
         pass
 
+    if cache_key is not None:
+        store_render(source_hash, cache_key, [clip_path, thumb_path])
     return clip_name, thumb_name
 
 
-def _render_assets(
-    project_id: str,
-    input_path: Path,
-    payload: dict,
-    fps: int,
-    use_nvenc: bool,
-    render_workers: int = 1,
-    board_progress_callback: Callable[[int, int], None] | None = None,
-) -> tuple[dict, str | None]:
-    project_dir = get_project_dir(project_id)
-    clips_root = project_dir / "clips"
-    thumbs_root = project_dir / "thumbs"
-    clips_root.mkdir(parents=True, exist_ok=True)
-    thumbs_root.mkdir(parents=True, exist_ok=True)
-
-    poster_url = None
-    storyboards = payload.get("storyboards", [])
-    total_boards = len(storyboards) if isinstance(storyboards, list) else 0
-
-    for board_idx, board in enumerate(storyboards, start=1):
-        if not isinstance(board, dict):
-            continue
-        board_clip_dir = clips_root / f"board_{board_idx}"
-        board_thumb_dir = thumbs_root / f"board_{board_idx}"
+class _SceneRenderQueue:
+    """Renders scene clips/thumbnails on a worker pool as scenes are submitted.
+
+    Scenes can be queued while Gemini is still streaming; ``drain`` waits for the
+    outstanding renders and attaches the media URLs to each scene dict.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        input_path: Path,
+        fps: int,
+        use_nvenc: bool,
+        render_workers: int = 1,
+        keyframes: KeyframeIndex | None = None,
+        source_hash: str | None = None,
+    ) -> None:
+        project_dir = get_project_dir(project_id)
+        self.project_id = project_id
+        self.input_path = input_path
+        self.source_hash = source_hash
+        self.fps = fps
+        self.use_nvenc = use_nvenc
+        self.keyframes = keyframes
+        self.stream_copy = keyframes is not None and bool_env("KINO_STREAM_COPY_CLIPS", default=False)
+        self.clips_root = project_dir / "clips"
+        self.thumbs_root = project_dir / "thumbs"
+        self.clips_root.mkdir(parents=True, exist_ok=True)
+        self.thumbs_root.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, render_workers))
+        self._futures: dict[Future, tuple[int, dict]] = {}
+        self._slots: dict[tuple[int, int], Future] = {}
+
+    def _board_dirs(self, board_idx: int) -> tuple[Path, Path]:
+        board_clip_dir = self.clips_root / f"board_{board_idx}"
+        board_thumb_dir = self.thumbs_root / f"board_{board_idx}"
         board_clip_dir.mkdir(parents=True, exist_ok=True)
         board_thumb_dir.mkdir(parents=True, exist_ok=True)
+        return board_clip_dir, board_thumb_dir
+
+    def _starts_on_keyframe(self, scene: dict) -> bool:
+        start = Timecode.try_parse(scene.get("start_tc"), self.fps)
+        return (
+            self.keyframes is not None
+            and start is not None
+            and self.keyframes.is_keyframe(start.frames, self.fps)
+        )
 
-        scenes = board.get("scenes", [])
-        if not isinstance(scenes, list):
-            continue
-
-        if render_workers > 1 and len(scenes) > 1:
-            with ThreadPoolExecutor(max_workers=render_workers) as executor:
-                futures = {}
-                for scene_idx, scene in enumerate(scenes, start=1):
-                    if not isinstance(scene, dict):
-                        continue
-                    futures[
-                        executor.submit(
-                            _render_scene_assets,
-                            input_path=input_path,
-                            board_clip_dir=board_clip_dir,
-                            board_thumb_dir=board_thumb_dir,
-                            scene_asset_index=scene_idx,
-                            start_tc=str(scene["start_tc"]),
-                            end_tc=str(scene["end_tc"]),
-                            thumbnail_tc=str(scene["thumbnail_tc"]),
-                            fps=fps,
-                            use_nvenc=use_nvenc,
-                        )
-                    ] = scene
-
-                for future in as_completed(futures):
-                    scene = futures[future]
-                    clip_name, thumb_name = future.result()
-                    scene["clip_url"] = _media_url(
-                        project_id,
-                        f"clips/board_{board_idx}/{clip_name}",
-                    )
-                    scene["thumbnail_url"] = _media_url(
-                        project_id,
-                        f"thumbs/board_{board_idx}/{thumb_name}",
-                    )
-                    thumb_path = board_thumb_dir / thumb_name
-                    if (
-                        poster_url is None
-                        and thumb_path.exists()
-                        and thumb_path.stat().st_size > 0
-                    ):
-                        poster_url = scene["thumbnail_url"]
-        else:
-            for scene_idx, scene in enumerate(scenes, start=1):
-                if not isinstance(scene, dict):
-                    continue
-                clip_name, thumb_name = _render_scene_assets(
-                    input_path=input_path,
-                    board_clip_dir=board_clip_dir,
-                    board_thumb_dir=board_thumb_dir,
-                    scene_asset_index=scene_idx,
-                    start_tc=str(scene["start_tc"]),
-                    end_tc=str(scene["end_tc"]),
-                    thumbnail_tc=str(scene["thumbnail_tc"]),
-                    fps=fps,
-                    use_nvenc=use_nvenc,
-                )
+    def render_cost(self, scene: dict) -> float:
+        """Rough render time in seconds of source: decode up to the in-point, then encode the clip."""
+        start = Timecode.try_parse(scene.get("start_tc"), self.fps)
+        end = Timecode.try_parse(scene.get("end_tc"), self.fps)
+        if start is None or end is None or self.keyframes is None:
+            return 0.0
+        if self.stream_copy and self._starts_on_keyframe(scene):
+            return 0.0
+        return self.keyframes.seek_cost(start.seconds) + max(end - start, 0) / self.fps
+
+    def submit(self, board_idx: int, scene_idx: int, scene: dict) -> None:
+        if (board_idx, scene_idx) in self._slots:
+            return
+        board_clip_dir, board_thumb_dir = self._board_dirs(board_idx)
+        future = self._executor.submit(
+            _render_scene_assets,
+            input_path=self.input_path,
+            board_clip_dir=board_clip_dir,
+            board_thumb_dir=board_thumb_dir,
+            scene_asset_index=scene_idx,
+            start_tc=str(scene["start_tc"]),
+            end_tc=str(scene["end_tc"]),
+            thumbnail_tc=str(scene["thumbnail_tc"]),
+            fps=self.fps,
+            use_nvenc=self.use_nvenc,
+            stream_copy=self.stream_copy and self._starts_on_keyframe(scene),
+            source_hash=self.source_hash,
+        )
+        self._futures[future] = (board_idx, scene)
+        self._slots[(board_idx, scene_idx)] = future
+
+    def _forget(self, slot: tuple[int, int]) -> Future | None:
+        future = self._slots.pop(slot, None)
+        if future is not None:
+            self._futures.pop(future, None)
+            future.cancel()
+        return future
+
+    def replace(self, board_idx: int, scene_idx: int, scene: dict) -> None:
+        """Re-render a slot whose streamed scene was superseded by a different one."""
+        previous = self._forget((board_idx, scene_idx))
+        if previous is not None and not previous.cancelled():
+            # Both renders write the same file names; let the stale one finish first.
+            wait([previous])
+        self.submit(board_idx, scene_idx, scene)
+
+    def retain(self, slots: set[tuple[int, int]]) -> None:
+        for slot in [slot for slot in self._slots if slot not in slots]:
+            self._forget(slot)
+
+    def drain(
+        self,
+        board_scene_counts: dict[int, int],
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> str | None:
+        poster_url = None
+        total_scenes = sum(board_scene_counts.values())
+        done_scenes = 0
 
+        try:
+            for future in as_completed(list(self._futures)):
+                board_idx, scene = self._futures[future]
+                clip_name, thumb_name = future.result()
                 scene["clip_url"] = _media_url(
-                    project_id,
+                    self.project_id,
                     f"clips/board_{board_idx}/{clip_name}",
                 )
                 scene["thumbnail_url"] = _media_url(
-                    project_id,
+                    self.project_id,
                     f"thumbs/board_{board_idx}/{thumb_name}",
                 )
-                thumb_path = board_thumb_dir / thumb_name
+                thumb_path = self.thumbs_root / f"board_{board_idx}" / thumb_name
                 if (
                     poster_url is None
                     and thumb_path.exists()
@@ -537,25 +580,90 @@ def _render_assets(
                 ):
                     poster_url = scene["thumbnail_url"]
 
-        if board_progress_callback is not None and total_boards:
-            board_progress_callback(board_idx, total_boards)
+                done_scenes += 1
+                if progress_callback is not None and total_scenes:
+                    progress_callback(min(done_scenes, total_scenes), total_scenes)
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
 
-    if poster_url is None and isinstance(storyboards, list):
-        for board in storyboards:
-            if not isinstance(board, dict):
-                continue
-            scenes = board.get("scenes")
-            if not isinstance(scenes, list):
+        return poster_url
+
+    def cancel(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _board_scene_counts(storyboards: object) -> dict[int, int]:
+    counts: dict[int, int] = {}
+    if not isinstance(storyboards, list):
+        return counts
+    for board_idx, board in enumerate(storyboards, start=1):
+        if not isinstance(board, dict):
+            continue
+        scenes = board.get("scenes", [])
+        if not isinstance(scenes, list):
+            continue
+        counts[board_idx] = sum(1 for scene in scenes if isinstance(scene, dict))
+    return counts
+
+
+def _first_thumbnail_url(storyboards: object) -> str | None:
+    if not isinstance(storyboards, list):
+        return None
+    for board in storyboards:
+        if not isinstance(board, dict):
+            continue
+        scenes = board.get("scenes")
+        if not isinstance(scenes, list):
+            continue
+        for scene in scenes:
+            if not isinstance(scene, dict):
                 continue
-            for scene in scenes:
-                if not isinstance(scene, dict):
-                    continue
-                candidate = scene.get("thumbnail_url")
-                if isinstance(candidate, str) and candidate:
-                    poster_url = candidate
-                    break
-            if poster_url:
-                break
+            candidate = scene.get("thumbnail_url")
+            if isinstance(candidate, str) and candidate:
+                return candidate
+    return None
+
+
+def _render_assets(
+    project_id: str,
+    input_path: Path,
+    payload: dict,
+    fps: int,
+    use_nvenc: bool,
+    render_workers: int = 1,
+    progress_callback: Callable[[int, int], None] | None = None,
+    render_queue: _SceneRenderQueue | None = None,
+    keyframes: KeyframeIndex | None = None,
+    source_hash: str | None = None,
+) -> tuple[dict, str | None]:
+    queue = render_queue or _SceneRenderQueue(
+        project_id,
+        input_path,
+        fps=fps,
+        use_nvenc=use_nvenc,
+        render_workers=render_workers,
+        keyframes=keyframes,
+        source_hash=source_hash,
+    )
+    storyboards = payload.get("storyboards", [])
+    board_scene_counts = _board_scene_counts(storyboards)
+
+    pending = [
+        (board_idx, scene_idx, scene)
+        for board_idx in board_scene_counts
+        for scene_idx, scene in enumerate(storyboards[board_idx - 1].get("scenes", []), start=1)
+        if isinstance(scene, dict)
+    ]
+    if queue.keyframes is not None:
+        # Longest renders first keeps the worker pool busy until the end.
+        pending.sort(key=lambda item: queue.render_cost(item[2]), reverse=True)
+    # Anything the streaming path already queued is skipped here.
+    for board_idx, scene_idx, scene in pending:
+        queue.submit(board_idx, scene_idx, scene)
+
+    poster_url = queue.drain(board_scene_counts, progress_callback)
+    if poster_url is None:
+        poster_url = _first_thumbnail_url(storyboards)
 
     return payload, poster_url
 
@@ -567,8 +675,8 @@ def _build_poster_candidates(
     duration_seconds: float | None = None,
     fps: int = 24,
 ) -> list[dict]:
-    candidates: list[dict] = []
-    seen: set[str] = set()
+    # Gemini's poster picks come first, then scene thumbnails as fallbacks.
+    entries: list[tuple[str, object]] = []
 
     raw_candidates = payload.get("poster_candidates")
     if isinstance(raw_candidates, list):
@@ -578,28 +686,7 @@ def _build_poster_candidates(
             timestamp = entry.get("timestamp") or entry.get("timecode") or entry.get("tc")
             if not timestamp:
                 continue
-            timestamp = str(timestamp)
-            if duration_seconds is not None:
-                timestamp = seconds_to_timecode(
-                    _normalized_timestamp_seconds(
-                        timestamp,
-                        duration_seconds=duration_seconds,
-                        fps=fps,
-                    ),
-                    fps,
-                )
-            if timestamp in seen:
-                continue
-            seen.add(timestamp)
-            candidates.append(
-                {
-                    "id": f"poster_{len(candidates) + 1:02d}",
-                    "timestamp": timestamp,
-                    "description": entry.get("description") or entry.get("reason"),
-                }
-            )
-            if len(candidates) >= limit:
-                return candidates
+            entries.append((str(timestamp), entry.get("description") or entry.get("reason")))
 
     storyboards = payload.get("storyboards", [])
     if isinstance(storyboards, list):
@@ -612,28 +699,29 @@ def _build_poster_candidates(
                 timestamp = scene.get("thumbnail_tc") or scene.get("start_tc")
                 if not timestamp:
                     continue
-                timestamp = str(timestamp)
-                if duration_seconds is not None:
-                    timestamp = seconds_to_timecode(
-                        _normalized_timestamp_seconds(
-                            timestamp,
-                            duration_seconds=duration_seconds,
-                            fps=fps,
-                        ),
-                        fps,
-                    )
-                if timestamp in seen:
-                    continue
-                seen.add(timestamp)
-                candidates.append(
-                    {
-                        "id": f"poster_{len(candidates) + 1:02d}",
-                        "timestamp": timestamp,
-                        "description": scene.get("description") or scene.get("emotional_beat"),
-                    }
+                entries.append(
+                    (str(timestamp), scene.get("description") or scene.get("emotional_beat"))
                 )
-                if len(candidates) >= limit:
-                    return candidates
+
+    timestamps = [timestamp for timestamp, _ in entries]
+    if duration_seconds is not None:
+        timestamps = normalize_timestamps(timestamps, duration_seconds, fps)
+
+    candidates: list[dict] = []
+    seen: set[str] = set()
+    for timestamp, (_, description) in zip(timestamps, entries):
+        if timestamp in seen:
+            continue
+        seen.add(timestamp)
+        candidates.append(
+            {
+                "id": f"poster_{len(candidates) + 1:02d}",
+                "timestamp": timestamp,
+                "description": description,
+            }
+        )
+        if len(candidates) >= limit:
+            break
 
     return candidates
 
@@ -775,7 +863,7 @@ def _store_generated_posters(
     results: list[dict] = []
 
     for idx, image_bytes in enumerate(images, start=1):
-        poster_id = f"poster_{timestamp}_{idx:02d}"
+        poster_id = f"poster_{timestamp}_{uuid.uuid4().hex[:6]}_{idx:02d}"
         filename = f"{poster_id}.png"
         path = output_dir / filename
         path.write_bytes(image_bytes)
@@ -792,46 +880,274 @@ def _store_generated_posters(
     return results
 
 
-def _process_project(project_id: str, file_path: str) -> None:
-    pipeline_started = time.perf_counter()
+def _record_queue_wait(project_id: str, queue_wait: float) -> None:
+    print(f"[Pipeline:{project_id}] Waited {queue_wait:.1f}s for a Gemini slot.")
+    record = get_project(project_id, include_storyboards=False)
+    update_project(
+        project_id,
+        processing_estimate_seconds=estimate_processing_seconds(
+            record.duration_seconds,
+            queue_wait_seconds=queue_wait,
+        ),
+    )
+
+
+def _ensure_shot_log(
+    project_id: str,
+    file_path: str,
+    duration_seconds: float,
+    source_hash: str | None = None,
+) -> dict:
+    """Load the project's shot log, logging the film with Gemini the first time."""
+    fingerprint = shot_log_fingerprint()
+    shot_log = get_film_index(project_id, fingerprint, source_hash=source_hash)
+    if shot_log is not None:
+        print(f"[Pipeline:{project_id}] Using stored shot log; skipping Gemini upload.")
+        return shot_log
+
+    upload_started = time.perf_counter()
+    file_ref = upload_file_to_gemini(file_path)
+    upload_elapsed = time.perf_counter() - upload_started
+    print(f"[Pipeline:{project_id}] Gemini upload + file processing: {upload_elapsed:.1f}s")
+
+    index_started = time.perf_counter()
+    shot_log = generate_shot_log_from_file(file_ref, Path(file_path).name, duration_seconds)
+    save_film_index(project_id, shot_log, fingerprint, source_hash=source_hash)
+    index_elapsed = time.perf_counter() - index_started
+    print(f"[Pipeline:{project_id}] Gemini shot log: {index_elapsed:.1f}s")
+    return shot_log
+
+
+def _project_shot_log(record, video_path: Path, duration_seconds: float) -> dict:
+    shot_log = get_film_index(record.id, shot_log_fingerprint(), source_hash=record.source_hash)
+    if shot_log is not None:
+        return shot_log
+    # Logging the film is the one expensive call; it shares the pipeline's Gemini slots.
+    with get_governor().admit(record.id):
+        return _ensure_shot_log(record.id, str(video_path), duration_seconds, record.source_hash)
+
+
+def _share_source(project_id: str, file_path: str, source_hash: str) -> None:
     try:
-        record = get_project(project_id)
-        duration_seconds = record.duration_seconds
-        if duration_seconds <= 0:
-            duration_seconds = probe_duration(file_path)
-            if duration_seconds > 0:
-                update_project(project_id, duration_seconds=duration_seconds)
-
-        update_project(project_id, progress=30, error_message=None)
-        upload_started = time.perf_counter()
-        file_ref = upload_file_to_gemini(file_path)
-        upload_elapsed = time.perf_counter() - upload_started
-        print(f"[Pipeline:{project_id}] Gemini upload + file processing: {upload_elapsed:.1f}s")
-
-        update_project(project_id, progress=45)
+        donor = adopt_source(project_id, Path(file_path), source_hash)
+    except OSError as exc:
+        print(f"[Pipeline:{project_id}] Source store unavailable ({exc}); keeping a private copy.")
+        return
+    if donor is None:
+        return
+    print(f"[Pipeline:{project_id}] Same film as {donor}; sharing its stored source and indexes.")
+    if get_media_info(project_id) is None and (info := get_media_info(donor)) is not None:
+        save_media_info(project_id, info)
+    if get_keyframe_index(project_id) is None and (index := get_keyframe_index(donor)) is not None:
+        save_keyframe_index(project_id, index)
+
+
+def _generate_with_gemini(
+    project_id: str,
+    file_path: str,
+    duration_seconds: float,
+    fps: int,
+    use_nvenc: bool,
+    render_workers: int,
+    cache_key: GenerationKey | None = None,
+    source_hash: str | None = None,
+    keyframes_future: Future | None = None,
+) -> tuple[dict, _SceneRenderQueue | None, int]:
+    progress = get_progress_tracker()
+    progress.report(project_id, 30, flush=True)
+    if generation_mode() == "indexed":
+        shot_log = _ensure_shot_log(project_id, file_path, duration_seconds, source_hash)
+        progress.report(project_id, 45, flush=True)
         generation_started = time.perf_counter()
-        storyboards = generate_storyboards_from_file(
-            file_ref,
+        storyboards = generate_storyboards_from_shot_log(
+            shot_log,
             Path(file_path).name,
             duration_seconds,
         )
+        if cache_key is not None:
+            store_generation(cache_key, storyboards)
         generation_elapsed = time.perf_counter() - generation_started
-        print(f"[Pipeline:{project_id}] Gemini storyboard generation: {generation_elapsed:.1f}s")
-
-        fps = int(os.getenv("KINO_FPS", "24"))
-        storyboards, repaired_timestamps = _normalize_scene_timecodes(
-            storyboards,
-            duration_seconds=duration_seconds,
+        print(f"[Pipeline:{project_id}] Gemini storyboard generation (indexed): {generation_elapsed:.1f}s")
+        return storyboards, None, 0
+
+    upload_started = time.perf_counter()
+    file_ref = upload_file_to_gemini(file_path)
+    upload_elapsed = time.perf_counter() - upload_started
+    print(f"[Pipeline:{project_id}] Gemini upload + file processing: {upload_elapsed:.1f}s")
+
+    progress.report(project_id, 45, flush=True)
+    render_queue: _SceneRenderQueue | None = None
+    repaired_timestamps = 0
+    generation_started = time.perf_counter()
+    if bool_env("KINO_GEMINI_STREAM", default=False):
+        # The packet scan has had the whole upload to finish; scenes need it from here on.
+        keyframes = _resolve_keyframes(project_id, keyframes_future)
+        render_queue = _SceneRenderQueue(
+            project_id,
+            Path(file_path),
             fps=fps,
+            use_nvenc=use_nvenc,
+            render_workers=render_workers,
+            keyframes=keyframes,
+            source_hash=source_hash,
         )
+        # Slot -> (scene as Gemini wrote it, normalized dict queued for rendering).
+        streamed: dict[tuple[int, int], tuple[dict, dict]] = {}
+
+        def _on_scene(board_idx: int, scene_idx: int, scene: dict) -> None:
+            nonlocal repaired_timestamps
+            raw_scene = dict(scene)
+            if _prepare_scene(scene, duration_seconds, fps, keyframes):
+                repaired_timestamps += 1
+            streamed[(board_idx, scene_idx)] = (raw_scene, scene)
+            render_queue.submit(board_idx, scene_idx, scene)
+
+        try:
+            storyboards = stream_storyboards_from_file(
+                file_ref,
+                Path(file_path).name,
+                duration_seconds,
+                on_scene=_on_scene,
+            )
+        except Exception:
+            render_queue.cancel()
+            raise
+        if cache_key is not None:
+            store_generation(cache_key, storyboards)
+        # Swap in the scene dicts that are already normalized and queued for rendering.
+        # Salvage can drop or replace boards, so a slot is only reused when the final
+        # scene is the one that was streamed; anything else is normalized here.
+        final_slots: set[tuple[int, int]] = set()
+        for board_idx, board in enumerate(storyboards.get("storyboards") or [], start=1):
+            if not isinstance(board, dict) or not isinstance(board.get("scenes"), list):
+                continue
+            scenes = []
+            for scene_idx, scene in enumerate(board["scenes"], start=1):
+                slot = (board_idx, scene_idx)
+                final_slots.add(slot)
+                entry = streamed.get(slot)
+                if entry is not None and entry[0] == scene:
+                    scene = entry[1]
+                elif isinstance(scene, dict):
+                    if _prepare_scene(scene, duration_seconds, fps, keyframes):
+                        repaired_timestamps += 1
+                    if entry is not None:
+                        render_queue.replace(board_idx, scene_idx, scene)
+                scenes.append(scene)
+            board["scenes"] = scenes
+        render_queue.retain(final_slots)
+        print(
+            f"[Pipeline:{project_id}] Queued {len(streamed)} scenes for rendering while streaming."
+        )
+    else:
+        storyboards = generate_storyboards_from_file(
+            file_ref,
+            Path(file_path).name,
+            duration_seconds,
+        )
+        if cache_key is not None:
+            store_generation(cache_key, storyboards)
+    generation_elapsed = time.perf_counter() - generation_started
+    print(f"[Pipeline:{project_id}] Gemini storyboard generation: {generation_elapsed:.1f}s")
+    return storyboards, render_queue, repaired_timestamps
+
+
+def _process_project(
+    project_id: str,
+    file_path: str,
+    use_generation_cache: bool = True,
+) -> None:
+    pipeline_started = time.perf_counter()
+    progress = get_progress_tracker()
+    try:
+        record = get_project(project_id)
+        source_hash = record.source_hash
+        if source_store_enabled():
+            if not source_hash:
+                source_hash = hash_file(file_path)
+                update_project(project_id, source_hash=source_hash)
+            _share_source(project_id, file_path, source_hash)
+        duration_seconds, fps = _media_profile(record, file_path)
+        if duration_seconds > 0 and duration_seconds != record.duration_seconds:
+            update_project(project_id, duration_seconds=duration_seconds)
+
+        use_nvenc = os.getenv("KINO_USE_NVENC", "").lower() in {"1", "true", "yes"}
+        render_workers = _render_workers()
+        render_queue: _SceneRenderQueue | None = None
+        # Runs alongside the Gemini upload; normalization and rendering wait for it.
+        keyframes_future = _start_keyframe_scan(project_id, file_path)
+
+        cache_key: GenerationKey | None = None
+        cached_storyboards: dict | None = None
+        if generation_cache_enabled():
+            if not source_hash:
+                source_hash = hash_file(file_path)
+                update_project(project_id, source_hash=source_hash)
+            cache_key = build_generation_key(
+                source_hash,
+                generation_fingerprint(generation_mode()),
+            )
+            if use_generation_cache:
+                cached_storyboards = load_cached_generation(cache_key)
+
+        if cached_storyboards is not None:
+            print(
+                f"[Pipeline:{project_id}] Generation cache hit ({cache_key.source_hash[:12]}); "
+                f"skipping Gemini upload and inference."
+            )
+            progress.report(project_id, 45, flush=True)
+            storyboards = cached_storyboards
+        else:
+            def _on_queue_position(position: int) -> None:
+                update_project(project_id, queue_position=position or None)
+
+            with get_governor().admit(project_id, on_position=_on_queue_position) as queue_wait:
+                if queue_wait >= 1:
+                    _record_queue_wait(project_id, queue_wait)
+                storyboards, render_queue, repaired_timestamps = _generate_with_gemini(
+                    project_id,
+                    file_path,
+                    duration_seconds,
+                    fps=fps,
+                    use_nvenc=use_nvenc,
+                    render_workers=render_workers,
+                    cache_key=cache_key,
+                    source_hash=source_hash,
+                    keyframes_future=keyframes_future,
+                )
+
+        keyframes = _resolve_keyframes(project_id, keyframes_future)
+        if render_queue is None:
+            storyboards, repaired_timestamps = normalize_payload_timecodes(
+                storyboards,
+                duration_seconds=duration_seconds,
+                fps=fps,
+            )
+            snap_tolerance = _keyframe_snap_tolerance()
+            if keyframes is not None and snap_tolerance is not None:
+                snapped = snap_payload_to_keyframes(
+                    storyboards,
+                    keyframes,
+                    tolerance_seconds=snap_tolerance,
+                    duration_seconds=duration_seconds,
+                    fps=fps,
+                )
+                print(
+                    f"[Pipeline:{project_id}] Snapped {snapped} scenes to keyframes "
+                    f"(tolerance {snap_tolerance:.2f}s)."
+                )
+        else:
+            repaired_timestamps += normalize_poster_timestamps(
+                storyboards,
+                duration_seconds=duration_seconds,
+                fps=fps,
+            )
         if repaired_timestamps:
             print(
                 f"[Pipeline:{project_id}] Repaired {repaired_timestamps} scene timestamps "
                 f"to match source duration."
             )
 
-        use_nvenc = os.getenv("KINO_USE_NVENC", "").lower() in {"1", "true", "yes"}
-        render_workers = _render_workers()
         storyboard_items = storyboards.get("storyboards", [])
         if not isinstance(storyboard_items, list):
             storyboard_items = []
@@ -846,12 +1162,11 @@ def _process_project(project_id: str, file_path: str) -> None:
             f"with {render_workers} worker(s)."
         )
 
-        update_project(project_id, progress=60)
+        progress.report(project_id, 60, flush=True)
         assets_started = time.perf_counter()
 
-        def _on_board_rendered(done: int, total: int) -> None:
-            progress = 60 + int((done / total) * 30)
-            update_project(project_id, progress=min(90, max(60, progress)))
+        def _on_scene_rendered(done: int, total: int) -> None:
+            progress.report(project_id, 60 + int((done / total) * 30))
 
         storyboards_with_assets, poster_url = _render_assets(
             project_id,
@@ -860,18 +1175,21 @@ def _process_project(project_id: str, file_path: str) -> None:
             fps=fps,
             use_nvenc=use_nvenc,
             render_workers=render_workers,
-            board_progress_callback=_on_board_rendered,
+            progress_callback=_on_scene_rendered,
+            render_queue=render_queue,
+            keyframes=keyframes,
+            source_hash=source_hash,
         )
         assets_elapsed = time.perf_counter() - assets_started
         print(f"[Pipeline:{project_id}] Local clip/thumbnail rendering: {assets_elapsed:.1f}s")
 
-        update_project(project_id, progress=92)
+        progress.report(project_id, 92, flush=True)
         poster_candidates = _build_poster_candidates(
             storyboards_with_assets,
             duration_seconds=duration_seconds,
             fps=fps,
         )
-        eager_poster_candidates = _bool_env("KINO_EAGER_POSTER_CANDIDATES", default=False)
+        eager_poster_candidates = bool_env("KINO_EAGER_POSTER_CANDIDATES", default=False)
         if eager_poster_candidates:
             poster_started = time.perf_counter()
             rendered_candidates = _render_poster_candidates(
@@ -888,7 +1206,7 @@ def _process_project(project_id: str, file_path: str) -> None:
             set_poster_candidates(project_id, [])
             print(f"[Pipeline:{project_id}] Poster candidates deferred (lazy mode).")
 
-        update_project(project_id, progress=98)
+        progress.report(project_id, 98, flush=True)
 
         set_storyboards(project_id, storyboards_with_assets)
         update_fields = {
@@ -900,6 +1218,8 @@ def _process_project(project_id: str, file_path: str) -> None:
         update_project(project_id, **update_fields)
         total_elapsed = time.perf_counter() - pipeline_started
         print(f"[Pipeline:{project_id}] Total processing time: {total_elapsed:.1f}s")
+        if prebuild_formats():
+            _prebuild_executor.submit(_prebuild_exports, project_id)
     except Exception as exc:
         update_project(
             project_id,
@@ -907,40 +1227,91 @@ def _process_project(project_id: str, file_path: str) -> None:
             progress=0,
             error_message=_format_error(exc),
         )
+    finally:
+        progress.finish(project_id)
+
+
+set_source_processor(_process_project)
+
+
+# One page of GET /projects; clients follow X-Next-Cursor for the rest.
+PROJECT_PAGE_SIZE = 50
 
 
 @router.get("/projects", response_model=list[Project])
 def get_projects(
+    request: Request,
     include_storyboards: bool = Query(False),
+    limit: int = Query(PROJECT_PAGE_SIZE, ge=1, le=500),
+    cursor: str | None = Query(None),
     _: str = Depends(require_basic_auth),
-) -> list[Project]:
-    records = list_projects()
-    return [_project_to_model(record, include_storyboards) for record in records]
+) -> Response:
+    try:
+        summaries, next_cursor = list_projects(limit=limit, cursor=cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if include_storyboards:
+        models = [
+            _project_to_model(
+                record,
+                True,
+                (storyboards, parse_poster_candidates(record), parse_poster_outputs(record)),
+            )
+            for record, storyboards in get_projects_with_storyboards([summary.id for summary in summaries])
+        ]
+    else:
+        models = [_project_to_model(summary, False) for summary in summaries]
+    body = b"[" + b",".join(model.model_dump_json().encode("utf-8") for model in models) + b"]"
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return _conditional_json(request, project_cache.CachedResponse(body), headers)
 
 
 @router.get("/projects/{project_id}", response_model=Project)
 def get_project_detail(
     project_id: str,
+    request: Request,
     include_storyboards: bool = Query(True),
     _: str = Depends(require_basic_auth),
-) -> Project:
+) -> Response:
     try:
         record = get_project(project_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Project not found")
-    return _project_to_model(record, include_storyboards)
+
+    # Polled throughout processing; unchanged projects skip parsing and validation.
+    entry = project_cache.get_entry(record.id, record.updated_at)
+    cached = entry.responses.get(("detail", include_storyboards))
+    if cached is None:
+        if include_storyboards and entry.parsed is None:
+            entry.parsed = (
+                parse_storyboards(record),
+                parse_poster_candidates(record),
+                parse_poster_outputs(record),
+            )
+        model = _project_to_model(record, include_storyboards, entry.parsed)
+        cached = project_cache.CachedResponse(model.model_dump_json().encode("utf-8"))
+        # While processing, progress is derived from the clock, so the bytes go stale.
+        if not (record.status == "processing" and record.processing_started_at):
+            entry.responses[("detail", include_storyboards)] = cached
+    return _conditional_json(request, cached)
 
 
 @router.get("/projects/{project_id}/posters", response_model=PosterWallResponse)
 def get_project_posters(
     project_id: str,
+    request: Request,
     _: str = Depends(require_basic_auth),
-) -> PosterWallResponse:
+) -> Response:
     try:
         record = get_project(project_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    entry = project_cache.get_entry(record.id, record.updated_at)
+    cached = entry.responses.get(("posters",))
+    if cached is not None:
+        return _conditional_json(request, cached)
+
     candidates = parse_poster_candidates(record) or []
     posters = parse_poster_outputs(record) or []
 
@@ -949,10 +1320,7 @@ def get_project_posters(
         if payload and record.video_filename:
             video_path = get_project_dir(project_id) / record.video_filename
             if video_path.exists():
-                fps = int(os.getenv("KINO_FPS", "24"))
-                duration_seconds = record.duration_seconds
-                if duration_seconds <= 0:
-                    duration_seconds = probe_duration(str(video_path))
+                duration_seconds, fps = _media_profile(record, str(video_path))
                 candidates = _render_poster_candidates(
                     project_id,
                     video_path,
@@ -964,8 +1332,14 @@ def get_project_posters(
                     fps=fps,
                 )
                 set_poster_candidates(project_id, candidates)
+                # That write moved the project to a new version; cache under it next read.
+                entry = None
 
-    return PosterWallResponse(project_id=project_id, candidates=candidates, posters=posters)
+    wall = PosterWallResponse(project_id=project_id, candidates=candidates, posters=posters)
+    cached = project_cache.CachedResponse(wall.model_dump_json().encode("utf-8"))
+    if entry is not None:
+        entry.responses[("posters",)] = cached
+    return _conditional_json(request, cached)
 
 
 @router.post("/projects", response_model=Project)
@@ -991,34 +1365,30 @@ def upload_project_file(
     _: str = Depends(require_basic_auth),
 ) -> dict:
     try:
-        record = get_project(project_id)
+        get_project(project_id, include_storyboards=False)
     except ValueError:
         raise HTTPException(status_code=404, detail="Project not found")
-
-    project_dir = get_project_dir(project_id)
-    target_path = project_dir / file.filename
-
-    update_project(
-        project_id,
-        status="uploading",
-        progress=5,
-        video_filename=file.filename,
-        error_message=None,
-    )
-
+    try:
+        filename = safe_filename(file.filename or "")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # Single-request uploads are spooled by python-multipart first; large films
+    # should use the resumable /uploads endpoints, which write in place.
+    target_path = get_project_dir(project_id) / filename
+    begin_upload(project_id, filename)
+    tee = UploadTee() if ingest_tee_enabled() else None
     with target_path.open("wb") as handle:
-        shutil.copyfileobj(file.file, handle)
-
-    estimate = _estimate_processing_seconds(record.duration_seconds)
-    update_project(
-        project_id,
-        status="processing",
-        progress=20,
-        processing_started_at=datetime.now(timezone.utc).isoformat(),
-        processing_estimate_seconds=estimate,
-        error_message=None,
-    )
+        while True:
+            block = file.file.read(HASH_CHUNK_SIZE)
+            if not block:
+                break
+            handle.write(block)
+            if tee is not None:
+                tee.feed(block, handle.tell() - len(block))
+        size = handle.tell()
 
+    finish_upload(project_id, target_path, tee.finish(size) if tee else None)
     background_tasks.add_task(_process_project, project_id, str(target_path))
     return {"status": "processing", "project_id": project_id}
 
@@ -1027,6 +1397,7 @@ def upload_project_file(
 def retry_project_processing(
     project_id: str,
     background_tasks: BackgroundTasks,
+    regenerate: bool = Query(False),
     _: str = Depends(require_basic_auth),
 ) -> Project:
     try:
@@ -1047,7 +1418,8 @@ def retry_project_processing(
             detail="Uploaded video not found; re-upload required",
         )
 
-    estimate = _estimate_processing_seconds(record.duration_seconds)
+    estimate = estimate_processing_seconds(record.duration_seconds)
+    clear_storyboards(project_id)
     update_project(
         project_id,
         status="processing",
@@ -1055,19 +1427,35 @@ def retry_project_processing(
         processing_started_at=datetime.now(timezone.utc).isoformat(),
         processing_estimate_seconds=estimate,
         error_message=None,
-        storyboards_json=None,
-        storyboards_count=0,
-        frames_count=0,
         poster_candidates_json=None,
         poster_outputs_json=None,
         poster_url=None,
     )
 
-    background_tasks.add_task(_process_project, project_id, str(target_path))
+    background_tasks.add_task(
+        _process_project,
+        project_id,
+        str(target_path),
+        use_generation_cache=not regenerate,
+    )
     record = get_project(project_id, include_storyboards=False)
     return _project_to_model(record, include_storyboards=False)
 
 
+@router.delete("/projects/{project_id}/generation-cache")
+def invalidate_project_generation_cache(
+    project_id: str,
+    _: str = Depends(require_basic_auth),
+) -> dict:
+    try:
+        record = get_project(project_id, include_storyboards=False)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    removed = invalidate_generations(record.source_hash) if record.source_hash else 0
+    return {"status": "invalidated", "project_id": project_id, "removed": removed}
+
+
 @router.post("/projects/{project_id}/posters/generate", response_model=PosterWallResponse)
 def generate_project_posters(
     project_id: str,
@@ -1083,17 +1471,13 @@ def generate_project_posters(
         raise HTTPException(status_code=409, detail="Project is not ready yet")
 
     candidates = parse_poster_candidates(record) or []
-    posters = parse_poster_outputs(record) or []
 
     if not candidates:
         storyboards = parse_storyboards(record) or {}
         if storyboards and record.video_filename:
             video_path = get_project_dir(project_id) / record.video_filename
             if video_path.exists():
-                fps = int(os.getenv("KINO_FPS", "24"))
-                duration_seconds = record.duration_seconds
-                if duration_seconds <= 0:
-                    duration_seconds = probe_duration(str(video_path))
+                duration_seconds, fps = _media_profile(record, str(video_path))
                 candidates = _render_poster_candidates(
                     project_id,
                     video_path,
@@ -1132,8 +1516,47 @@ def generate_project_posters(
         size=payload.size,
         source_candidates=[candidate.get("id") for candidate in selected if candidate.get("id")],
     )
-    posters.extend(new_posters)
-    set_poster_outputs(project_id, posters)
+    append_poster_outputs(project_id, new_posters)
+    # Re-read so posters from generations that finished meanwhile are included.
+    posters = parse_poster_outputs(get_project(project_id, include_storyboards=False)) or []
+    return PosterWallResponse(project_id=project_id, candidates=candidates, posters=posters)
+
+
+@router.post("/projects/{project_id}/posters/candidates", response_model=PosterWallResponse)
+def refresh_project_poster_candidates(
+    project_id: str,
+    _: str = Depends(require_basic_auth),
+) -> PosterWallResponse:
+    try:
+        record = get_project(project_id, include_storyboards=False)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    if record.status != "ready":
+        raise HTTPException(status_code=409, detail="Project is not ready yet")
+    video_path = get_project_dir(project_id) / (record.video_filename or "")
+    if not record.video_filename or not video_path.exists():
+        raise HTTPException(status_code=404, detail="Uploaded video not found; re-upload required")
+
+    duration_seconds, fps = _media_profile(record, str(video_path))
+    try:
+        shot_log = _project_shot_log(record, video_path, duration_seconds)
+        raw_candidates = generate_poster_candidates_from_shot_log(shot_log)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+    candidates = _render_poster_candidates(
+        project_id,
+        video_path,
+        _build_poster_candidates(
+            {"poster_candidates": raw_candidates},
+            duration_seconds=duration_seconds,
+            fps=fps,
+        ),
+        fps=fps,
+    )
+    set_poster_candidates(project_id, candidates)
+    posters = parse_poster_outputs(get_project(project_id, include_storyboards=False)) or []
     return PosterWallResponse(project_id=project_id, candidates=candidates, posters=posters)
 
 
@@ -1148,10 +1571,9 @@ def delete_project_poster(
     except ValueError:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    posters = parse_poster_outputs(record) or []
     candidates = parse_poster_candidates(record) or []
 
-    poster = next((item for item in posters if item.get("id") == poster_id), None)
+    poster = remove_poster_output(project_id, poster_id)
     if not poster:
         raise HTTPException(status_code=404, detail="Poster not found")
 
@@ -1162,8 +1584,7 @@ def delete_project_poster(
         except FileNotFoundError:
             pass
 
-    posters = [item for item in posters if item.get("id") != poster_id]
-    set_poster_outputs(project_id, posters)
+    posters = parse_poster_outputs(get_project(project_id, include_storyboards=False)) or []
     return PosterWallResponse(project_id=project_id, candidates=candidates, posters=posters)
 
 
@@ -1178,9 +1599,16 @@ def delete_project_endpoint(
         raise HTTPException(status_code=404, detail="Project not found")
 
     delete_project(project_id)
+    delete_film_index(project_id)
+    delete_keyframe_index(project_id)
+    delete_media_info(project_id)
+    delete_project_sessions(project_id)
+    delete_project_exports(project_id)
     project_dir = get_project_dir(project_id)
     if project_dir.exists():
         shutil.rmtree(project_dir, ignore_errors=True)
+    # Shared films and renders stay until the last project using them is gone.
+    release_source(project_id)
     return {"status": "deleted", "project_id": project_id}
 
 
@@ -1192,66 +1620,311 @@ def create_storyboards(
     raise HTTPException(status_code=400, detail="Use the upload endpoint to process storyboards")
 
 
+def _regenerate_board(
+    record,
+    board_number: int,
+    boards: list[dict],
+    video_path: Path,
+    direction: str | None,
+    job: RegenerationJob,
+) -> None:
+    project_id = record.id
+    use_nvenc = bool_env("KINO_USE_NVENC")
+    duration_seconds, fps = _media_profile(record, str(video_path))
+
+    job.report("shot_log", 0.05)
+    shot_log = _project_shot_log(record, video_path, duration_seconds)
+    job.report("storyboard", 0.3)
+    board = regenerate_storyboard_from_shot_log(shot_log, boards, board_number - 1, direction=direction)
+
+    keyframes = get_keyframe_index(project_id)
+    scenes = [scene for scene in board.get("scenes", []) if isinstance(scene, dict)]
+    for scene in scenes:
+        _prepare_scene(scene, duration_seconds, fps, keyframes)
+    board["scenes"] = scenes
+
+    render_queue = _SceneRenderQueue(
+        project_id,
+        video_path,
+        fps=fps,
+        use_nvenc=use_nvenc,
+        render_workers=_render_workers(),
+        keyframes=keyframes,
+        source_hash=record.source_hash,
+    )
+    for scene_idx, scene in enumerate(scenes, start=1):
+        render_queue.submit(board_number, scene_idx, scene)
+    job.report("rendering", 0.4)
+    render_queue.drain(
+        {board_number: len(scenes)},
+        lambda done, total: job.report("rendering", 0.4 + 0.55 * done / total),
+    )
+
+    # The new cut may be shorter than the old one; drop the clips it no longer uses.
+    for root in (render_queue.clips_root, render_queue.thumbs_root):
+        for path in (root / f"board_{board_number}").glob("scene_*.*"):
+            try:
+                index = int(path.stem.split("_", 1)[1])
+            except ValueError:
+                continue
+            if index > len(scenes):
+                path.unlink(missing_ok=True)
+
+    replace_storyboard(project_id, board_number, board)
+    print(f"[Pipeline:{project_id}] Regenerated storyboard {board_number} from shot log.")
+
+
+@router.post("/projects/{project_id}/storyboards/{board_number}/regenerate", status_code=202)
+def regenerate_project_storyboard(
+    project_id: str,
+    board_number: int,
+    payload: StoryboardRegenerateRequest | None = None,
+    _: str = Depends(require_basic_auth),
+) -> dict:
+    try:
+        record = get_project(project_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    if record.status != "ready":
+        raise HTTPException(status_code=409, detail="Project is not ready yet")
+    # Gemini only needs the other boards' names and tones, so their scenes stay unread.
+    boards = list_storyboard_headers(project_id)
+    current = get_storyboard(project_id, board_number) if 1 <= board_number <= len(boards) else None
+    if current is None:
+        raise HTTPException(status_code=404, detail="Storyboard not found")
+    boards[board_number - 1] = current
+    video_path = get_project_dir(project_id) / (record.video_filename or "")
+    if not record.video_filename or not video_path.exists():
+        raise HTTPException(status_code=404, detail="Uploaded video not found; re-upload required")
+
+    direction = payload.direction if payload else None
+    # Poll GET /regenerations/{job_id} or listen for "regenerate" events on the project stream.
+    job = start_regeneration(
+        project_id,
+        board_number,
+        lambda job: _regenerate_board(record, board_number, boards, video_path, direction, job),
+    )
+    return job.snapshot()
+
+
+@router.get("/regenerations/{job_id}")
+def get_regeneration_status(
+    job_id: str,
+    _: str = Depends(require_basic_auth),
+) -> dict:
+    state = get_regeneration_state(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Regeneration not found")
+    return state
+
+
 @router.get("/projects/{project_id}/events")
-def stream_events(
+async def stream_events(
     project_id: str,
+    request: Request,
     _: str = Depends(require_basic_auth),
 ) -> StreamingResponse:
-    def event_stream() -> Iterator[str]:
-        yield f"event: status\ndata: {{\"project_id\": \"{project_id}\", \"stage\": \"connected\"}}\n\n"
+    async def event_stream() -> AsyncIterator[str]:
+        # Subscribed only once the response starts streaming, so a client that goes
+        # away before then leaves nothing registered.
+        subscription = None
+        try:
+            subscription = events.subscribe(project_id)
+            yield f"event: status\ndata: {{\"project_id\": \"{project_id}\", \"stage\": \"connected\"}}\n\n"
+            while not await request.is_disconnected():
+                item = await subscription.next(timeout=15)
+                if item is None:
+                    # Keeps proxies from closing an idle stream.
+                    yield ": keepalive\n\n"
+                    continue
+                event, data = item
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            if subscription is not None:
+                events.unsubscribe(project_id, subscription)
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
-@router.post("/exports")
-def request_export(
-    payload: ExportRequest,
-    _: str = Depends(require_basic_auth),
+def _trailer_command(
+    record,
+    scenes: list[dict],
+    assembly: VideoAssembly,
+    output_path: str,
+) -> tuple[list[str], float] | None:
+    """The single-encode cut of ``scenes`` from the source film, and its running time."""
+    if assembly.mode != "source" or not record.video_filename:
+        return None
+    source_path = get_project_dir(record.id) / record.video_filename
+    if not source_path.exists():
+        return None
+    info = load_or_probe_media_info(record.id, str(source_path))
+    fps = info.timecode_fps if info is not None else fallback_fps()
+    limit = info.duration_seconds if info is not None and info.duration_seconds > 0 else None
+    segments: list[tuple[float, float]] = []
+    for scene in scenes:
+        start_tc = Timecode.try_parse(scene.get("start_tc"), fps)
+        end_tc = Timecode.try_parse(scene.get("end_tc"), fps)
+        if start_tc is None or end_tc is None:
+            continue
+        start, end = start_tc.seconds, end_tc.seconds
+        if limit is not None:
+            end = min(end, limit)
+        if end > start:
+            segments.append((start, end))
+    if not segments:
+        return None
+    command = build_trailer_command(
+        str(source_path),
+        segments,
+        output_path,
+        has_audio=info is not None and info.audio_codec is not None,
+        crossfade_seconds=assembly.crossfade_seconds,
+        use_nvenc=bool_env("KINO_USE_NVENC"),
+    )
+    return command, sum(end - start for start, end in segments)
+
+
+def _export_inputs(
+    record,
+    export_format: str,
+    frames_payload: list[dict],
+    scenes: list[dict],
+    assembly: VideoAssembly | None = None,
 ) -> dict:
-    try:
-        record = get_project(payload.project_id)
-    except ValueError:
-        raise HTTPException(status_code=404, detail="Project not found")
+    format_key = export_format.lower()
+    inputs: dict = {"frames": frames_payload, "scenes": scenes}
+    if format_key not in {"edl", "xml", "pdf", "images", "video"} and not frames_payload:
+        inputs["storyboards"] = parse_storyboards(record)
+    if format_key == "edl":
+        media_info = get_media_info(record.id)
+        inputs["fps"] = media_info.timecode_fps if media_info is not None else fallback_fps()
+    trailer = None
+    if format_key == "video" and assembly is not None:
+        trailer = _trailer_command(record, scenes, assembly, "{output}")
+    if trailer is not None:
+        # Cut from the film: the exact command and the film it reads identify the output.
+        inputs["command"] = trailer[0]
+        inputs["source"] = asset_version(get_project_dir(record.id) / record.video_filename)
+    elif format_key in {"images", "pdf", "video"}:
+        field = "clip_url" if format_key == "video" else "thumbnail_url"
+        inputs["assets"] = [
+            asset_version(_normalize_media_path(record.id, scene.get(field))) for scene in scenes
+        ]
+    return inputs
+
+
+def _thumbnail_entries(record, scenes: list[dict], job: ExportJob | None = None) -> Iterator[tuple[str, Path | bytes]]:
+    added = 0
+    for idx, scene in enumerate(scenes, start=1):
+        if job is not None:
+            job.check()
+            job.report((idx - 1) / len(scenes))
+        thumb_path = _normalize_media_path(record.id, scene.get("thumbnail_url"))
+        if thumb_path and thumb_path.exists():
+            yield f"scene_{idx:03d}{thumb_path.suffix}", thumb_path
+            added += 1
+    if added == 0:
+        yield "README.txt", b"No thumbnails available for this export."
+
+
+def _contact_sheet_entries(record, scenes: list[dict], job: ExportJob | None = None) -> Iterator[SheetEntry]:
+    for idx, scene in enumerate(scenes, start=1):
+        if job is not None:
+            job.check()
+            job.report((idx - 1) / len(scenes))
+        thumb_path = _normalize_media_path(record.id, scene.get("thumbnail_url"))
+        yield SheetEntry(
+            heading=f"{idx:03d}  {scene.get('start_tc', '')} - {scene.get('end_tc', '')}",
+            description=scene.get("description") or "",
+            image_path=thumb_path if thumb_path and thumb_path.exists() else None,
+        )
 
-    export_dir = get_project_dir(payload.project_id) / "exports"
-    export_dir.mkdir(parents=True, exist_ok=True)
 
-    frames_payload = [_serialize_frame(frame) for frame in payload.frames] if payload.frames else []
-    scenes = _gather_scenes(record, frames_payload)
-    export_name = f"export_{payload.format}"
-    format_key = payload.format.lower()
+def _export_stream(record, format_key: str, scenes: list[dict], job: ExportJob | None = None) -> Iterator[bytes]:
+    """The bytes of an images or pdf export, produced as they are read and laid out."""
+    if format_key == "images":
+        return stream_zip(_thumbnail_entries(record, scenes, job))
+    return contact_sheet_pdf("KinoPro Storyboard Export", _contact_sheet_entries(record, scenes, job))
+
+
+def _scene_seconds(scene: dict) -> float:
+    duration = scene.get("duration_seconds")
+    if isinstance(duration, (int, float)) and duration > 0:
+        return float(duration)
+    return 0.0
 
+
+def _run_ffmpeg_with_progress(command: list[str], total_seconds: float, job: ExportJob | None) -> None:
+    """Run ffmpeg, turning its -progress output into job progress; killed on cancel."""
+    if job is None:
+        subprocess.run(command, check=True, capture_output=True)
+        return
+    command = [command[0], "-progress", "pipe:1", "-nostats", *command[1:]]
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, text=True)
+        job.attach(process)
+        try:
+            for line in process.stdout:
+                key, _, value = line.strip().partition("=")
+                # out_time_us (out_time_ms in older builds) is in microseconds.
+                if key in {"out_time_us", "out_time_ms"} and value.isdigit() and total_seconds > 0:
+                    job.report(int(value) / 1_000_000 / total_seconds)
+            returncode = process.wait()
+        finally:
+            job.attach(None)
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        job.check()
+        if returncode != 0:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(returncode, command, stderr=stderr.read())
+
+
+def _write_export(
+    record,
+    export_format: str,
+    frames_payload: list[dict],
+    scenes: list[dict],
+    export_path: Path,
+    job: ExportJob | None = None,
+    assembly: VideoAssembly | None = None,
+) -> None:
+    format_key = export_format.lower()
     if format_key == "json":
-        export_path = export_dir / f"{export_name}.json"
         export_payload = {
-            "project_id": payload.project_id,
-            "format": payload.format,
+            "project_id": record.id,
+            "format": export_format,
             "generated_at": datetime.now(timezone.utc).isoformat(),
             "frames": frames_payload,
-            "storyboards": parse_storyboards(record) if not payload.frames else None,
+            "storyboards": parse_storyboards(record) if not frames_payload else None,
         }
         export_path.write_text(json.dumps(export_payload, indent=2, default=str), encoding="utf-8")
     elif format_key == "edl":
-        export_path = export_dir / f"{export_name}.edl"
-        fps = int(os.getenv("KINO_FPS", "24"))
+        media_info = get_media_info(record.id)
+        fps = media_info.timecode_fps if media_info is not None else fallback_fps()
         lines = ["TITLE: KinoPro Export", "FCM: NON-DROP FRAME"]
+        rec_in = Timecode(0, fps)
         for idx, scene in enumerate(scenes, start=1):
-            start_tc = str(scene.get("start_tc") or "00:00:00.00").replace(".", ":")
-            end_tc = str(scene.get("end_tc") or "00:00:00.00").replace(".", ":")
-            src_in = start_tc
-            src_out = end_tc
-            rec_in = "00:00:00:00"
-            rec_out = end_tc if ":" in end_tc else f"00:00:{end_tc}"
-            lines.append(f"{idx:03d}  AX  V     C        {src_in} {src_out} {rec_in} {rec_out}")
+            src_in = Timecode.try_parse(scene.get("start_tc"), fps) or Timecode(0, fps)
+            src_out = max(Timecode.try_parse(scene.get("end_tc"), fps) or src_in, src_in)
+            # Record times lay the events end to end on the export timeline.
+            rec_out = rec_in + (src_out - src_in)
+            lines.append(
+                f"{idx:03d}  AX  V     C        "
+                f"{src_in.edl()} {src_out.edl()} {rec_in.edl()} {rec_out.edl()}"
+            )
+            rec_in = rec_out
             if scene.get("description"):
                 lines.append(f"* {scene.get('description')}")
         export_path.write_text("\n".join(lines), encoding="utf-8")
     elif format_key == "xml":
-        export_path = export_dir / f"{export_name}.xml"
         xml_lines = [
             "<?xml version=\"1.0\" encoding=\"UTF-8\"?>",
             "<storyboardExport>",
-            f"  <project id=\"{payload.project_id}\" generated_at=\"{datetime.now(timezone.utc).isoformat()}\">",
+            f"  <project id=\"{record.id}\" generated_at=\"{datetime.now(timezone.utc).isoformat()}\">",
         ]
         for scene in scenes:
             xml_lines.append(
@@ -1265,37 +1938,27 @@ def request_export(
         xml_lines.append("  </project>")
         xml_lines.append("</storyboardExport>")
         export_path.write_text("\n".join(xml_lines), encoding="utf-8")
-    elif format_key == "pdf":
-        export_path = export_dir / f"{export_name}.pdf"
-        lines = []
-        for scene in scenes:
-            lines.append(
-                f"{scene.get('start_tc', '')}-{scene.get('end_tc', '')} {scene.get('description', '')}"
-            )
-        _write_simple_pdf(export_path, "KinoPro Storyboard Export", lines)
-    elif format_key == "images":
-        export_path = export_dir / f"{export_name}.zip"
-        with zipfile.ZipFile(export_path, "w") as archive:
-            added = 0
-            for idx, scene in enumerate(scenes, start=1):
-                thumb_path = _normalize_media_path(payload.project_id, scene.get("thumbnail_url"))
-                if thumb_path and thumb_path.exists():
-                    archive.write(thumb_path, arcname=f"scene_{idx:03d}{thumb_path.suffix}")
-                    added += 1
-            if added == 0:
-                archive.writestr("README.txt", "No thumbnails available for this export.")
+    elif format_key in STREAMED_FORMATS:
+        with export_path.open("wb") as handle:
+            for chunk in _export_stream(record, format_key, scenes, job):
+                handle.write(chunk)
     elif format_key == "video":
-        export_path = export_dir / f"{export_name}.mp4"
+        trailer = _trailer_command(record, scenes, assembly, str(export_path)) if assembly is not None else None
         clip_paths = [
-            _normalize_media_path(payload.project_id, scene.get("clip_url"))
+            _normalize_media_path(record.id, scene.get("clip_url"))
             for scene in scenes
         ]
         clip_paths = [path for path in clip_paths if path and path.exists()]
-        if clip_paths:
-            list_path = export_dir / "concat_list.txt"
+        if trailer is not None:
+            # One encode straight from the film; scene clips need not exist.
+            command, total_seconds = trailer
+            _run_ffmpeg_with_progress(command, total_seconds, job)
+        elif clip_paths:
+            list_path = export_path.with_name(f".concat_{uuid.uuid4().hex[:8]}.txt")
             list_path.write_text("\n".join([f"file '{path.as_posix()}'" for path in clip_paths]), encoding="utf-8")
+            total_seconds = sum(_scene_seconds(scene) for scene in scenes)
             try:
-                subprocess.run(
+                _run_ffmpeg_with_progress(
                     [
                         "ffmpeg",
                         "-y",
@@ -1309,30 +1972,188 @@ def request_export(
                         "copy",
                         str(export_path),
                     ],
-                    check=True,
-                    capture_output=True,
+                    total_seconds,
+                    job,
                 )
             finally:
                 list_path.unlink(missing_ok=True)
         else:
             export_path.write_text("No clips available for export.", encoding="utf-8")
     else:
-        export_path = export_dir / f"{export_name}.json"
         export_payload = {
-            "project_id": payload.project_id,
-            "format": payload.format,
+            "project_id": record.id,
+            "format": export_format,
             "generated_at": datetime.now(timezone.utc).isoformat(),
             "frames": frames_payload,
-            "storyboards": parse_storyboards(record) if not payload.frames else None,
+            "storyboards": parse_storyboards(record) if not frames_payload else None,
         }
         export_path.write_text(json.dumps(export_payload, indent=2, default=str), encoding="utf-8")
 
+
+def _build_export(
+    record,
+    export_format: str,
+    frames_payload: list[dict],
+    scenes: list[dict],
+    key: str,
+    job: ExportJob | None = None,
+    assembly: VideoAssembly | None = None,
+) -> ExportArtifact:
+    format_key = export_format.lower()
+    export_dir = get_project_dir(record.id) / "exports"
+    export_dir.mkdir(parents=True, exist_ok=True)
+    filename = export_filename(format_key, key)
+    # Built under a temporary name, so a reader never sees half an artifact.
+    partial_path = export_dir / f".partial_{uuid.uuid4().hex[:8]}_{filename}"
+    try:
+        _write_export(record, export_format, frames_payload, scenes, partial_path, job, assembly)
+        os.replace(partial_path, export_dir / filename)
+    finally:
+        partial_path.unlink(missing_ok=True)
+    return record_export(record.id, format_key, key, filename, (export_dir / filename).stat().st_size)
+
+
+def _export_url(project_id: str) -> Callable[[str], str]:
+    return lambda filename: _media_url(project_id, f"exports/{filename}")
+
+
+def _start_export(
+    record,
+    export_format: str,
+    frames_payload: list[dict],
+    assembly: VideoAssembly | None = None,
+) -> ExportArtifact | ExportJob:
+    """The finished artifact for these inputs if it exists (or is quick to build), else its job."""
+    format_key = export_format.lower()
+    if format_key == "video" and assembly is None:
+        assembly = video_assembly()
+    scenes = _gather_scenes(record, frames_payload)
+    key = export_key(record.id, export_format, _export_inputs(record, export_format, frames_payload, scenes, assembly))
+    cached = find_export(record.id, key)
+    if cached is not None:
+        return cached
+    if format_key not in BACKGROUND_FORMATS:
+        return _build_export(record, export_format, frames_payload, scenes, key)
+    return start_export_job(
+        record.id,
+        format_key,
+        key,
+        lambda job: _build_export(record, export_format, frames_payload, scenes, key, job, assembly),
+        _export_url(record.id),
+    )
+
+
+def _prebuild_exports(project_id: str) -> None:
+    try:
+        record = get_project(project_id)
+    except ValueError:
+        return
+    for export_format in prebuild_formats():
+        try:
+            result = _start_export(record, export_format, [])
+        except Exception as exc:
+            print(f"[Pipeline:{project_id}] Pre-building {export_format} export failed: {exc}")
+            continue
+        if isinstance(result, ExportArtifact):
+            print(f"[Pipeline:{project_id}] Pre-built {export_format} export.")
+
+
+def _export_state_response(state: dict) -> dict:
+    filename = state.pop("filename", None)
+    if filename:
+        state["download_url"] = _media_url(state["project_id"], f"exports/{filename}")
+    return state
+
+
+@router.post("/exports")
+def request_export(
+    payload: ExportRequest,
+    response: Response,
+    _: str = Depends(require_basic_auth),
+) -> dict:
+    try:
+        record = get_project(payload.project_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    frames_payload = [_serialize_frame(frame) for frame in payload.frames] if payload.frames else []
+    assembly = None
+    if payload.format.lower() == "video":
+        try:
+            assembly = video_assembly(payload.assembly, payload.crossfade_seconds)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    result = _start_export(record, payload.format, frames_payload, assembly)
+    if isinstance(result, ExportJob):
+        # Poll GET /exports/{job_id} or listen for "export" events on the project stream.
+        response.status_code = 202
+        return {**result.snapshot(), "format": payload.format}
     return {
         "status": "ready",
+        "job_id": result.id,
         "project_id": payload.project_id,
         "format": payload.format,
+        "progress": 100,
         "download_url": _media_url(
             payload.project_id,
-            f"exports/{export_path.name}",
+            f"exports/{result.filename}",
         ),
     }
+
+
+_STREAM_MEDIA_TYPES = {"images": "application/zip", "pdf": "application/pdf"}
+
+
+@router.post("/exports/stream")
+def stream_export(
+    payload: ExportRequest,
+    _: str = Depends(require_basic_auth),
+) -> Response:
+    """Send an images or pdf export as it is built, without writing it to exports/."""
+    try:
+        record = get_project(payload.project_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Project not found")
+    format_key = payload.format.lower()
+    if format_key not in STREAMED_FORMATS:
+        raise HTTPException(status_code=400, detail="Only images and pdf exports can be streamed")
+
+    frames_payload = [_serialize_frame(frame) for frame in payload.frames] if payload.frames else []
+    scenes = _gather_scenes(record, frames_payload)
+    stem = re.sub(r"[^A-Za-z0-9_-]+", "_", record.name).strip("_") or record.id
+    headers = {"Content-Disposition": f'attachment; filename="{stem}.{export_extension(format_key)}"'}
+    media_type = _STREAM_MEDIA_TYPES[format_key]
+    key = export_key(record.id, payload.format, _export_inputs(record, payload.format, frames_payload, scenes))
+    cached = find_export(record.id, key)
+    if cached is not None:
+        return FileResponse(
+            get_project_dir(record.id) / "exports" / cached.filename,
+            media_type=media_type,
+            headers=headers,
+        )
+    return StreamingResponse(_export_stream(record, format_key, scenes), media_type=media_type, headers=headers)
+
+
+@router.get("/exports/{job_id}")
+def get_export_status(
+    job_id: str,
+    _: str = Depends(require_basic_auth),
+) -> dict:
+    state = get_export_state(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return _export_state_response(state)
+
+
+@router.delete("/exports/{job_id}")
+def cancel_export(
+    job_id: str,
+    _: str = Depends(require_basic_auth),
+) -> dict:
+    job = get_export_job(job_id)
+    if job is None:
+        if get_export_state(job_id) is None:
+            raise HTTPException(status_code=404, detail="Export not found")
+        raise HTTPException(status_code=409, detail="Export is no longer running")
+    job.cancel()
+    return {**job.snapshot(), "status": "cancelling" if job.status == "running" else job.status}
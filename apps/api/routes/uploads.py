@@ -1,7 +1,30 @@
-from fastapi import APIRouter, Depends, File, UploadFile
+import os
+import re
+import shutil
 
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+from models.upload import UploadSessionCreate, UploadSessionResponse
 from routes.auth import require_basic_auth
-from services.storage import get_project_dir
+from services.ingest import UploadTee, finish_tee, get_tee
+from services.projects import get_project
+from services.storage import HASH_CHUNK_SIZE, get_project_dir
+from services.uploads import (
+    WRITE_BLOCK_SIZE,
+    UploadSession,
+    begin_upload,
+    chunk_size_bytes,
+    create_session,
+    delete_session,
+    finish_upload,
+    get_session,
+    process_source,
+    record_received,
+    safe_filename,
+    write_at,
+)
 
 router = APIRouter(tags=["uploads"])
 
@@ -9,6 +32,16 @@ router = APIRouter(tags=["uploads"])
 # from uploadthing import UploadThingClient
 # uploadthing = UploadThingClient(api_key=os.getenv("UPLOADTHING_SECRET"))
 
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+# Uploads with a chunk in flight; a second writer for the same session gets a 409.
+_writing: set[str] = set()
+
+
+def _write_block(fd: int, data: bytes, position: int, tee: UploadTee | None) -> None:
+    write_at(fd, data, position)
+    if tee is not None:
+        tee.feed(data, position)
+
 
 @router.post("/uploads/{project_id}")
 def upload_file(
@@ -16,8 +49,163 @@ def upload_file(
     file: UploadFile = File(...),
     _: str = Depends(require_basic_auth),
 ) -> dict:
-    project_dir = get_project_dir(project_id)
-    target_path = project_dir / file.filename
+    try:
+        filename = safe_filename(file.filename or "")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    target_path = get_project_dir(project_id) / filename
     with target_path.open("wb") as handle:
-        handle.write(file.file.read())
+        shutil.copyfileobj(file.file, handle, HASH_CHUNK_SIZE)
     return {"status": "stored", "path": str(target_path)}
+
+
+def _session_response(session: UploadSession, response: Response, status: str | None = None) -> UploadSessionResponse:
+    response.headers["Upload-Offset"] = str(session.received_bytes)
+    return UploadSessionResponse(
+        upload_id=session.id,
+        project_id=session.project_id,
+        filename=session.filename,
+        size=session.size_bytes,
+        offset=session.received_bytes,
+        chunk_size=chunk_size_bytes(),
+        status=status or ("complete" if session.complete else "uploading"),
+    )
+
+
+def _load_session(project_id: str, upload_id: str) -> UploadSession:
+    try:
+        return get_session(project_id, upload_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+
+@router.post("/projects/{project_id}/uploads", response_model=UploadSessionResponse, status_code=201)
+def create_upload_session(
+    project_id: str,
+    payload: UploadSessionCreate,
+    response: Response,
+    _: str = Depends(require_basic_auth),
+) -> UploadSessionResponse:
+    try:
+        get_project(project_id, include_storyboards=False)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Project not found")
+    try:
+        session = create_session(project_id, payload.filename, payload.size)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except OSError as exc:
+        raise HTTPException(status_code=507, detail=f"Could not reserve space for the upload: {exc}")
+    begin_upload(project_id, session.filename)
+    return _session_response(session, response)
+
+
+@router.get("/projects/{project_id}/uploads/{upload_id}", response_model=UploadSessionResponse)
+def get_upload_session(
+    project_id: str,
+    upload_id: str,
+    response: Response,
+    _: str = Depends(require_basic_auth),
+) -> UploadSessionResponse:
+    return _session_response(_load_session(project_id, upload_id), response)
+
+
+@router.put("/projects/{project_id}/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def upload_chunk(
+    project_id: str,
+    upload_id: str,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    _: str = Depends(require_basic_auth),
+) -> UploadSessionResponse:
+    if upload_id in _writing:
+        raise HTTPException(status_code=409, detail="Another chunk is being written to this upload")
+    _writing.add(upload_id)
+    try:
+        position = await _receive_chunk(project_id, upload_id, request)
+    finally:
+        _writing.discard(upload_id)
+
+    session = await run_in_threadpool(_load_session, project_id, upload_id)
+    if position is not None:
+        raise HTTPException(
+            status_code=400,
+            detail="Chunk body is shorter than its Content-Range",
+            headers={"Upload-Offset": str(session.received_bytes)},
+        )
+    if not session.complete:
+        return _session_response(session, response)
+
+    ingest = await run_in_threadpool(finish_tee, upload_id, session.size_bytes)
+    target_path = get_project_dir(project_id) / session.filename
+    os.replace(session.part_path, target_path)
+    await run_in_threadpool(delete_session, session, False)
+    await run_in_threadpool(finish_upload, project_id, target_path, ingest)
+    background_tasks.add_task(process_source, project_id, str(target_path))
+    return _session_response(session, response, status="processing")
+
+
+async def _receive_chunk(project_id: str, upload_id: str, request: Request) -> int | None:
+    """Write one Content-Range chunk; returns the offset reached if the body ended early."""
+    session = await run_in_threadpool(_load_session, project_id, upload_id)
+    match = _CONTENT_RANGE.match(request.headers.get("content-range", ""))
+    if not match:
+        raise HTTPException(status_code=400, detail="Content-Range must be 'bytes start-end/size'")
+    start, end, total = (int(value) for value in match.groups())
+    if total != session.size_bytes or end < start or end >= total:
+        raise HTTPException(status_code=416, detail="Content-Range does not match the upload")
+    if end - start + 1 > chunk_size_bytes():
+        raise HTTPException(status_code=413, detail="Chunk is larger than the upload chunk size")
+    if start != session.received_bytes:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload is at offset {session.received_bytes}",
+            headers={"Upload-Offset": str(session.received_bytes)},
+        )
+
+    tee = get_tee(upload_id)
+    fd = os.open(session.part_path, os.O_WRONLY)
+    position = start
+    pending = bytearray()
+    try:
+        # At most one write block is held in memory; the rest goes straight to disk
+        # at its final offset.
+        try:
+            async for piece in request.stream():
+                if position + len(pending) + len(piece) > end + 1:
+                    raise HTTPException(status_code=400, detail="Chunk body is longer than its Content-Range")
+                pending += piece
+                if len(pending) >= WRITE_BLOCK_SIZE:
+                    await run_in_threadpool(_write_block, fd, bytes(pending), position, tee)
+                    position += len(pending)
+                    pending.clear()
+        except ClientDisconnect:
+            pass
+        if pending:
+            await run_in_threadpool(_write_block, fd, bytes(pending), position, tee)
+            position += len(pending)
+            pending.clear()
+    finally:
+        os.close(fd)
+        # Whatever arrived is kept, so a dropped connection resumes from here.
+        recorded = position == start or await run_in_threadpool(record_received, upload_id, start, position)
+    if not recorded:
+        # Another worker moved the offset while this chunk was being written.
+        session = await run_in_threadpool(_load_session, project_id, upload_id)
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload is at offset {session.received_bytes}",
+            headers={"Upload-Offset": str(session.received_bytes)},
+        )
+    return None if position == end + 1 else position
+
+
+@router.delete("/projects/{project_id}/uploads/{upload_id}")
+def abort_upload_session(
+    project_id: str,
+    upload_id: str,
+    _: str = Depends(require_basic_auth),
+) -> dict:
+    delete_session(_load_session(project_id, upload_id))
+    return {"status": "aborted", "upload_id": upload_id}
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import base64
 import hashlib
+import hmac
+import json
 import os
 import secrets
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 
 from db import get_connection
@@ -14,18 +20,41 @@ class User:
     username: str
 
 
-def ensure_users_table() -> None:
-    with get_connection() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                username TEXT PRIMARY KEY,
-                password_hash TEXT NOT NULL,
-                salt TEXT NOT NULL
-            )
-            """
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+_MIN_SESSION_SECRET_BYTES = 32
+_PLACEHOLDER_SECRETS = {"change_me", "changeme", "secret", "example", "placeholder"}
+
+
+def _load_session_secret() -> bytes:
+    # Without a usable KINO_SESSION_SECRET tokens are signed with a per-process key,
+    # so they stop working when the API restarts (clients fall back to logging in
+    # again). A placeholder or short value would let anyone forge tokens, so it is
+    # treated as unset rather than trusted.
+    raw = os.getenv("KINO_SESSION_SECRET") or ""
+    if not raw:
+        return secrets.token_bytes(32)
+    if raw.strip().lower() in _PLACEHOLDER_SECRETS or len(raw.encode("utf-8")) < _MIN_SESSION_SECRET_BYTES:
+        print(
+            f"[Auth] KINO_SESSION_SECRET is a placeholder or shorter than {_MIN_SESSION_SECRET_BYTES} bytes; "
+            "ignoring it and signing sessions with a per-process key"
         )
-        conn.commit()
+        return secrets.token_bytes(32)
+    return raw.encode("utf-8")
+
+
+_session_secret = _load_session_secret()
+# Keys the credential cache; never leaves the process.
+_cache_key = secrets.token_bytes(32)
+
+_verified: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+_verified_lock = threading.Lock()
+_VERIFIED_MAX = 1024
 
 
 def hash_password(password: str, salt: bytes | None = None) -> tuple[str, str]:
@@ -35,7 +64,6 @@ def hash_password(password: str, salt: bytes | None = None) -> tuple[str, str]:
 
 
 def create_user(username: str, password: str) -> User:
-    ensure_users_table()
     password_hash, salt = hash_password(password)
     with get_connection() as conn:
         conn.execute(
@@ -47,7 +75,6 @@ def create_user(username: str, password: str) -> User:
 
 
 def authenticate_user(username: str, password: str) -> User | None:
-    ensure_users_table()
     with get_connection() as conn:
         row = conn.execute(
             "SELECT username, password_hash, salt FROM users WHERE username = ?",
@@ -63,7 +90,6 @@ def authenticate_user(username: str, password: str) -> User | None:
 
 
 def user_exists(username: str) -> bool:
-    ensure_users_table()
     with get_connection() as conn:
         row = conn.execute(
             "SELECT username FROM users WHERE username = ?",
@@ -73,10 +99,94 @@ def user_exists(username: str) -> bool:
 
 
 def update_password(username: str, password: str) -> None:
+    """Set a new password; session tokens issued before it stop working."""
     password_hash, salt = hash_password(password)
     with get_connection() as conn:
         conn.execute(
-            "UPDATE users SET password_hash = ?, salt = ? WHERE username = ?",
+            "UPDATE users SET password_hash = ?, salt = ?, token_version = token_version + 1 WHERE username = ?",
             (password_hash, salt, username),
         )
         conn.commit()
+    forget_verified(username)
+
+
+def _credentials_key(username: str, password: str) -> bytes:
+    message = username.encode("utf-8") + b"\0" + password.encode("utf-8")
+    return hmac.new(_cache_key, message, hashlib.sha256).digest()
+
+
+def cached_user(username: str, password: str) -> str | None:
+    """Username for credentials verified within KINO_AUTH_CACHE_SECONDS, without hashing."""
+    key = _credentials_key(username, password)
+    with _verified_lock:
+        entry = _verified.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del _verified[key]
+            return None
+        return entry[0]
+
+
+def authenticate_user_cached(username: str, password: str) -> User | None:
+    """authenticate_user, remembering successful checks for a short while."""
+    ttl = _int_env("KINO_AUTH_CACHE_SECONDS", 300)
+    user = authenticate_user(username, password)
+    if user and ttl > 0:
+        with _verified_lock:
+            _verified[_credentials_key(username, password)] = (user.username, time.monotonic() + ttl)
+            while len(_verified) > _VERIFIED_MAX:
+                _verified.popitem(last=False)
+    return user
+
+
+def forget_verified(username: str) -> None:
+    with _verified_lock:
+        for key in [key for key, entry in _verified.items() if entry[0] == username]:
+            del _verified[key]
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _token_version(username: str) -> int | None:
+    with get_connection() as conn:
+        row = conn.execute("SELECT token_version FROM users WHERE username = ?", (username,)).fetchone()
+    return int(row["token_version"]) if row is not None else None
+
+
+def issue_session_token(username: str) -> tuple[str, int]:
+    """A signed ``payload.signature`` token for ``username``; returns (token, expires_at)."""
+    expires_at = int(time.time()) + max(60, _int_env("KINO_SESSION_TTL_SECONDS", 43_200))
+    claims = {"sub": username, "exp": expires_at, "ver": _token_version(username) or 0}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    signature = hmac.new(_session_secret, payload.encode("ascii"), hashlib.sha256).digest()
+    return f"{payload}.{_b64encode(signature)}", expires_at
+
+
+def verify_session_token(token: str) -> str | None:
+    """The username a valid, unexpired token was issued to, else None."""
+    payload, _, signature = token.partition(".")
+    if not payload or not signature:
+        return None
+    expected = hmac.new(_session_secret, payload.encode("ascii", "replace"), hashlib.sha256).digest()
+    try:
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(claims, dict) or not isinstance(claims.get("sub"), str):
+        return None
+    if not isinstance(claims.get("exp"), int) or claims["exp"] <= time.time():
+        return None
+    # A password change (or a deleted user) revokes every token issued before it.
+    version = _token_version(claims["sub"])
+    if version is None or claims.get("ver") != version:
+        return None
+    return claims["sub"]
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+import os
+
+
+def bool_env(name: str, default: bool = False) -> bool:
+    """An on/off setting: 1/true/yes/on enable it, anything else set disables it."""
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
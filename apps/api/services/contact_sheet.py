@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import subprocess
+import textwrap
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# A multi-page PDF contact sheet written as a stream: each page's thumbnails, content
+# and page object are sent as soon as that page is laid out, and the page tree,
+# catalog and cross-reference table (which only need object offsets) go out last.
+# Thumbnails are embedded as JPEG (DCTDecode), which PDF readers decode natively.
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN = 36
+HEADER_HEIGHT = 28
+COLUMNS, ROWS = 2, 4
+GUTTER = 18
+CELL_WIDTH = (PAGE_WIDTH - 2 * MARGIN - (COLUMNS - 1) * GUTTER) / COLUMNS
+CELL_HEIGHT = (PAGE_HEIGHT - 2 * MARGIN - HEADER_HEIGHT) / ROWS
+IMAGE_HEIGHT = 128
+THUMBNAIL_WIDTH = 480
+
+_CATALOG, _PAGES, _FONT, _BOLD_FONT = 1, 2, 3, 4
+
+
+@dataclass(frozen=True)
+class SheetEntry:
+    heading: str
+    description: str
+    image_path: Path | None = None
+
+
+def _jpeg_size(data: bytes) -> tuple[int, int, int] | None:
+    """Width, height and component count from a JPEG's start-of-frame marker."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    position = 2
+    while position + 9 < len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in {0xC4, 0xC8, 0xCC}:
+            height = int.from_bytes(data[position + 5 : position + 7], "big")
+            width = int.from_bytes(data[position + 7 : position + 9], "big")
+            return width, height, data[position + 9]
+        position += 2 + int.from_bytes(data[position + 2 : position + 4], "big")
+    return None
+
+
+def _encode_jpeg(path: Path) -> bytes | None:
+    if path.suffix.lower() in {".jpg", ".jpeg"}:
+        return path.read_bytes()
+    try:
+        import cv2  # type: ignore
+    except ImportError:
+        cv2 = None
+    if cv2 is not None:
+        image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if image is None:
+            return None
+        height, width = image.shape[:2]
+        if width > THUMBNAIL_WIDTH:
+            size = (THUMBNAIL_WIDTH, max(1, round(height * THUMBNAIL_WIDTH / width)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        return encoded.tobytes() if ok else None
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg",
+                "-v",
+                "error",
+                "-i",
+                str(path),
+                "-frames:v",
+                "1",
+                "-vf",
+                f"scale='min({THUMBNAIL_WIDTH},iw)':-2",
+                "-c:v",
+                "mjpeg",
+                "-q:v",
+                "4",
+                "-f",
+                "image2pipe",
+                "pipe:1",
+            ],
+            check=True,
+            capture_output=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout
+
+
+def thumbnail_jpeg(path: Path) -> tuple[bytes, int, int, int] | None:
+    """The thumbnail as JPEG bytes with its width, height and components, if readable."""
+    try:
+        data = _encode_jpeg(path)
+    except OSError:
+        return None
+    size = _jpeg_size(data) if data else None
+    if size is None:
+        return None
+    return (data, *size)
+
+
+def _text(value: str) -> str:
+    # The standard fonts are WinAnsi; anything else becomes '?'.
+    value = value.encode("cp1252", "replace").decode("cp1252")
+    return value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.offset = 0
+        self.offsets: dict[int, int] = {}
+        self.next_number = _BOLD_FONT + 1
+
+    def allocate(self) -> int:
+        number = self.next_number
+        self.next_number += 1
+        return number
+
+    def raw(self, data: bytes) -> bytes:
+        self.offset += len(data)
+        return data
+
+    def obj(self, number: int, body: bytes, stream: bytes | None = None) -> bytes:
+        self.offsets[number] = self.offset
+        parts = [f"{number} 0 obj\n".encode(), body]
+        if stream is not None:
+            parts += [b"\nstream\n", stream, b"\nendstream"]
+        parts.append(b"\nendobj\n")
+        return self.raw(b"".join(parts))
+
+    def trailer(self) -> bytes:
+        size = self.next_number
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[number]:010d} 00000 n \n" for number in range(1, size)]
+        lines.append(f"trailer\n<< /Size {size} /Root {_CATALOG} 0 R >>\nstartxref\n{self.offset}\n%%EOF\n")
+        return self.raw("".join(lines).encode("ascii"))
+
+
+def _page(writer: _Writer, title: str, page_number: int, entries: list[SheetEntry], kids: list[int]) -> Iterator[bytes]:
+    ops = [
+        f"BT /F2 14 Tf {MARGIN} {PAGE_HEIGHT - MARGIN - 14} Td ({_text(title)}) Tj ET",
+        f"BT /F1 9 Tf {PAGE_WIDTH - MARGIN - 40} {PAGE_HEIGHT - MARGIN - 14} Td (Page {page_number}) Tj ET",
+    ]
+    images: list[tuple[str, int]] = []
+    for slot, entry in enumerate(entries):
+        column, row = slot % COLUMNS, slot // COLUMNS
+        x = MARGIN + column * (CELL_WIDTH + GUTTER)
+        top = PAGE_HEIGHT - MARGIN - HEADER_HEIGHT - row * CELL_HEIGHT
+        thumbnail = thumbnail_jpeg(entry.image_path) if entry.image_path is not None else None
+        if thumbnail is not None:
+            data, width, height, components = thumbnail
+            number = writer.allocate()
+            color_space = {1: "/DeviceGray", 4: "/DeviceCMYK"}.get(components, "/DeviceRGB")
+            yield writer.obj(
+                number,
+                (
+                    f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                    f"/ColorSpace {color_space} /BitsPerComponent 8 /Filter /DCTDecode /Length {len(data)} >>"
+                ).encode("ascii"),
+                data,
+            )
+            name = f"Im{slot}"
+            images.append((name, number))
+            scale = min(CELL_WIDTH / width, IMAGE_HEIGHT / height)
+            drawn_width, drawn_height = width * scale, height * scale
+            ops.append(f"q {drawn_width:.2f} 0 0 {drawn_height:.2f} {x:.2f} {top - drawn_height:.2f} cm /{name} Do Q")
+        else:
+            ops.append(f"0.85 g {x:.2f} {top - IMAGE_HEIGHT:.2f} {CELL_WIDTH:.2f} {IMAGE_HEIGHT} re f 0 g")
+        text_top = top - IMAGE_HEIGHT - 12
+        ops.append(f"BT /F2 9 Tf {x:.2f} {text_top:.2f} Td ({_text(entry.heading)}) Tj ET")
+        lines = textwrap.wrap(entry.description or "", width=56, max_lines=2, placeholder="...")
+        for index, line in enumerate(lines, start=1):
+            ops.append(f"BT /F1 8 Tf {x:.2f} {text_top - 11 * index:.2f} Td ({_text(line)}) Tj ET")
+
+    content = "\n".join(ops).encode("cp1252", "replace")
+    content_number = writer.allocate()
+    yield writer.obj(content_number, f"<< /Length {len(content)} >>".encode("ascii"), content)
+    xobjects = " ".join(f"/{name} {number} 0 R" for name, number in images)
+    page_object = writer.allocate()
+    yield writer.obj(
+        page_object,
+        (
+            f"<< /Type /Page /Parent {_PAGES} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Contents {content_number} 0 R /Resources << /Font << /F1 {_FONT} 0 R /F2 {_BOLD_FONT} 0 R >> "
+            f"/XObject << {xobjects} >> >> >>"
+        ).encode("ascii"),
+    )
+    kids.append(page_object)
+
+
+def contact_sheet_pdf(title: str, entries: Iterable[SheetEntry]) -> Iterator[bytes]:
+    """Yield a contact sheet PDF, COLUMNS x ROWS scenes per page, as it is written."""
+    writer = _Writer()
+    yield writer.raw(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    yield writer.obj(_FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    yield writer.obj(_BOLD_FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+    kids: list[int] = []
+    pending: list[SheetEntry] = []
+    for entry in entries:
+        pending.append(entry)
+        if len(pending) == COLUMNS * ROWS:
+            yield from _page(writer, title, len(kids) + 1, pending, kids)
+            pending = []
+    if pending or not kids:
+        yield from _page(writer, title, len(kids) + 1, pending, kids)
+    page_refs = " ".join(f"{number} 0 R" for number in kids)
+    yield writer.obj(_PAGES, f"<< /Type /Pages /Kids [{page_refs}] /Count {len(kids)} >>".encode("ascii"))
+    yield writer.obj(_CATALOG, f"<< /Type /Catalog /Pages {_PAGES} 0 R >>".encode("ascii"))
+    yield writer.trailer()
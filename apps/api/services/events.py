@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any
+
+# In-process fan-out behind GET /projects/{id}/events. Publishers are worker
+# threads; each subscriber is an SSE response waiting on its event loop, so events
+# are handed over with call_soon_threadsafe.
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[tuple[str, dict]] = asyncio.Queue()
+
+    async def next(self, timeout: float) -> tuple[str, dict] | None:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+_subscribers: dict[str, set[Subscription]] = {}
+_lock = threading.Lock()
+
+
+def subscribe(project_id: str) -> Subscription:
+    """Must be called from the event loop that will read the subscription."""
+    subscription = Subscription(asyncio.get_running_loop())
+    with _lock:
+        _subscribers.setdefault(project_id, set()).add(subscription)
+    return subscription
+
+
+def unsubscribe(project_id: str, subscription: Subscription) -> None:
+    with _lock:
+        subscribers = _subscribers.get(project_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del _subscribers[project_id]
+
+
+def publish(project_id: str, event: str, data: dict[str, Any]) -> None:
+    with _lock:
+        subscribers = list(_subscribers.get(project_id, ()))
+    for subscription in subscribers:
+        try:
+            subscription.loop.call_soon_threadsafe(subscription.queue.put_nowait, (event, data))
+        except RuntimeError:
+            # Loop already closed; the response is gone and will unsubscribe.
+            pass
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from db import get_connection
+from services import events
+from services.storage import get_project_dir
+
+# Export artifacts are named after a hash of everything that goes into them (the
+# selected scenes, format, storyboards and the versions of the clips/thumbnails they
+# include), so an identical request is answered with the file already on disk.
+# Bump when the output of an exporter changes.
+EXPORT_VERSION = 2
+
+EXPORT_EXTENSIONS = {
+    "json": "json",
+    "edl": "edl",
+    "xml": "xml",
+    "pdf": "pdf",
+    "images": "zip",
+    "video": "mp4",
+}
+
+
+# Formats slow enough to build as background jobs; the rest are built in the request.
+BACKGROUND_FORMATS = {"images", "pdf", "video"}
+# Formats that can also be sent straight to the client as they are produced.
+STREAMED_FORMATS = {"images", "pdf"}
+
+
+@dataclass(frozen=True)
+class ExportArtifact:
+    id: str
+    project_id: str
+    format: str
+    filename: str
+    size_bytes: int
+
+
+def export_extension(format_key: str) -> str:
+    return EXPORT_EXTENSIONS.get(format_key, "json")
+
+
+def _keep_per_format() -> int:
+    try:
+        return max(1, int(os.getenv("KINO_EXPORT_KEEP", "3")))
+    except ValueError:
+        return 3
+
+
+def prebuild_formats() -> list[str]:
+    raw = os.getenv("KINO_EXPORT_PREBUILD", "")
+    return [item.strip().lower() for item in raw.split(",") if item.strip()]
+
+
+VIDEO_ASSEMBLY_MODES = {"source", "clips"}
+
+
+@dataclass(frozen=True)
+class VideoAssembly:
+    # "source" cuts the trailer from the film in one encode; "clips" joins the
+    # rendered scene clips without re-encoding.
+    mode: str
+    crossfade_seconds: float
+
+
+def video_assembly(mode: str | None = None, crossfade_seconds: float | None = None) -> VideoAssembly:
+    """How a video export is put together: the request's choice, else the configured default."""
+    if mode is None:
+        mode = os.getenv("KINO_VIDEO_ASSEMBLY", "source").strip().lower()
+        if mode not in VIDEO_ASSEMBLY_MODES:
+            mode = "source"
+    mode = mode.strip().lower()
+    if mode not in VIDEO_ASSEMBLY_MODES:
+        raise ValueError(f"Unknown video assembly '{mode}'; expected one of: source, clips")
+    if crossfade_seconds is None:
+        try:
+            crossfade_seconds = float(os.getenv("KINO_VIDEO_CROSSFADE_SECONDS", "0"))
+        except ValueError:
+            crossfade_seconds = 0.0
+    return VideoAssembly(mode=mode, crossfade_seconds=max(0.0, crossfade_seconds))
+
+
+def asset_version(path: Path | None) -> list | None:
+    """What identifies a rendered file's contents; a re-render changes it."""
+    if path is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [path.name, stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def export_key(project_id: str, export_format: str, inputs: dict) -> str:
+    raw = json.dumps([EXPORT_VERSION, project_id, export_format, inputs], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def export_filename(format_key: str, key: str) -> str:
+    return f"export_{format_key}_{key[:16]}.{export_extension(format_key)}"
+
+
+def _export_id(key: str) -> str:
+    return f"exp_{key[:32]}"
+
+
+def _row_to_artifact(row) -> ExportArtifact:
+    details = json.loads(row["payload"] or "{}")
+    return ExportArtifact(
+        id=row["id"],
+        project_id=row["project_id"],
+        format=row["format"],
+        filename=details.get("filename", ""),
+        size_bytes=int(details.get("size_bytes") or 0),
+    )
+
+
+def find_export(project_id: str, key: str) -> ExportArtifact | None:
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT * FROM exports WHERE id = ? AND project_id = ? AND status = 'ready'",
+            (_export_id(key), project_id),
+        ).fetchone()
+    if row is None:
+        return None
+    artifact = _row_to_artifact(row)
+    path = get_project_dir(project_id) / "exports" / artifact.filename
+    if not artifact.filename or not path.exists():
+        return None
+    return artifact
+
+
+def record_export(project_id: str, format_key: str, key: str, filename: str, size_bytes: int) -> ExportArtifact:
+    """Remember a finished artifact and drop the oldest ones of the same format."""
+    artifact = ExportArtifact(
+        id=_export_id(key),
+        project_id=project_id,
+        format=format_key,
+        filename=filename,
+        size_bytes=size_bytes,
+    )
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO exports (id, project_id, format, status, payload, created_at)
+            VALUES (?, ?, ?, 'ready', ?, ?)
+            """,
+            (
+                artifact.id,
+                project_id,
+                format_key,
+                json.dumps({"filename": filename, "size_bytes": size_bytes, "cache_key": key}),
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        stale = conn.execute(
+            """
+            SELECT * FROM exports WHERE project_id = ? AND format = ? AND status = 'ready'
+            ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            """,
+            (project_id, format_key, _keep_per_format()),
+        ).fetchall()
+        conn.executemany("DELETE FROM exports WHERE id = ?", [(row["id"],) for row in stale])
+        conn.commit()
+    export_dir = get_project_dir(project_id) / "exports"
+    for row in stale:
+        name = _row_to_artifact(row).filename
+        if name and name != filename:
+            (export_dir / name).unlink(missing_ok=True)
+    return artifact
+
+
+def delete_project_exports(project_id: str) -> None:
+    with get_connection() as conn:
+        conn.execute("DELETE FROM exports WHERE project_id = ?", (project_id,))
+        conn.commit()
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportJob:
+    """A queued or running export; progress and cancellation live here, state in the row."""
+
+    def __init__(self, project_id: str, format_key: str, key: str, url_for: Callable[[str], str]) -> None:
+        self.id = _export_id(key)
+        self.project_id = project_id
+        self.format = format_key
+        self.key = key
+        self.status = "queued"
+        self.progress = 0
+        self.error: str | None = None
+        self.filename: str | None = None
+        self._url_for = url_for
+        self._cancelled = threading.Event()
+        self._process: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise ExportCancelled()
+
+    def report(self, fraction: float) -> None:
+        progress = max(0, min(99, int(fraction * 100)))
+        if progress != self.progress:
+            self.progress = progress
+            self._publish()
+
+    def attach(self, process: subprocess.Popen | None) -> None:
+        """Register the running ffmpeg so cancel() can stop it."""
+        with self._lock:
+            self._process = process
+        if process is not None and self.cancelled:
+            process.kill()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.kill()
+
+    def snapshot(self) -> dict:
+        state = {
+            "job_id": self.id,
+            "project_id": self.project_id,
+            "format": self.format,
+            "status": self.status,
+            "progress": self.progress,
+        }
+        if self.error:
+            state["error"] = self.error
+        if self.filename:
+            state["download_url"] = self._url_for(self.filename)
+        return state
+
+    def _publish(self) -> None:
+        events.publish(self.project_id, "export", self.snapshot())
+
+
+_jobs: dict[str, ExportJob] = {}
+_jobs_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def _export_workers() -> int:
+    try:
+        return max(1, int(os.getenv("KINO_EXPORT_WORKERS", "1")))
+    except ValueError:
+        return 1
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _jobs_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_export_workers(), thread_name_prefix="exports")
+        return _executor
+
+
+def _save_state(job: ExportJob) -> None:
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO exports (id, project_id, format, status, payload, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                job.id,
+                job.project_id,
+                job.format,
+                job.status,
+                json.dumps({"cache_key": job.key, "error": job.error}),
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        conn.commit()
+
+
+def _run_job(job: ExportJob, build: Callable[[ExportJob], ExportArtifact]) -> None:
+    try:
+        job.check()
+        job.status = "running"
+        _save_state(job)
+        job._publish()
+        artifact = build(job)
+        job.filename = artifact.filename
+        job.progress = 100
+        job.status = "ready"
+    except ExportCancelled:
+        job.status = "cancelled"
+        _save_state(job)
+    except Exception as exc:
+        job.status = "failed"
+        job.error = str(exc) or exc.__class__.__name__
+        _save_state(job)
+        print(f"[Pipeline:{job.project_id}] {job.format} export failed: {job.error}")
+    finally:
+        with _jobs_lock:
+            _jobs.pop(job.id, None)
+        job._publish()
+
+
+def start_export_job(
+    project_id: str,
+    format_key: str,
+    key: str,
+    build: Callable[[ExportJob], ExportArtifact],
+    url_for: Callable[[str], str],
+) -> ExportJob:
+    """Queue a build, or return the job already building the same artifact."""
+    job = ExportJob(project_id, format_key, key, url_for)
+    with _jobs_lock:
+        existing = _jobs.get(job.id)
+        if existing is not None:
+            return existing
+        _jobs[job.id] = job
+    _save_state(job)
+    job._publish()
+    _get_executor().submit(_run_job, job, build)
+    return job
+
+
+def get_export_job(job_id: str) -> ExportJob | None:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def get_export_state(job_id: str) -> dict | None:
+    """A job's state from memory while it is active, otherwise from its row."""
+    job = get_export_job(job_id)
+    if job is not None:
+        return job.snapshot()
+    with get_connection() as conn:
+        row = conn.execute("SELECT * FROM exports WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    details = json.loads(row["payload"] or "{}")
+    status = row["status"]
+    if status in {"queued", "running"}:
+        # Left behind by a restart; nothing is building it any more.
+        status = "failed"
+        details["error"] = "Export was interrupted; request it again"
+    state = {
+        "job_id": row["id"],
+        "project_id": row["project_id"],
+        "format": row["format"],
+        "status": status,
+        "progress": 100 if status == "ready" else 0,
+    }
+    if details.get("error"):
+        state["error"] = details["error"]
+    if status == "ready" and details.get("filename"):
+        state["filename"] = details["filename"]
+    return state
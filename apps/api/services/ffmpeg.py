@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import json
 import os
 import subprocess
 
+from services.timecode import Timecode
+
 
 def _parse_thumbnail_offsets(raw: str | None) -> tuple[int, ...]:
     if raw is None or not raw.strip():
@@ -29,19 +32,25 @@ def _parse_thumbnail_offsets(raw: str | None) -> tuple[int, ...]:
 @dataclass(frozen=True)
 class ClipRequest:
     input_path: str
-    start_tc: str
-    end_tc: str
+    start_tc: str | Timecode
+    end_tc: str | Timecode
     output_path: str
+    fps: int = 24
+
+    def seek_args(self) -> list[str]:
+        return [
+            "-ss",
+            Timecode.parse(self.start_tc, self.fps).ffmpeg(),
+            "-to",
+            Timecode.parse(self.end_tc, self.fps).ffmpeg(),
+        ]
 
 
 def build_nvenc_clip_command(request: ClipRequest) -> list[str]:
     return [
         "ffmpeg",
         "-y",
-        "-ss",
-        request.start_tc,
-        "-to",
-        request.end_tc,
+        *request.seek_args(),
         "-i",
         request.input_path,
         "-c:v",
@@ -70,10 +79,7 @@ def build_x264_clip_command(request: ClipRequest) -> list[str]:
     return [
         "ffmpeg",
         "-y",
-        "-ss",
-        request.start_tc,
-        "-to",
-        request.end_tc,
+        *request.seek_args(),
         "-i",
         request.input_path,
         "-c:v",
@@ -92,43 +98,127 @@ def build_x264_clip_command(request: ClipRequest) -> list[str]:
     ]
 
 
-def timecode_to_seconds(timecode: str, fps: int) -> float:
-    parts = timecode.split(":")
-    if len(parts) == 3:
-        hours, minutes, rest = parts
-    elif len(parts) == 2:
-        hours = "0"
-        minutes, rest = parts
-    elif len(parts) == 1:
-        hours = "0"
-        minutes = "0"
-        rest = parts[0]
+def build_copy_clip_command(request: ClipRequest) -> list[str]:
+    # Only frame-accurate when start_tc sits on a keyframe; no re-encode.
+    return [
+        "ffmpeg",
+        "-y",
+        *request.seek_args(),
+        "-i",
+        request.input_path,
+        "-c",
+        "copy",
+        "-avoid_negative_ts",
+        "make_zero",
+        "-movflags",
+        "+faststart",
+        request.output_path,
+    ]
+
+
+def build_trailer_command(
+    input_path: str,
+    segments: list[tuple[float, float]],
+    output_path: str,
+    *,
+    has_audio: bool = True,
+    crossfade_seconds: float = 0.0,
+    use_nvenc: bool = False,
+) -> list[str]:
+    """Cut ``segments`` (start, end seconds) of one source together in a single encode.
+
+    Every segment is its own seeked input, so ffmpeg only decodes what it keeps, and
+    one filter graph trims and concatenates them. With ``crossfade_seconds`` the
+    picture still cuts hard, but each segment's audio runs on into the next scene's
+    and fades across its start, so sound and picture stay the same length.
+    """
+    count = len(segments)
+    lengths = [max(0.0, end - start) for start, end in segments]
+    fade = 0.0
+    if has_audio and count > 1 and crossfade_seconds > 0:
+        # acrossfade needs at least the fade's worth of audio on each side.
+        fade = round(min(crossfade_seconds, *lengths), 3)
+
+    inputs: list[str] = []
+    filters: list[str] = []
+    for idx, ((start, _), length) in enumerate(zip(segments, lengths)):
+        tail = fade if idx < count - 1 else 0.0
+        inputs += ["-ss", f"{start:.3f}", "-t", f"{length + tail:.3f}", "-i", input_path]
+        filters.append(f"[{idx}:v]trim=duration={length:.3f},setpts=PTS-STARTPTS[v{idx}]")
+        if has_audio:
+            filters.append(f"[{idx}:a]atrim=duration={length + tail:.3f},asetpts=PTS-STARTPTS[a{idx}]")
+
+    total = sum(lengths)
+    if not has_audio:
+        filters.append("".join(f"[v{idx}]" for idx in range(count)) + f"concat=n={count}:v=1:a=0[v]")
+    elif not fade:
+        filters.append("".join(f"[v{idx}][a{idx}]" for idx in range(count)) + f"concat=n={count}:v=1:a=1[v][a]")
     else:
-        raise ValueError(f"Invalid timecode format: {timecode}")
+        filters.append("".join(f"[v{idx}]" for idx in range(count)) + f"concat=n={count}:v=1:a=0[v]")
+        previous = "a0"
+        for idx in range(1, count):
+            filters.append(f"[{previous}][a{idx}]acrossfade=d={fade:.3f}[x{idx}]")
+            previous = f"x{idx}"
+        # A scene at the very end of the film has no audio left to run on with; pad
+        # (or trim) so the track ends with the picture regardless.
+        filters.append(f"[{previous}]apad,atrim=duration={total:.3f}[a]")
 
-    if "." in rest:
-        seconds_str, frames_str = rest.split(".", 1)
+    if use_nvenc:
+        video_args = ["-c:v", "h264_nvenc", "-preset", "p4", "-rc", "vbr", "-cq", "23", "-b:v", "0"]
     else:
-        seconds_str, frames_str = rest, "0"
+        video_args = [
+            "-c:v",
+            "libx264",
+            "-preset",
+            os.getenv("KINO_FFMPEG_PRESET", "ultrafast"),
+            "-crf",
+            os.getenv("KINO_FFMPEG_CRF", "18"),
+        ]
+    maps = ["-map", "[v]"]
+    if has_audio:
+        maps += ["-map", "[a]", "-c:a", "aac", "-b:a", "192k"]
+    return [
+        "ffmpeg",
+        "-y",
+        *inputs,
+        "-filter_complex",
+        ";".join(filters),
+        *maps,
+        *video_args,
+        "-pix_fmt",
+        "yuv420p",
+        "-movflags",
+        "+faststart",
+        output_path,
+    ]
 
-    total_seconds = (int(hours) * 3600) + (int(minutes) * 60) + int(seconds_str)
-    return total_seconds + (int(frames_str) / fps)
+
+def build_keyframe_scan_command(input_path: str) -> list[str]:
+    return [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags",
+        "-of",
+        "csv=print_section=0",
+        input_path,
+    ]
+
+
+def timecode_to_seconds(timecode: str, fps: int) -> float:
+    return Timecode.parse(timecode, fps).seconds
 
 
 def seconds_to_timecode(seconds: float, fps: int) -> str:
-    clamped = max(0, seconds)
-    total_frames = int(clamped * fps)
-    frame = total_frames % fps
-    total_seconds = total_frames // fps
-    sec = total_seconds % 60
-    minutes = (total_seconds // 60) % 60
-    hours = total_seconds // 3600
-    return f"{hours:02d}:{minutes:02d}:{sec:02d}.{frame:02d}"
+    return str(Timecode.from_seconds(seconds, fps))
 
 
 def build_thumbnail_commands(
     input_path: str,
-    thumbnail_tc: str,
+    thumbnail_tc: str | Timecode,
     output_dir: str,
     offsets: tuple[int, ...] | None = None,
     fps: int = 24,
@@ -137,13 +227,12 @@ def build_thumbnail_commands(
         offsets = _parse_thumbnail_offsets(os.getenv("KINO_THUMBNAIL_OFFSETS", "0"))
 
     commands = []
-    base_seconds = timecode_to_seconds(thumbnail_tc, fps)
+    base = Timecode.parse(thumbnail_tc, fps)
 
     for offset in offsets:
         suffix = f"{offset:+d}".replace("+", "p").replace("-", "m")
         output_path = f"{output_dir}/thumb_{suffix}.webp"
-        offset_seconds = base_seconds + (offset / fps)
-        candidate_tc = seconds_to_timecode(offset_seconds, fps)
+        candidate_tc = (base + offset).ffmpeg()
         commands.append(
             [
                 "ffmpeg",
@@ -166,29 +255,102 @@ def build_thumbnail_commands(
     return commands
 
 
-def probe_duration(input_path: str) -> float:
+@dataclass(frozen=True)
+class MediaInfo:
+    duration_seconds: float
+    fps: float
+    width: int | None = None
+    height: int | None = None
+    video_codec: str | None = None
+    pix_fmt: str | None = None
+    audio_codec: str | None = None
+    bit_rate: int | None = None
+    has_b_frames: int | None = None
+    streams: list[dict] = field(default_factory=list)
+
+    @property
+    def timecode_fps(self) -> int:
+        # 23.976 and 29.97 sources are timecoded at 24 and 30 (non-drop).
+        return max(1, round(self.fps)) if self.fps > 0 else 24
+
+
+def build_probe_command(input_path: str) -> list[str]:
+    return [
+        "ffprobe",
+        "-v",
+        "error",
+        "-print_format",
+        "json",
+        "-show_format",
+        "-show_streams",
+        input_path,
+    ]
+
+
+def _rate(value: object) -> float:
+    text = str(value or "")
+    numerator, _, denominator = text.partition("/")
+    try:
+        if denominator:
+            return float(numerator) / float(denominator) if float(denominator) else 0.0
+        return float(numerator)
+    except ValueError:
+        return 0.0
+
+
+def _int_or_none(value: object) -> int | None:
+    try:
+        return int(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_probe_output(raw: str) -> MediaInfo | None:
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+    streams = data.get("streams") or []
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), {})
+    audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), {})
+    fmt = data.get("format") or {}
+
+    try:
+        duration = float(fmt.get("duration") or video.get("duration") or 0.0)
+    except (TypeError, ValueError):
+        duration = 0.0
+    fps = _rate(video.get("avg_frame_rate")) or _rate(video.get("r_frame_rate"))
+    return MediaInfo(
+        duration_seconds=duration,
+        fps=fps,
+        width=_int_or_none(video.get("width")),
+        height=_int_or_none(video.get("height")),
+        video_codec=video.get("codec_name"),
+        pix_fmt=video.get("pix_fmt"),
+        audio_codec=audio.get("codec_name"),
+        bit_rate=_int_or_none(fmt.get("bit_rate")),
+        has_b_frames=_int_or_none(video.get("has_b_frames")),
+        streams=[
+            {
+                "index": stream.get("index"),
+                "codec_type": stream.get("codec_type"),
+                "codec_name": stream.get("codec_name"),
+            }
+            for stream in streams
+        ],
+    )
+
+
+def probe_media(input_path: str) -> MediaInfo | None:
     try:
         result = subprocess.run(
-            [
-                "ffprobe",
-                "-v",
-                "error",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "default=nokey=1:noprint_wrappers=1",
-                input_path,
-            ],
+            build_probe_command(input_path),
             check=True,
             capture_output=True,
             text=True,
         )
     except FileNotFoundError:
-        return 0.0
+        return None
     except subprocess.CalledProcessError:
-        return 0.0
-
-    try:
-        return float(result.stdout.strip())
-    except ValueError:
-        return 0.0
+        return None
+    return parse_probe_output(result.stdout)
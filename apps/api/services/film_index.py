@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+from db import get_connection
+
+
+def get_film_index(
+    project_id: str,
+    fingerprint: dict,
+    source_hash: str | None = None,
+) -> dict | None:
+    """Return the project's shot log, or one logged for the same film by another project.
+
+    Logs written with a different prompt, schema or model are ignored.
+    """
+    matches = (fingerprint["prompt_hash"], fingerprint["schema_version"], fingerprint["model"])
+    with get_connection() as conn:
+        row = conn.execute(
+            """
+            SELECT shot_log_json FROM film_indexes
+            WHERE project_id = ? AND prompt_hash = ? AND schema_version = ? AND model = ?
+            """,
+            (project_id, *matches),
+        ).fetchone()
+        if row is None and source_hash:
+            row = conn.execute(
+                """
+                SELECT shot_log_json FROM film_indexes
+                WHERE source_hash = ? AND prompt_hash = ? AND schema_version = ? AND model = ?
+                ORDER BY created_at DESC
+                LIMIT 1
+                """,
+                (source_hash, *matches),
+            ).fetchone()
+            if row is not None:
+                print(f"[Pipeline:{project_id}] Reusing shot log from an identical upload.")
+    if row is None:
+        return None
+    try:
+        return json.loads(row["shot_log_json"])
+    except json.JSONDecodeError:
+        return None
+
+
+def save_film_index(
+    project_id: str,
+    shot_log: dict,
+    fingerprint: dict,
+    source_hash: str | None = None,
+) -> None:
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO film_indexes (
+                project_id,
+                source_hash,
+                prompt_hash,
+                schema_version,
+                model,
+                shots_count,
+                shot_log_json,
+                created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                project_id,
+                source_hash,
+                fingerprint["prompt_hash"],
+                fingerprint["schema_version"],
+                fingerprint["model"],
+                len(shot_log.get("shots") or []),
+                json.dumps(shot_log),
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        conn.commit()
+
+
+def delete_film_index(project_id: str) -> None:
+    with get_connection() as conn:
+        conn.execute("DELETE FROM film_indexes WHERE project_id = ?", (project_id,))
+        conn.commit()
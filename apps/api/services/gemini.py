@@ -394,15 +394,22 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import time
-from typing import Any, List, Literal
-from pydantic import BaseModel, Field
+from typing import Any, Callable, List, Literal
+from pydantic import BaseModel, Field, ValidationError
 
 from google import genai
 from google.genai import types
 
+from services import metrics
+from services.config import bool_env
+from services.governor import get_governor
+from services.json_stream import WILDCARD, IncrementalJsonParser
+from services.salvage import salvage_storyboard_payload
+
 # --- 1. UPDATED SCHEMA (The "Pacing Fix") ---
 
 class Scene(BaseModel):
@@ -513,11 +520,177 @@ def _wait_for_active(client: genai.Client, file_ref: Any) -> Any:
 
 def upload_file_to_gemini(file_path: str) -> Any:
     client = _get_client()
+    governor = get_governor()
+    waited = governor.upload_bytes.acquire(os.path.getsize(file_path))
+    waited += governor.requests.acquire()
+    if waited > 0:
+        print(f"   [Gemini] Upload throttled for {waited:.1f}s by rate governor.")
     print(f"   [Gemini] Uploading {os.path.basename(file_path)}...")
     file_ref = client.files.upload(file=file_path)
     return _wait_for_active(client, file_ref)
 
 
+def _model_name() -> str:
+    # Still using the Preview model as it's the smartest for "Video Understanding"
+    return os.getenv("GEMINI_MODEL", "gemini-3-flash-preview")
+
+
+GENERATION_TEMPERATURE = 0.3
+
+
+def _sha256_text(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+GenerationMode = Literal["direct", "indexed"]
+
+
+def generation_mode() -> GenerationMode:
+    """``direct`` sends the video with the storyboard prompt; ``indexed`` builds a shot log first."""
+    mode = os.getenv("KINO_GENERATION_MODE", "direct").strip().lower()
+    return "indexed" if mode == "indexed" else "direct"
+
+
+def generation_fingerprint(mode: GenerationMode = "direct") -> dict:
+    """Everything besides the source film that determines what Gemini returns."""
+    schema = json.dumps(StoryboardResponse.model_json_schema(), sort_keys=True)
+    prompt = STORYBOARD_PROMPT
+    if mode == "indexed":
+        # Storyboards in indexed mode are only as good as the shot log they were written from.
+        schema += json.dumps(ShotLog.model_json_schema(), sort_keys=True)
+        prompt = SHOT_LOG_PROMPT + INDEX_PREAMBLE + STORYBOARD_PROMPT
+    return {
+        "prompt_hash": _sha256_text(prompt),
+        "schema_version": _sha256_text(schema)[:16],
+        "model": _model_name(),
+        "temperature": GENERATION_TEMPERATURE,
+    }
+
+
+def _generation_config() -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=StoryboardResponse,
+        temperature=GENERATION_TEMPERATURE,
+    )
+
+
+def _apply_metadata_fallback(payload: dict, filename: str, duration_seconds: float) -> dict:
+    if not payload.get("movie_title") or "detect" in payload["movie_title"]:
+        payload["movie_title"] = filename
+    if not payload.get("duration") or "detect" in payload["duration"]:
+        payload["duration"] = f"{duration_seconds:.2f}s"
+    return payload
+
+
+def _finalize_payload(response_text: str, filename: str, duration_seconds: float) -> dict:
+    response_data = json.loads(response_text)
+    validated_obj = StoryboardResponse(**response_data)
+    payload = validated_obj.model_dump()
+
+    # Metadata fallback
+    return _apply_metadata_fallback(payload, filename, duration_seconds)
+
+
+# --- 3. SALVAGE FOR TRUNCATED / MALFORMED RESPONSES ---
+
+EXPECTED_STORYBOARDS = 5
+
+
+class StoryboardBatch(BaseModel):
+    storyboards: List[Storyboard]
+
+
+REASK_PROMPT = """
+You already delivered these trailer storyboards for this film:
+{existing}
+
+The rest of your answer was lost. Create exactly {missing} additional storyboard(s)
+following the same pacing rules, each with a tone different from the ones above.
+Return only the new storyboards.
+"""
+
+
+def _reask_missing_storyboards(
+    client: genai.Client,
+    model_name: str,
+    source: list[Any],
+    kept: list[dict],
+    missing: int,
+) -> list[dict]:
+    existing = "\n".join(f"- {board['name']} ({board['tone']})" for board in kept) or "- (none)"
+    print(f"   [Gemini] Re-asking for {missing} missing storyboard(s)...")
+    get_governor().requests.acquire()
+    response = client.models.generate_content(
+        model=model_name,
+        contents=[*source, STORYBOARD_PROMPT, REASK_PROMPT.format(existing=existing, missing=missing)],
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=StoryboardBatch,
+            temperature=GENERATION_TEMPERATURE,
+        ),
+    )
+    batch = StoryboardBatch(**json.loads(response.text))
+    return [board.model_dump() for board in batch.storyboards][:missing]
+
+
+def _parse_or_salvage(
+    client: genai.Client,
+    model_name: str,
+    source: list[Any],
+    response_text: str,
+    filename: str,
+    duration_seconds: float,
+) -> dict:
+    """``source`` is what the storyboard prompt was about: the video, or the shot log."""
+    try:
+        payload = _finalize_payload(response_text, filename, duration_seconds)
+        metrics.increment("gemini.responses.valid")
+        return payload
+    except (json.JSONDecodeError, ValidationError, TypeError) as exc:
+        metrics.increment("gemini.responses.malformed")
+        if not bool_env("KINO_GEMINI_SALVAGE", True):
+            if isinstance(exc, json.JSONDecodeError):
+                print(f"   [Gemini Error] Model failed to output JSON.")
+                raise RuntimeError("Gemini failed to generate valid JSON.")
+            raise RuntimeError(f"Generation error: {str(exc)}")
+        print(f"   [Gemini Error] Malformed response ({exc.__class__.__name__}); salvaging...")
+
+    payload, report = salvage_storyboard_payload(
+        response_text,
+        validate_scene=lambda value: Scene.model_validate(value).model_dump(),
+        validate_board=lambda value: Storyboard.model_validate(value).model_dump(),
+        validate_poster=lambda value: PosterCandidate.model_validate(value).model_dump(),
+    )
+    salvage_rate = min(1.0, report.boards_kept / EXPECTED_STORYBOARDS)
+    metrics.increment("gemini.salvage.attempts")
+    metrics.increment("gemini.salvage.boards_kept", report.boards_kept)
+    metrics.increment("gemini.salvage.scenes_dropped", report.scenes_dropped)
+    metrics.observe("gemini.salvage.rate", salvage_rate)
+    print(
+        f"   [Gemini] Salvaged {report.boards_kept}/{EXPECTED_STORYBOARDS} storyboards "
+        f"({report.scenes_kept} scenes kept, {report.scenes_dropped} dropped, "
+        f"truncated={report.truncated})."
+    )
+
+    missing = EXPECTED_STORYBOARDS - report.boards_kept
+    if missing > 0 and bool_env("KINO_GEMINI_SALVAGE_REASK", True):
+        try:
+            extra = _reask_missing_storyboards(client, model_name, source, payload["storyboards"], missing)
+        except Exception as exc:
+            print(f"   [Gemini Error] Re-ask failed: {exc}")
+            extra = []
+        payload["storyboards"].extend(extra)
+        metrics.increment("gemini.salvage.boards_reasked", len(extra))
+
+    if not payload["storyboards"]:
+        metrics.increment("gemini.salvage.failed")
+        raise RuntimeError("Gemini failed to generate valid JSON.")
+
+    validated = StoryboardResponse(**payload).model_dump()
+    return _apply_metadata_fallback(validated, filename, duration_seconds)
+
+
 def generate_storyboards_from_file(
     file_ref: Any,
     filename: str,
@@ -526,40 +699,316 @@ def generate_storyboards_from_file(
     client = _get_client()
     file_ref = _wait_for_active(client, file_ref)
     
-    # Still using the Preview model as it's the smartest for "Video Understanding"
-    model_name = os.getenv("GEMINI_MODEL", "gemini-3-flash-preview")
+    model_name = _model_name()
     print(f"   [Gemini] Editing storyboards with {model_name} (Focus: Narrative Pacing)...")
     
+    get_governor().requests.acquire()
     try:
         response = client.models.generate_content(
             model=model_name,
             contents=[file_ref, STORYBOARD_PROMPT],
+            config=_generation_config(),
+        )
+    except Exception as e:
+        raise RuntimeError(f"Generation error: {str(e)}")
+
+    return _parse_or_salvage(
+        client,
+        model_name,
+        [file_ref],
+        response.text or "",
+        filename,
+        duration_seconds,
+    )
+
+
+SceneCallback = Callable[[int, int, dict], None]
+
+_SCENE_PATH = ("storyboards", WILDCARD, "scenes", WILDCARD)
+
+
+def stream_storyboards_from_file(
+    file_ref: Any,
+    filename: str,
+    duration_seconds: float,
+    on_scene: SceneCallback | None = None,
+) -> dict:
+    """Like ``generate_storyboards_from_file`` but hands each scene to ``on_scene`` as soon as
+    Gemini finishes writing it. Board and scene indexes passed to the callback are 1-based.
+    """
+    client = _get_client()
+    file_ref = _wait_for_active(client, file_ref)
+
+    model_name = _model_name()
+    print(f"   [Gemini] Streaming storyboards with {model_name}...")
+
+    parser = IncrementalJsonParser(watch=[_SCENE_PATH])
+    emitted = 0
+    get_governor().requests.acquire()
+    try:
+        stream = client.models.generate_content_stream(
+            model=model_name,
+            contents=[file_ref, STORYBOARD_PROMPT],
+            config=_generation_config(),
+        )
+        for chunk in stream:
+            for path, value in parser.feed(chunk.text or ""):
+                if on_scene is None:
+                    continue
+                try:
+                    scene = Scene.model_validate(value).model_dump()
+                except ValidationError:
+                    # Leave it for the full-document validation below.
+                    continue
+                on_scene(path[1] + 1, path[3] + 1, scene)
+                emitted += 1
+    except Exception as e:
+        # A dropped stream still leaves a usable prefix for the salvage path.
+        if not parser.text:
+            raise RuntimeError(f"Generation error: {str(e)}")
+        print(f"   [Gemini Error] Stream interrupted: {e}")
+
+    print(f"   [Gemini] Stream complete ({emitted} scenes emitted early).")
+    return _parse_or_salvage(
+        client,
+        model_name,
+        [file_ref],
+        parser.text,
+        filename,
+        duration_seconds,
+    )
+
+
+# --- 4. TWO-STAGE INDEXING (one video pass, many text-only passes) ---
+
+class Shot(BaseModel):
+    start_tc: str = Field(description="Format HH:MM:SS.FF")
+    end_tc: str = Field(description="Format HH:MM:SS.FF")
+    shot_type: str = Field(description="Wide, Medium, Close-up, Insert, Aerial, POV...")
+    description: str = Field(description="What is on screen (8-20 words)")
+    dialogue: str = Field(description="The key line spoken in the shot, or an empty string")
+    emotion: str
+    energy: int = Field(description="1 = still, 5 = frantic")
+    poster_worthy: bool
+
+
+class ShotLog(BaseModel):
+    movie_title: str
+    duration: str
+    shots: List[Shot]
+
+
+class PosterCandidateBatch(BaseModel):
+    poster_candidates: List[PosterCandidate]
+
+
+SHOT_LOG_PROMPT = """
+You are an assistant editor logging a feature film for the trailer department.
+Produce a dense, chronological shot log of the ENTIRE film, from the first frame to the last.
+
+**Rules:**
+1. One entry per shot or distinct moment. Long takes may be split at story beats.
+2. Frame-accurate timestamps (HH:MM:SS.FF). Entries must not overlap.
+3. Transcribe the most important line of dialogue in each shot verbatim; leave it empty if nobody speaks.
+4. Rate energy from 1 (still) to 5 (frantic) so an editor can pace a cut without seeing the film.
+5. Flag striking, well-composed frames that could carry a movie poster.
+6. Do not skip the middle of the film. Coverage matters more than prose.
+"""
+
+INDEX_PREAMBLE = """
+You cannot see the film for this task. Instead you have its shot log: one line per shot with
+start-end timecodes, shot type, energy (1-5), emotion, a description and the key dialogue.
+Every timestamp you return MUST fall inside a logged shot. Treat the log as the film.
+"""
+
+REGENERATE_PROMPT = """
+Create ONE replacement trailer storyboard for this film.
+It replaces: {current}
+The other storyboards already cover these angles, so do not repeat them:
+{others}
+{direction}
+Follow the same pacing rules as before: 20 to 30 scenes, anchors 4-8s, atmosphere 3-5s, flashes 1-2.5s.
+"""
+
+POSTER_INDEX_PROMPT = """
+Select {count} distinct frames from the shot log that would work as a movie poster.
+Prefer shots flagged as poster-worthy, vary characters, locations and moods, and
+return the exact frame timestamp (HH:MM:SS.FF) with a one-line reason for each.
+"""
+
+
+def _finalize_shot_log(response_text: str, filename: str, duration_seconds: float) -> dict:
+    try:
+        payload = ShotLog(**json.loads(response_text)).model_dump()
+    except (json.JSONDecodeError, ValidationError, TypeError) as exc:
+        # Shot logs are long; keep every shot the model finished writing.
+        print(f"   [Gemini Error] Malformed shot log ({exc.__class__.__name__}); salvaging...")
+        parser = IncrementalJsonParser(watch=[("shots", WILDCARD)])
+        shots: list[dict] = []
+        for _, value in parser.feed(response_text):
+            try:
+                shots.append(Shot.model_validate(value).model_dump())
+            except ValidationError:
+                continue
+        if not shots:
+            raise RuntimeError("Gemini failed to generate a valid shot log.")
+        metrics.increment("gemini.shot_log.salvaged")
+        payload = {"movie_title": "", "duration": "", "shots": shots}
+    return _apply_metadata_fallback(payload, filename, duration_seconds)
+
+
+def generate_shot_log_from_file(
+    file_ref: Any,
+    filename: str,
+    duration_seconds: float,
+) -> dict:
+    client = _get_client()
+    file_ref = _wait_for_active(client, file_ref)
+
+    model_name = _model_name()
+    print(f"   [Gemini] Logging shots with {model_name}...")
+
+    get_governor().requests.acquire()
+    try:
+        response = client.models.generate_content(
+            model=model_name,
+            contents=[file_ref, SHOT_LOG_PROMPT],
             config=types.GenerateContentConfig(
                 response_mime_type="application/json",
-                response_schema=StoryboardResponse,
-                temperature=0.3, 
+                response_schema=ShotLog,
+                temperature=GENERATION_TEMPERATURE,
             ),
         )
+    except Exception as e:
+        raise RuntimeError(f"Shot log error: {str(e)}")
 
-        response_data = json.loads(response.text)
-        validated_obj = StoryboardResponse(**response_data)
-        payload = validated_obj.model_dump()
-        
-        # Metadata fallback
-        if not payload.get("movie_title") or "detect" in payload["movie_title"]:
-            payload["movie_title"] = filename
-        if not payload.get("duration") or "detect" in payload["duration"]:
-            payload["duration"] = f"{duration_seconds:.2f}s"
+    shot_log = _finalize_shot_log(response.text or "", filename, duration_seconds)
+    print(f"   [Gemini] Shot log complete ({len(shot_log['shots'])} shots).")
+    return shot_log
 
-        return payload
 
-    except json.JSONDecodeError:
-        print(f"   [Gemini Error] Model failed to output JSON.")
+def format_shot_log(shot_log: dict) -> str:
+    """Render the shot log as compact text, one line per shot."""
+    lines = [f"FILM: {shot_log.get('movie_title', '')} ({shot_log.get('duration', '')})"]
+    for shot in shot_log.get("shots") or []:
+        line = (
+            f"{shot['start_tc']}-{shot['end_tc']} | {shot['shot_type']} | E{shot['energy']} | "
+            f"{shot['emotion']} | {shot['description']}"
+        )
+        if shot.get("dialogue"):
+            line += f' | "{shot["dialogue"]}"'
+        if shot.get("poster_worthy"):
+            line += " | POSTER"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _index_source(shot_log: dict) -> list[Any]:
+    return [INDEX_PREAMBLE, format_shot_log(shot_log)]
+
+
+def generate_storyboards_from_shot_log(
+    shot_log: dict,
+    filename: str,
+    duration_seconds: float,
+) -> dict:
+    client = _get_client()
+    model_name = _model_name()
+    source = _index_source(shot_log)
+    print(f"   [Gemini] Editing storyboards from shot log with {model_name} (text only)...")
+
+    get_governor().requests.acquire()
+    try:
+        response = client.models.generate_content(
+            model=model_name,
+            contents=[*source, STORYBOARD_PROMPT],
+            config=_generation_config(),
+        )
+    except Exception as e:
+        raise RuntimeError(f"Generation error: {str(e)}")
+
+    return _parse_or_salvage(
+        client,
+        model_name,
+        source,
+        response.text or "",
+        filename,
+        duration_seconds,
+    )
+
+
+def regenerate_storyboard_from_shot_log(
+    shot_log: dict,
+    storyboards: list[dict],
+    board_index: int,
+    direction: str | None = None,
+) -> dict:
+    """Write a replacement for ``storyboards[board_index]`` without re-sending the video."""
+    current = storyboards[board_index]
+    others = "\n".join(
+        f"- {board.get('name')} ({board.get('tone')})"
+        for idx, board in enumerate(storyboards)
+        if idx != board_index
+    ) or "- (none)"
+    prompt = REGENERATE_PROMPT.format(
+        current=f"{current.get('name')} ({current.get('tone')})",
+        others=others,
+        direction=f"Editor's direction: {direction.strip()}" if direction and direction.strip() else "",
+    )
+
+    client = _get_client()
+    model_name = _model_name()
+    print(f"   [Gemini] Regenerating storyboard {board_index + 1} from shot log...")
+    get_governor().requests.acquire()
+    try:
+        response = client.models.generate_content(
+            model=model_name,
+            contents=[*_index_source(shot_log), STORYBOARD_PROMPT, prompt],
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=Storyboard,
+                temperature=GENERATION_TEMPERATURE,
+            ),
+        )
+        return Storyboard(**json.loads(response.text or "")).model_dump()
+    except (json.JSONDecodeError, ValidationError, TypeError):
         raise RuntimeError("Gemini failed to generate valid JSON.")
     except Exception as e:
         raise RuntimeError(f"Generation error: {str(e)}")
 
 
+def generate_poster_candidates_from_shot_log(shot_log: dict, count: int = 20) -> list[dict]:
+    client = _get_client()
+    model_name = _model_name()
+    print(f"   [Gemini] Picking {count} poster frames from shot log...")
+    get_governor().requests.acquire()
+    try:
+        response = client.models.generate_content(
+            model=model_name,
+            contents=[*_index_source(shot_log), POSTER_INDEX_PROMPT.format(count=count)],
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=PosterCandidateBatch,
+                temperature=GENERATION_TEMPERATURE,
+            ),
+        )
+        batch = PosterCandidateBatch(**json.loads(response.text or ""))
+    except (json.JSONDecodeError, ValidationError, TypeError):
+        raise RuntimeError("Gemini failed to generate valid JSON.")
+    except Exception as e:
+        raise RuntimeError(f"Generation error: {str(e)}")
+    return [candidate.model_dump() for candidate in batch.poster_candidates][:count]
+
+
+def shot_log_fingerprint() -> dict:
+    schema = json.dumps(ShotLog.model_json_schema(), sort_keys=True)
+    return {
+        "prompt_hash": _sha256_text(SHOT_LOG_PROMPT),
+        "schema_version": _sha256_text(schema)[:16],
+        "model": _model_name(),
+    }
+
+
 def generate_storyboards(project_id: str) -> dict:
     raise RuntimeError("Use upload flow.")
 
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from db import get_connection
+from services.storage import get_private_root, get_storage_root, move_out_of_storage
+
+
+@dataclass(frozen=True)
+class GenerationKey:
+    source_hash: str
+    prompt_hash: str
+    schema_version: str
+    model: str
+    temperature: float
+
+    @property
+    def digest(self) -> str:
+        raw = json.dumps(
+            [self.source_hash, self.prompt_hash, self.schema_version, self.model, self.temperature],
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def generation_cache_enabled() -> bool:
+    return os.getenv("KINO_GENERATION_CACHE", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _cache_dir() -> Path:
+    # Under the private root: the key is the film's hash plus public settings, so a
+    # copy under /media could be fetched by anyone holding the same film.
+    path = get_private_root() / "generations"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def move_legacy_cache() -> None:
+    """Move a cache kept under the storage root by earlier versions out of /media's reach."""
+    move_out_of_storage("_cache/generations", get_private_root() / "generations")
+    try:
+        (get_storage_root() / "_cache").rmdir()
+    except OSError:
+        pass
+
+
+def _cache_path(key: GenerationKey) -> Path:
+    return _cache_dir() / key.source_hash / f"{key.digest}.json"
+
+
+def build_generation_key(source_hash: str, fingerprint: dict) -> GenerationKey:
+    return GenerationKey(
+        source_hash=source_hash,
+        prompt_hash=str(fingerprint["prompt_hash"]),
+        schema_version=str(fingerprint["schema_version"]),
+        model=str(fingerprint["model"]),
+        temperature=float(fingerprint["temperature"]),
+    )
+
+
+def load_cached_generation(key: GenerationKey) -> dict | None:
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT payload_json FROM generation_cache WHERE cache_key = ?",
+            (key.digest,),
+        ).fetchone()
+    if row:
+        try:
+            return json.loads(row["payload_json"])
+        except json.JSONDecodeError:
+            return None
+
+    # The on-disk copy survives a database reset; restore the row from it.
+    path = _cache_path(key)
+    if not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    store_generation(key, payload)
+    return payload
+
+
+def store_generation(key: GenerationKey, payload: dict) -> None:
+    payload_json = json.dumps(payload)
+    path = _cache_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(payload_json, encoding="utf-8")
+    os.replace(tmp_path, path)
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO generation_cache (
+                cache_key,
+                source_hash,
+                prompt_hash,
+                schema_version,
+                model,
+                temperature,
+                payload_json,
+                created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                key.digest,
+                key.source_hash,
+                key.prompt_hash,
+                key.schema_version,
+                key.model,
+                key.temperature,
+                payload_json,
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        conn.commit()
+
+
+def invalidate_generations(source_hash: str | None = None) -> int:
+    """Drop cached generations for one source film, or every entry when no hash is given."""
+    with get_connection() as conn:
+        if source_hash:
+            removed = conn.execute(
+                "DELETE FROM generation_cache WHERE source_hash = ?",
+                (source_hash,),
+            ).rowcount
+        else:
+            removed = conn.execute("DELETE FROM generation_cache").rowcount
+        conn.commit()
+
+    target = _cache_dir() / source_hash if source_hash else _cache_dir()
+    shutil.rmtree(target, ignore_errors=True)
+    return removed
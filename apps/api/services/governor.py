@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+def _float_env(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+class TokenBucket:
+    """Thread-safe token bucket. A rate of 0 or less disables limiting.
+
+    Requests larger than the bucket capacity are admitted by going into debt, so a
+    single large upload waits proportionally instead of blocking forever.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class _Ticket:
+    __slots__ = ("project_id", "enqueued_at", "position")
+
+    def __init__(self, project_id: str) -> None:
+        self.project_id = project_id
+        self.enqueued_at = time.monotonic()
+        self.position = -1
+
+
+class GeminiGovernor:
+    """Process-wide admission control for Gemini work.
+
+    At most ``max_concurrent`` projects hold a slot at once; the rest wait in FIFO
+    order. Individual API calls additionally draw from a request bucket, and uploads
+    from a bytes-per-second budget.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        requests_per_minute: float,
+        upload_bytes_per_second: float,
+    ) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.requests = TokenBucket(
+            rate=requests_per_minute / 60.0,
+            capacity=max(1.0, requests_per_minute / 60.0),
+        )
+        self.upload_bytes = TokenBucket(
+            rate=upload_bytes_per_second,
+            capacity=upload_bytes_per_second,
+        )
+        self._queue: deque[_Ticket] = deque()
+        self._active = 0
+        self._cond = threading.Condition()
+        self._avg_hold = 0.0
+
+    def expected_wait_seconds(self) -> float:
+        """Rough queue wait for a new arrival, based on recent slot hold times."""
+        with self._cond:
+            ahead = len(self._queue) + self._active - self.max_concurrent + 1
+            hold = self._avg_hold
+        if ahead <= 0:
+            return 0.0
+        return (ahead / self.max_concurrent) * hold
+
+    @contextmanager
+    def admit(
+        self,
+        project_id: str,
+        on_position: Callable[[int], None] | None = None,
+    ) -> Iterator[float]:
+        """Wait for a Gemini slot; yields the seconds spent queued.
+
+        ``on_position`` is called with the 1-based queue position whenever it changes,
+        and with 0 once a queued ticket is granted its slot.
+        """
+        ticket = _Ticket(project_id)
+        with self._cond:
+            self._queue.append(ticket)
+            self._cond.notify_all()
+
+        try:
+            while True:
+                with self._cond:
+                    if self._queue[0] is ticket and self._active < self.max_concurrent:
+                        self._queue.popleft()
+                        self._active += 1
+                        self._cond.notify_all()
+                        break
+                    position = self._queue.index(ticket) + 1
+                    if position == ticket.position:
+                        self._cond.wait(timeout=5.0)
+                        continue
+                    ticket.position = position
+                if on_position is not None:
+                    on_position(position)
+        except BaseException:
+            with self._cond:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    self._cond.notify_all()
+            raise
+
+        admitted_at = time.monotonic()
+        waited = admitted_at - ticket.enqueued_at
+        if on_position is not None and ticket.position > 0:
+            on_position(0)
+        try:
+            yield waited
+        finally:
+            hold = time.monotonic() - admitted_at
+            with self._cond:
+                self._active -= 1
+                self._avg_hold = hold if self._avg_hold == 0 else (0.8 * self._avg_hold) + (0.2 * hold)
+                self._cond.notify_all()
+
+
+_governor: GeminiGovernor | None = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> GeminiGovernor:
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = GeminiGovernor(
+                max_concurrent=int(_float_env("KINO_GEMINI_CONCURRENCY", 2)),
+                requests_per_minute=_float_env("KINO_GEMINI_RPM", 60),
+                upload_bytes_per_second=_float_env("KINO_GEMINI_UPLOAD_BPS", 0),
+            )
+        return _governor
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+
+from services.ffmpeg import MediaInfo, build_probe_command, parse_probe_output
+
+# Work done on an upload's bytes as they arrive, so that once the last chunk is on
+# disk the source hash and media info are already known and nothing re-reads the
+# file. A tee only works while it sees every byte in order; if it misses some (a
+# restart between chunks, an out-of-order write) it gives up and the caller falls
+# back to hashing and probing the finished file.
+
+
+def ingest_tee_enabled() -> bool:
+    return os.getenv("KINO_INGEST_TEE", "true").lower() in {"1", "true", "yes"}
+
+
+def _probe_timeout_seconds() -> float:
+    try:
+        return float(os.getenv("KINO_INGEST_PROBE_TIMEOUT", "30"))
+    except ValueError:
+        return 30.0
+
+
+def _idle_timeout_seconds() -> float:
+    try:
+        return float(os.getenv("KINO_INGEST_TEE_IDLE_SECONDS", "900"))
+    except ValueError:
+        return 900.0
+
+
+@dataclass(frozen=True)
+class IngestResult:
+    source_hash: str | None
+    media_info: MediaInfo | None
+
+
+class UploadTee:
+    def __init__(self) -> None:
+        self.hasher = hashlib.sha256()
+        self.offset = 0
+        self.broken = False
+        self.last_active = time.monotonic()
+        self._probe: subprocess.Popen | None = None
+        self._probe_output: list[bytes] = []
+        self._probe_reader: threading.Thread | None = None
+        try:
+            # ffprobe reads the container from stdin and exits once it has the
+            # headers; until then it sees the same bytes as the file.
+            self._probe = subprocess.Popen(
+                build_probe_command("pipe:0"),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            self._probe = None
+        else:
+            self._probe_reader = threading.Thread(target=self._read_probe, daemon=True)
+            self._probe_reader.start()
+
+    def _read_probe(self) -> None:
+        assert self._probe is not None and self._probe.stdout is not None
+        self._probe_output.append(self._probe.stdout.read())
+
+    def _close_probe_input(self) -> None:
+        if self._probe is None or self._probe.stdin is None or self._probe.stdin.closed:
+            return
+        try:
+            self._probe.stdin.close()
+        except OSError:
+            pass
+
+    def feed(self, data: bytes, position: int) -> None:
+        self.last_active = time.monotonic()
+        if self.broken:
+            return
+        if position != self.offset:
+            self.broken = True
+            self.close()
+            return
+        self.hasher.update(data)
+        self.offset += len(data)
+        if self._probe is not None and self._probe.stdin is not None and not self._probe.stdin.closed:
+            try:
+                self._probe.stdin.write(data)
+            except (OSError, ValueError):
+                # ffprobe has what it needs and exited; the rest only goes to the hasher.
+                self._close_probe_input()
+
+    def finish(self, size: int) -> IngestResult:
+        if self.broken or self.offset != size:
+            self.close()
+            return IngestResult(source_hash=None, media_info=None)
+        media_info = None
+        if self._probe is not None:
+            self._close_probe_input()
+            try:
+                self._probe.wait(timeout=_probe_timeout_seconds())
+            except subprocess.TimeoutExpired:
+                self._probe.kill()
+                self._probe.wait()
+            if self._probe_reader is not None:
+                self._probe_reader.join(timeout=1)
+            if self._probe.returncode == 0 and self._probe_output:
+                media_info = parse_probe_output(self._probe_output[0].decode("utf-8", "replace"))
+            self._probe = None
+        return IngestResult(source_hash=self.hasher.hexdigest(), media_info=media_info)
+
+    def close(self) -> None:
+        if self._probe is None:
+            return
+        self._close_probe_input()
+        if self._probe.poll() is None:
+            self._probe.kill()
+        self._probe.wait()
+        self._probe = None
+
+
+# Tees of uploads that stopped sending chunks are closed after
+# KINO_INGEST_TEE_IDLE_SECONDS, so an abandoned session does not keep its ffprobe
+# running. If the client comes back, the upload carries on without a tee.
+_tees: dict[str, UploadTee] = {}
+_tees_lock = threading.Lock()
+_reaper: threading.Thread | None = None
+
+
+def reap_idle_tees(now: float | None = None) -> list[str]:
+    """Close the tees idle for longer than the timeout; returns their upload ids."""
+    deadline = (time.monotonic() if now is None else now) - _idle_timeout_seconds()
+    with _tees_lock:
+        idle = {upload_id: tee for upload_id, tee in _tees.items() if tee.last_active < deadline}
+        for upload_id in idle:
+            del _tees[upload_id]
+    for tee in idle.values():
+        tee.broken = True
+        tee.close()
+    return list(idle)
+
+
+def _reap_forever() -> None:
+    while True:
+        time.sleep(max(1.0, min(60.0, _idle_timeout_seconds() / 4)))
+        reap_idle_tees()
+
+
+def _start_reaper() -> None:
+    global _reaper
+    with _tees_lock:
+        if _reaper is not None:
+            return
+        _reaper = threading.Thread(target=_reap_forever, name="ingest-tee-reaper", daemon=True)
+    _reaper.start()
+
+
+def open_tee(upload_id: str) -> UploadTee | None:
+    if not ingest_tee_enabled():
+        return None
+    _start_reaper()
+    tee = UploadTee()
+    with _tees_lock:
+        previous = _tees.pop(upload_id, None)
+        _tees[upload_id] = tee
+    if previous is not None:
+        previous.close()
+    return tee
+
+
+def get_tee(upload_id: str) -> UploadTee | None:
+    with _tees_lock:
+        return _tees.get(upload_id)
+
+
+def finish_tee(upload_id: str, size: int) -> IngestResult:
+    with _tees_lock:
+        tee = _tees.pop(upload_id, None)
+    if tee is None:
+        return IngestResult(source_hash=None, media_info=None)
+    return tee.finish(size)
+
+
+def discard_tee(upload_id: str) -> None:
+    with _tees_lock:
+        tee = _tees.pop(upload_id, None)
+    if tee is not None:
+        tee.close()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+from bisect import bisect_right
+from typing import Any, Iterable
+
+WILDCARD = "*"
+
+PathPattern = tuple[Any, ...]
+
+
+class _Frame:
+    __slots__ = ("kind", "start", "child", "expecting_key")
+
+    def __init__(self, kind: str, start: int) -> None:
+        self.kind = kind
+        self.start = start
+        self.child: Any = 0 if kind == "array" else None
+        self.expecting_key = kind == "object"
+
+
+def _matches(path: tuple[Any, ...], pattern: PathPattern) -> bool:
+    if len(path) != len(pattern):
+        return False
+    for part, expected in zip(path, pattern):
+        if expected == WILDCARD:
+            if not isinstance(part, int):
+                return False
+        elif part != expected:
+            return False
+    return True
+
+
+class IncrementalJsonParser:
+    """Scan a JSON document chunk by chunk and emit containers completed at watched paths.
+
+    Paths are tuples of object keys and array indexes, e.g. ``("storyboards", 0, "scenes", 3)``.
+    Patterns may use ``"*"`` to match any array index.
+    """
+
+    def __init__(self, watch: Iterable[PathPattern]) -> None:
+        self._watch = [tuple(pattern) for pattern in watch]
+        # Chunks are kept as received; only the spans of completed containers are
+        # ever joined, so feeding is linear in the length of the response.
+        self._chunks: list[str] = []
+        self._starts: list[int] = []
+        self._length = 0
+        self._joined: str | None = ""
+        self._stack: list[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+
+    @property
+    def text(self) -> str:
+        if self._joined is None:
+            self._joined = "".join(self._chunks)
+        return self._joined
+
+    def _slice(self, start: int, end: int) -> str:
+        first = bisect_right(self._starts, start) - 1
+        last = bisect_right(self._starts, end - 1) - 1
+        if first == last:
+            base = self._starts[first]
+            return self._chunks[first][start - base : end - base]
+        pieces = [self._chunks[first][start - self._starts[first] :]]
+        pieces.extend(self._chunks[first + 1 : last])
+        pieces.append(self._chunks[last][: end - self._starts[last]])
+        return "".join(pieces)
+
+    @property
+    def depth(self) -> int:
+        return len(self._stack)
+
+    def feed(self, chunk: str) -> list[tuple[tuple[Any, ...], Any]]:
+        if not chunk:
+            return []
+        base = self._length
+        self._chunks.append(chunk)
+        self._starts.append(base)
+        self._length += len(chunk)
+        self._joined = None
+        emitted: list[tuple[tuple[Any, ...], Any]] = []
+        stack = self._stack
+
+        for offset, char in enumerate(chunk):
+            index = base + offset
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    top = stack[-1] if stack else None
+                    if top is not None and top.kind == "object" and top.expecting_key:
+                        top.child = json.loads(self._slice(self._string_start, index + 1))
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == "{":
+                stack.append(_Frame("object", index))
+            elif char == "[":
+                stack.append(_Frame("array", index))
+            elif char in "}]":
+                if not stack:
+                    continue
+                frame = stack.pop()
+                path = tuple(parent.child for parent in stack)
+                if any(_matches(path, pattern) for pattern in self._watch):
+                    try:
+                        value = json.loads(self._slice(frame.start, index + 1))
+                    except json.JSONDecodeError:
+                        continue
+                    emitted.append((path, value))
+            elif char == ":":
+                if stack and stack[-1].kind == "object":
+                    stack[-1].expecting_key = False
+            elif char == ",":
+                if not stack:
+                    continue
+                top = stack[-1]
+                if top.kind == "object":
+                    top.expecting_key = True
+                else:
+                    top.child += 1
+
+        return emitted
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import subprocess
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Iterable
+
+from db import get_connection
+from services.ffmpeg import build_keyframe_scan_command
+
+
+class KeyframeIndex:
+    """Sorted presentation times (seconds) of the video keyframes in a source film."""
+
+    __slots__ = ("times", "_frames")
+
+    def __init__(self, times: Iterable[float]) -> None:
+        self.times = array("d", sorted(times))
+        self._frames: dict[int, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def to_bytes(self) -> bytes:
+        return self.times.tobytes()
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> KeyframeIndex:
+        times = array("d")
+        times.frombytes(raw)
+        return cls(times)
+
+    def frames(self, fps: int) -> list[int]:
+        """Keyframe positions as frame numbers at ``fps`` (rounded, deduplicated)."""
+        cached = self._frames.get(fps)
+        if cached is None:
+            cached = sorted({round(time * fps) for time in self.times})
+            self._frames[fps] = cached
+        return cached
+
+    def previous(self, seconds: float) -> float | None:
+        """The last keyframe at or before ``seconds``."""
+        index = bisect_right(self.times, seconds) - 1
+        return self.times[index] if index >= 0 else None
+
+    def seek_cost(self, seconds: float) -> float:
+        """Seconds of video ffmpeg has to decode before it reaches ``seconds``."""
+        previous = self.previous(seconds)
+        return seconds if previous is None else seconds - previous
+
+    def is_keyframe(self, frame: int, fps: int) -> bool:
+        frames = self.frames(fps)
+        index = bisect_right(frames, frame) - 1
+        return index >= 0 and frames[index] == frame
+
+    @property
+    def gop_seconds(self) -> float:
+        if len(self.times) < 2:
+            return 0.0
+        gaps = sorted(b - a for a, b in zip(self.times, self.times[1:]))
+        return gaps[len(gaps) // 2]
+
+
+def scan_keyframes(input_path: str) -> KeyframeIndex | None:
+    """One ffprobe pass over the video packets; no decoding involved."""
+    times: list[float] = []
+    try:
+        with subprocess.Popen(
+            build_keyframe_scan_command(input_path),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ) as process:
+            assert process.stdout is not None
+            for line in process.stdout:
+                pts_time, _, flags = line.strip().partition(",")
+                if "K" not in flags:
+                    continue
+                try:
+                    times.append(float(pts_time))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        return None
+    if process.returncode != 0 or not times:
+        return None
+    return KeyframeIndex(times)
+
+
+def get_keyframe_index(project_id: str) -> KeyframeIndex | None:
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT keyframes FROM keyframe_indexes WHERE project_id = ?",
+            (project_id,),
+        ).fetchone()
+    if row is None:
+        return None
+    return KeyframeIndex.from_bytes(row["keyframes"])
+
+
+def save_keyframe_index(project_id: str, index: KeyframeIndex) -> None:
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO keyframe_indexes (
+                project_id,
+                keyframe_count,
+                gop_seconds,
+                keyframes,
+                created_at
+            ) VALUES (?, ?, ?, ?, ?)
+            """,
+            (
+                project_id,
+                len(index),
+                index.gop_seconds,
+                index.to_bytes(),
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        conn.commit()
+
+
+def delete_keyframe_index(project_id: str) -> None:
+    with get_connection() as conn:
+        conn.execute("DELETE FROM keyframe_indexes WHERE project_id = ?", (project_id,))
+        conn.commit()
+
+
+def load_or_build_keyframe_index(project_id: str, input_path: str) -> KeyframeIndex | None:
+    index = get_keyframe_index(project_id)
+    if index is not None:
+        return index
+    index = scan_keyframes(input_path)
+    if index is not None:
+        save_keyframe_index(project_id, index)
+        print(
+            f"[Pipeline:{project_id}] Indexed {len(index)} keyframes "
+            f"(median GOP {index.gop_seconds:.2f}s)."
+        )
+    return index
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict
+from datetime import datetime, timezone
+
+from db import get_connection
+from services.ffmpeg import MediaInfo, probe_media
+
+
+def get_media_info(project_id: str) -> MediaInfo | None:
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT info_json FROM media_info WHERE project_id = ?",
+            (project_id,),
+        ).fetchone()
+    if row is None:
+        return None
+    try:
+        return MediaInfo(**json.loads(row["info_json"]))
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def save_media_info(project_id: str, info: MediaInfo) -> None:
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO media_info (
+                project_id,
+                duration_seconds,
+                fps,
+                timecode_fps,
+                width,
+                height,
+                video_codec,
+                audio_codec,
+                info_json,
+                probed_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                project_id,
+                info.duration_seconds,
+                info.fps,
+                info.timecode_fps,
+                info.width,
+                info.height,
+                info.video_codec,
+                info.audio_codec,
+                json.dumps(asdict(info)),
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        conn.commit()
+
+
+def delete_media_info(project_id: str) -> None:
+    with get_connection() as conn:
+        conn.execute("DELETE FROM media_info WHERE project_id = ?", (project_id,))
+        conn.commit()
+
+
+def probe_and_store_media_info(project_id: str, input_path: str) -> MediaInfo | None:
+    """Probe a freshly uploaded source once and remember the result."""
+    info = probe_media(input_path)
+    if info is None:
+        delete_media_info(project_id)
+        return None
+    save_media_info(project_id, info)
+    print(
+        f"[Pipeline:{project_id}] Probed source: {info.duration_seconds:.1f}s, "
+        f"{info.fps:.3f} fps, {info.width}x{info.height} {info.video_codec}."
+    )
+    return info
+
+
+def load_or_probe_media_info(project_id: str, input_path: str | None) -> MediaInfo | None:
+    info = get_media_info(project_id)
+    if info is None and input_path and os.path.exists(input_path):
+        info = probe_and_store_media_info(project_id, input_path)
+    return info
+
+
+def fallback_fps() -> int:
+    """Only used when a source could not be probed."""
+    return int(os.getenv("KINO_FPS", "24"))
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters: dict[str, float] = defaultdict(float)
+_observations: dict[str, dict[str, float]] = {}
+
+
+def increment(name: str, value: float = 1.0) -> None:
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float) -> None:
+    with _lock:
+        stats = _observations.get(name)
+        if stats is None:
+            _observations[name] = {"count": 1, "sum": value, "min": value, "max": value, "last": value}
+            return
+        stats["count"] += 1
+        stats["sum"] += value
+        stats["min"] = min(stats["min"], value)
+        stats["max"] = max(stats["max"], value)
+        stats["last"] = value
+
+
+def snapshot() -> dict:
+    with _lock:
+        observations = {
+            name: {**stats, "avg": stats["sum"] / stats["count"]}
+            for name, stats in _observations.items()
+        }
+        return {"counters": dict(_counters), "observations": observations}
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Any
+
+from services.keyframes import KeyframeIndex
+from services.timecode import Timecode, format_frames, parse_frames, parse_mm_ss_ff_frames
+
+# Gemini's timestamps are clamped into the source film, scenes are given at least one
+# frame (and a sensible default length when the model wrote an empty or inverted
+# range), and thumbnails that fall outside their clip are re-centred.
+#
+# ``normalize_scene`` handles one scene at a time for the streaming path. Whole
+# payloads go through the columnar version, which parses every timestamp once and
+# applies the same rules as NumPy array operations; it falls back to the per-scene
+# loop when NumPy is unavailable.
+
+
+def _numpy() -> Any:
+    try:
+        import numpy as np  # type: ignore
+    except ImportError:
+        return None
+    return np
+
+
+def _default_clip_frames(fps: int) -> int:
+    # One second, or 12 frames for very low frame rates.
+    return max(fps, 12)
+
+
+def normalized_timestamp(
+    value: str | None,
+    *,
+    duration_seconds: float,
+    fps: int,
+) -> Timecode:
+    parsed = Timecode.try_parse(value, fps)
+    if parsed is None:
+        return Timecode(0, fps)
+
+    # Gemini can output MM:SS:FF even when asked for HH:MM:SS.FF.
+    # For short videos, reinterpret huge values using MM:SS:FF if it fits duration.
+    if duration_seconds > 0 and duration_seconds < 3600 and parsed.seconds > (duration_seconds + 1):
+        alt = Timecode.parse_mm_ss_ff(value, fps)
+        if alt is not None and alt.seconds <= (duration_seconds + 1):
+            parsed = alt
+
+    if duration_seconds <= 0:
+        return parsed
+
+    last_frame = Timecode.from_seconds(duration_seconds, fps).frames - 1
+    return Timecode(min(parsed.frames, max(0, last_frame)), fps)
+
+
+def normalize_scene(scene: dict, duration_seconds: float, fps: int) -> bool:
+    fps = max(int(fps), 1)
+    min_clip = 1
+    default_clip = _default_clip_frames(fps)
+
+    original = (
+        str(scene.get("start_tc") or ""),
+        str(scene.get("end_tc") or ""),
+        str(scene.get("thumbnail_tc") or ""),
+    )
+
+    start = normalized_timestamp(
+        scene.get("start_tc"),
+        duration_seconds=duration_seconds,
+        fps=fps,
+    )
+    end = normalized_timestamp(
+        scene.get("end_tc"),
+        duration_seconds=duration_seconds,
+        fps=fps,
+    )
+
+    if end.frames <= start.frames + min_clip:
+        end = start + default_clip
+    if duration_seconds > 0:
+        end = min(end, Timecode.from_seconds(duration_seconds, fps))
+    if end.frames <= start.frames + min_clip:
+        start = end - default_clip
+
+    thumb = normalized_timestamp(
+        scene.get("thumbnail_tc") or scene.get("start_tc"),
+        duration_seconds=duration_seconds,
+        fps=fps,
+    )
+    if thumb < start or thumb > end:
+        thumb = start + ((end - start) // 2)
+
+    scene["start_tc"] = str(start)
+    scene["end_tc"] = str(end)
+    scene["thumbnail_tc"] = str(thumb)
+    scene["duration_seconds"] = round(max(end - start, min_clip) / fps, 2)
+
+    updated = (
+        str(scene.get("start_tc") or ""),
+        str(scene.get("end_tc") or ""),
+        str(scene.get("thumbnail_tc") or ""),
+    )
+    return original != updated
+
+
+# Frame counts the int64 arrays hold with room for the clip arithmetic on top.
+# Anything larger (Gemini has written 20-digit hours) goes through the scalar path.
+_MAX_ARRAY_FRAMES = 2**62
+
+
+def _normalized_frames(np: Any, values: list[Any], duration_seconds: float, fps: int) -> Any | None:
+    """Columnar ``normalized_timestamp``: one frame count per value, as an int64 array.
+
+    Returns None if a value is too large for the array; the caller uses the scalar path.
+    """
+    parsed_frames = [-1 if (parsed := parse_frames(value, fps)) is None else parsed for value in values]
+    if any(parsed > _MAX_ARRAY_FRAMES for parsed in parsed_frames):
+        return None
+    frames = np.array(parsed_frames, dtype=np.int64)
+    valid = frames >= 0
+    frames[~valid] = 0
+
+    if duration_seconds > 0 and duration_seconds < 3600:
+        limit = duration_seconds + 1
+        # Only the few out-of-range values need the MM:SS:FF reading.
+        for index in np.flatnonzero(valid & ((frames / fps) > limit)).tolist():
+            alt = parse_mm_ss_ff_frames(values[index], fps)
+            if alt is not None and (alt / fps) <= limit:
+                frames[index] = alt
+
+    if duration_seconds > 0:
+        last_frame = Timecode.from_seconds(duration_seconds, fps).frames - 1
+        np.minimum(frames, max(0, last_frame), out=frames)
+    return frames
+
+
+def _iter_scenes(payload: dict):
+    storyboards = payload.get("storyboards")
+    if not isinstance(storyboards, list):
+        return
+    for board in storyboards:
+        if not isinstance(board, dict):
+            continue
+        scenes = board.get("scenes")
+        if not isinstance(scenes, list):
+            continue
+        for scene in scenes:
+            if isinstance(scene, dict):
+                yield scene
+
+
+def normalize_timestamps(values: list[Any], duration_seconds: float, fps: int) -> list[str]:
+    """Normalize a batch of timestamps, returning HH:MM:SS.FF strings in the same order."""
+    fps = max(int(fps), 1)
+    np = _numpy()
+    frames = _normalized_frames(np, values, duration_seconds, fps) if np is not None and values else None
+    if frames is None:
+        return [
+            str(normalized_timestamp(value, duration_seconds=duration_seconds, fps=fps))
+            for value in values
+        ]
+    return [format_frames(value, fps) for value in frames.tolist()]
+
+
+def normalize_poster_timestamps(payload: dict, duration_seconds: float, fps: int) -> int:
+    entries: list[dict] = []
+    sources: list[str] = []
+    raw_candidates = payload.get("poster_candidates")
+    if isinstance(raw_candidates, list):
+        for entry in raw_candidates:
+            if not isinstance(entry, dict):
+                continue
+            source = entry.get("timestamp") or entry.get("timecode") or entry.get("tc")
+            if not source:
+                continue
+            entries.append(entry)
+            sources.append(str(source))
+
+    repaired = 0
+    for entry, normalized in zip(entries, normalize_timestamps(sources, duration_seconds, fps)):
+        if str(entry.get("timestamp") or "") != normalized:
+            repaired += 1
+        entry["timestamp"] = normalized
+    return repaired
+
+
+def normalize_payload_timecodes(payload: dict, duration_seconds: float, fps: int) -> tuple[dict, int]:
+    """Normalize every scene and poster timestamp in ``payload`` in place.
+
+    Returns the payload and how many scenes/posters had to be changed.
+    """
+    fps = max(int(fps), 1)
+    scenes = list(_iter_scenes(payload))
+    np = _numpy()
+
+    start = end = thumb = None
+    if np is not None and scenes:
+        start = _normalized_frames(np, [scene.get("start_tc") for scene in scenes], duration_seconds, fps)
+        end = _normalized_frames(np, [scene.get("end_tc") for scene in scenes], duration_seconds, fps)
+        thumb = _normalized_frames(
+            np,
+            [scene.get("thumbnail_tc") or scene.get("start_tc") for scene in scenes],
+            duration_seconds,
+            fps,
+        )
+    if start is None or end is None or thumb is None:
+        repaired = sum(1 for scene in scenes if normalize_scene(scene, duration_seconds, fps))
+        repaired += normalize_poster_timestamps(payload, duration_seconds=duration_seconds, fps=fps)
+        return payload, repaired
+
+    default_clip = _default_clip_frames(fps)
+
+    end = np.where(end <= start + 1, start + default_clip, end)
+    if duration_seconds > 0:
+        np.minimum(end, Timecode.from_seconds(duration_seconds, fps).frames, out=end)
+    start = np.where(end <= start + 1, np.maximum(end - default_clip, 0), start)
+    outside = (thumb < start) | (thumb > end)
+    thumb = np.where(outside, start + ((end - start) // 2), thumb)
+    spans = np.maximum(end - start, 1)
+
+    repaired = 0
+    for scene, start_frames, end_frames, thumb_frames, span in zip(
+        scenes,
+        start.tolist(),
+        end.tolist(),
+        thumb.tolist(),
+        spans.tolist(),
+    ):
+        original = (
+            str(scene.get("start_tc") or ""),
+            str(scene.get("end_tc") or ""),
+            str(scene.get("thumbnail_tc") or ""),
+        )
+        updated = (
+            format_frames(start_frames, fps),
+            format_frames(end_frames, fps),
+            format_frames(thumb_frames, fps),
+        )
+        scene["start_tc"], scene["end_tc"], scene["thumbnail_tc"] = updated
+        scene["duration_seconds"] = round(span / fps, 2)
+        if original != updated:
+            repaired += 1
+
+    repaired += normalize_poster_timestamps(payload, duration_seconds=duration_seconds, fps=fps)
+    return payload, repaired
+
+
+def _snap_frame(
+    keyframes: list[int],
+    target: int,
+    tolerance: int,
+    *,
+    lower: int = 0,
+    upper: int | None = None,
+    prefer_previous: bool = False,
+) -> int:
+    index = bisect_right(keyframes, target)
+    options = []
+    if index > 0:
+        options.append(keyframes[index - 1])
+    if index < len(keyframes):
+        options.append(keyframes[index])
+    options = [
+        frame
+        for frame in options
+        if abs(frame - target) <= tolerance and frame >= lower and (upper is None or frame <= upper)
+    ]
+    if not options:
+        return target
+    if prefer_previous:
+        return options[0]
+    return min(options, key=lambda frame: abs(frame - target))
+
+
+def snap_scene_to_keyframes(
+    scene: dict,
+    keyframes: KeyframeIndex,
+    *,
+    tolerance_seconds: float,
+    duration_seconds: float,
+    fps: int,
+) -> bool:
+    """Nudge an already normalized scene's in/out points onto nearby keyframes.
+
+    In-points prefer the keyframe before them so the chosen moment stays in the clip;
+    a scene that starts on a keyframe can be extracted with a stream copy.
+    """
+    fps = max(int(fps), 1)
+    frames = keyframes.frames(fps)
+    start = Timecode.try_parse(scene.get("start_tc"), fps)
+    end = Timecode.try_parse(scene.get("end_tc"), fps)
+    if not frames or start is None or end is None:
+        return False
+
+    tolerance = int(round(tolerance_seconds * fps))
+    last_frame = Timecode.from_seconds(duration_seconds, fps).frames if duration_seconds > 0 else None
+    new_start = _snap_frame(frames, start.frames, tolerance, upper=end.frames - 2, prefer_previous=True)
+    new_end = _snap_frame(frames, end.frames, tolerance, lower=new_start + 2, upper=last_frame)
+    if (new_start, new_end) == (start.frames, end.frames):
+        return False
+
+    start, end = Timecode(new_start, fps), Timecode(new_end, fps)
+    thumb = Timecode.try_parse(scene.get("thumbnail_tc"), fps)
+    if thumb is None or thumb < start or thumb > end:
+        thumb = start + ((end - start) // 2)
+    scene["start_tc"] = str(start)
+    scene["end_tc"] = str(end)
+    scene["thumbnail_tc"] = str(thumb)
+    scene["duration_seconds"] = round(max(end - start, 1) / fps, 2)
+    return True
+
+
+def snap_payload_to_keyframes(
+    payload: dict,
+    keyframes: KeyframeIndex,
+    *,
+    tolerance_seconds: float,
+    duration_seconds: float,
+    fps: int,
+) -> int:
+    return sum(
+        1
+        for scene in _iter_scenes(payload)
+        if snap_scene_to_keyframes(
+            scene,
+            keyframes,
+            tolerance_seconds=tolerance_seconds,
+            duration_seconds=duration_seconds,
+            fps=fps,
+        )
+    )
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+from services import events
+from services.governor import get_governor
+from services.projects import update_project
+
+
+def _float_env(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def estimate_processing_seconds(
+    duration_seconds: float,
+    queue_wait_seconds: float | None = None,
+) -> int:
+    # Time spent waiting for a Gemini slot comes on top of the processing itself;
+    # until the real wait is measured, use the governor's guess.
+    if queue_wait_seconds is None:
+        queue_wait_seconds = get_governor().expected_wait_seconds()
+    queue_wait = int(queue_wait_seconds)
+    if duration_seconds <= 0:
+        return 720 + queue_wait
+    # Includes Gemini upload/inference plus local FFmpeg rendering.
+    return int(max(480, min(2400, duration_seconds * 1.0))) + queue_wait
+
+
+class ProgressTracker:
+    """Live progress of the pipelines running in this process.
+
+    Ticks only update memory, which readers see immediately. The row is written at
+    most once per ``flush_interval`` seconds per project, and whenever a caller
+    marks a stage change with ``flush=True``.
+    """
+
+    def __init__(self, flush_interval: float) -> None:
+        self.flush_interval = max(0.0, flush_interval)
+        self._lock = threading.Lock()
+        self._progress: dict[str, int] = {}
+        self._flushed: dict[str, tuple[int, float]] = {}
+
+    def report(self, project_id: str, progress: int, *, flush: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            changed = self._progress.get(project_id) != progress
+            self._progress[project_id] = progress
+        if changed:
+            events.publish(project_id, "progress", {"project_id": project_id, "progress": progress})
+        with self._lock:
+            last = self._flushed.get(project_id)
+            if last is not None and last[0] == progress and not flush:
+                return
+            if not flush and last is not None and now - last[1] < self.flush_interval:
+                return
+            self._flushed[project_id] = (progress, now)
+        update_project(project_id, progress=progress)
+
+    def current(self, project_id: str) -> int | None:
+        with self._lock:
+            return self._progress.get(project_id)
+
+    def finish(self, project_id: str) -> None:
+        """Forget a pipeline; its final status and progress are written by the caller."""
+        with self._lock:
+            self._progress.pop(project_id, None)
+            self._flushed.pop(project_id, None)
+
+
+_tracker: ProgressTracker | None = None
+_tracker_lock = threading.Lock()
+
+
+def get_progress_tracker() -> ProgressTracker:
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = ProgressTracker(flush_interval=_float_env("KINO_PROGRESS_FLUSH_SECONDS", 2.0))
+        return _tracker
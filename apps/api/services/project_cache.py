@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+# Project detail reads, keyed by (project id, updated_at). Every write goes through
+# update_project, which bumps updated_at and drops the entry, so a hit is always the
+# current state of the row; a write from another process only changes updated_at,
+# which is enough to miss.
+
+
+class CachedResponse:
+    """A serialized JSON body with its strong ETag; the gzip form is built on first use."""
+
+    __slots__ = ("body", "etag", "_gzipped")
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self._gzipped: bytes | None = None
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class CachedProject:
+    __slots__ = ("parsed", "responses")
+
+    def __init__(self) -> None:
+        # (storyboards payload, poster candidates, poster outputs), as parsed from the row.
+        self.parsed: tuple[Any, Any, Any] | None = None
+        # Serialized responses for this version of the project, e.g. ("detail", True).
+        self.responses: dict[tuple, CachedResponse] = {}
+
+
+_entries: OrderedDict[str, tuple[str, CachedProject]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _max_entries() -> int:
+    try:
+        return max(0, int(os.getenv("KINO_PROJECT_CACHE_SIZE", "256")))
+    except ValueError:
+        return 256
+
+
+def get_entry(project_id: str, updated_at: str) -> CachedProject:
+    """The cache entry for this version of the project, created empty on a miss."""
+    with _lock:
+        current = _entries.get(project_id)
+        if current is not None and current[0] == updated_at:
+            _entries.move_to_end(project_id)
+            return current[1]
+        entry = CachedProject()
+        limit = _max_entries()
+        if limit:
+            _entries[project_id] = (updated_at, entry)
+            _entries.move_to_end(project_id)
+            while len(_entries) > limit:
+                _entries.popitem(last=False)
+        return entry
+
+
+def invalidate(project_id: str) -> None:
+    with _lock:
+        _entries.pop(project_id, None)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import base64
 import json
 import uuid
 from dataclasses import dataclass
@@ -7,6 +8,7 @@ from datetime import datetime, timezone
 from typing import Any
 
 from db import get_connection
+from services import project_cache, storyboard_store
 
 
 @dataclass(frozen=True)
@@ -29,42 +31,8 @@ class ProjectRecord:
     frames_count: int
     poster_candidates_json: str | None
     poster_outputs_json: str | None
-
-
-def ensure_projects_table() -> None:
-    with get_connection() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS projects (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                description TEXT,
-                video_filename TEXT,
-                duration_seconds REAL DEFAULT 0,
-                poster_url TEXT,
-                status TEXT NOT NULL,
-                progress INTEGER NOT NULL DEFAULT 0,
-                error_message TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                processing_started_at TEXT,
-                processing_estimate_seconds INTEGER,
-                storyboards_json TEXT,
-                storyboards_count INTEGER DEFAULT 0,
-                frames_count INTEGER DEFAULT 0,
-                poster_candidates_json TEXT,
-                poster_outputs_json TEXT
-            )
-            """
-        )
-        columns = [row["name"] for row in conn.execute("PRAGMA table_info(projects)").fetchall()]
-        if "error_message" not in columns:
-            conn.execute("ALTER TABLE projects ADD COLUMN error_message TEXT")
-        if "poster_candidates_json" not in columns:
-            conn.execute("ALTER TABLE projects ADD COLUMN poster_candidates_json TEXT")
-        if "poster_outputs_json" not in columns:
-            conn.execute("ALTER TABLE projects ADD COLUMN poster_outputs_json TEXT")
-        conn.commit()
+    source_hash: str | None = None
+    queue_position: int | None = None
 
 
 def _utc_now() -> str:
@@ -78,7 +46,6 @@ def create_project(
     duration_seconds: float,
     poster_url: str | None,
 ) -> ProjectRecord:
-    ensure_projects_table()
     project_id = f"proj_{uuid.uuid4().hex[:10]}"
     now = _utc_now()
     with get_connection() as conn:
@@ -117,7 +84,6 @@ def create_project(
 
 
 def get_project(project_id: str, include_storyboards: bool = True) -> ProjectRecord:
-    ensure_projects_table()
     with get_connection() as conn:
         row = conn.execute(
             "SELECT * FROM projects WHERE id = ?",
@@ -131,17 +97,100 @@ def get_project(project_id: str, include_storyboards: bool = True) -> ProjectRec
     return record
 
 
-def list_projects() -> list[ProjectRecord]:
-    ensure_projects_table()
+def get_projects_with_storyboards(project_ids: list[str]) -> list[tuple[ProjectRecord, dict | None]]:
+    """Full records of ``project_ids``, in that order, each with its parsed storyboards.
+
+    Two queries for the whole list rather than two per project; ids that no longer
+    exist are skipped.
+    """
+    if not project_ids:
+        return []
+    placeholders = ", ".join("?" * len(project_ids))
     with get_connection() as conn:
-        rows = conn.execute(
-            "SELECT * FROM projects ORDER BY updated_at DESC",
-        ).fetchall()
-    return [ProjectRecord(**dict(row)) for row in rows]
+        rows = conn.execute(f"SELECT * FROM projects WHERE id IN ({placeholders})", project_ids).fetchall()
+        boards = storyboard_store.read_boards_of_projects(conn, project_ids)
+    records = {row["id"]: ProjectRecord(**dict(row)) for row in rows}
+    return [
+        (records[project_id], parse_storyboards(records[project_id], boards.get(project_id, [])))
+        for project_id in project_ids
+        if project_id in records
+    ]
+
+
+PROJECT_SUMMARY_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "video_filename",
+    "duration_seconds",
+    "poster_url",
+    "status",
+    "progress",
+    "error_message",
+    "created_at",
+    "updated_at",
+    "processing_started_at",
+    "processing_estimate_seconds",
+    "storyboards_count",
+    "frames_count",
+    "queue_position",
+)
+
+
+class ProjectSummary:
+    """A listing row: every project column except the JSON documents."""
+
+    __slots__ = PROJECT_SUMMARY_COLUMNS
+
+    def __init__(self, row: Any) -> None:
+        for name in PROJECT_SUMMARY_COLUMNS:
+            setattr(self, name, row[name])
+
+
+def _encode_cursor(summary: ProjectSummary) -> str:
+    raw = json.dumps([summary.updated_at, summary.id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, project_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(updated_at, str) or not isinstance(project_id, str):
+        raise ValueError("Invalid cursor")
+    return updated_at, project_id
+
+
+def list_projects(
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> tuple[list[ProjectSummary], str | None]:
+    """Most recently updated first. Returns the page and the cursor for the next one.
+
+    Pages are keyed on (updated_at, id), so each one is an index range scan no
+    matter how deep into the list it is.
+    """
+    query = f"SELECT {', '.join(PROJECT_SUMMARY_COLUMNS)} FROM projects"
+    params: list[Any] = []
+    if cursor:
+        query += " WHERE (updated_at, id) < (?, ?)"
+        params.extend(_decode_cursor(cursor))
+    query += " ORDER BY updated_at DESC, id DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit + 1)
+    with get_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+    summaries = [ProjectSummary(row) for row in rows]
+    if limit is None or len(summaries) <= limit:
+        return summaries, None
+    summaries = summaries[:limit]
+    return summaries, _encode_cursor(summaries[-1])
 
 
 def update_project(project_id: str, **fields: Any) -> None:
-    ensure_projects_table()
     fields["updated_at"] = _utc_now()
     columns = ", ".join([f"{key} = ?" for key in fields.keys()])
     values = list(fields.values()) + [project_id]
@@ -151,27 +200,57 @@ def update_project(project_id: str, **fields: Any) -> None:
             values,
         )
         conn.commit()
+    project_cache.invalidate(project_id)
 
 
 def delete_project(project_id: str) -> None:
-    ensure_projects_table()
     with get_connection() as conn:
+        storyboard_store.delete_boards(conn, project_id)
         conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
         conn.commit()
+    project_cache.invalidate(project_id)
 
 
 def set_storyboards(project_id: str, payload: dict) -> None:
-    storyboards = payload.get("storyboards") or []
-    frames_count = sum(len(board.get("scenes", [])) for board in storyboards)
+    with get_connection() as conn:
+        header, storyboards_count, frames_count = storyboard_store.write_payload(conn, project_id, payload)
+        conn.commit()
     update_project(
         project_id,
-        storyboards_json=json.dumps(payload),
-        storyboards_count=len(storyboards),
+        storyboards_json=header,
+        storyboards_count=storyboards_count,
         frames_count=frames_count,
         error_message=None,
     )
 
 
+def clear_storyboards(project_id: str) -> None:
+    with get_connection() as conn:
+        storyboard_store.delete_boards(conn, project_id)
+        conn.commit()
+    update_project(project_id, storyboards_json=None, storyboards_count=0, frames_count=0)
+
+
+def get_storyboard(project_id: str, board_number: int) -> dict | None:
+    with get_connection() as conn:
+        boards = storyboard_store.read_boards(conn, project_id, position=board_number)
+    return boards[0] if boards else None
+
+
+def list_storyboard_headers(project_id: str) -> list[dict]:
+    """Each board's own fields, in order, without reading any scenes."""
+    with get_connection() as conn:
+        return storyboard_store.read_board_headers(conn, project_id)
+
+
+def replace_storyboard(project_id: str, board_number: int, board: dict) -> None:
+    with get_connection() as conn:
+        storyboard_store.write_board(conn, project_id, board_number, board)
+        frames_count = storyboard_store.count_scenes(conn, project_id)
+        conn.commit()
+    update_project(project_id, frames_count=frames_count)
+
+
 def set_poster_candidates(project_id: str, candidates: list[dict]) -> None:
     update_project(
         project_id,
@@ -179,11 +258,60 @@ def set_poster_candidates(project_id: str, candidates: list[dict]) -> None:
     )
 
 
-def set_poster_outputs(project_id: str, posters: list[dict]) -> None:
-    update_project(
-        project_id,
-        poster_outputs_json=json.dumps(posters),
-    )
+def append_poster_outputs(project_id: str, posters: list[dict]) -> None:
+    """Append generated posters in the database, without rewriting the list from Python.
+
+    Each statement is atomic, so generations finishing together cannot drop each
+    other's posters.
+    """
+    now = _utc_now()
+    with get_connection() as conn:
+        conn.executemany(
+            """
+            UPDATE projects
+            SET poster_outputs_json = json_insert(COALESCE(poster_outputs_json, '[]'), '$[#]', json(?)),
+                updated_at = ?
+            WHERE id = ?
+            """,
+            [(json.dumps(poster), now, project_id) for poster in posters],
+        )
+        conn.commit()
+    project_cache.invalidate(project_id)
+
+
+def remove_poster_output(project_id: str, poster_id: str) -> dict | None:
+    """Remove one poster by id; returns it, or None if it was not there."""
+    with get_connection() as conn:
+        row = conn.execute(
+            """
+            SELECT value FROM projects, json_each(projects.poster_outputs_json)
+            WHERE projects.id = ? AND json_extract(value, '$.id') = ?
+            """,
+            (project_id, poster_id),
+        ).fetchone()
+        if row is None:
+            return None
+        # The path is looked up inside the UPDATE, so a concurrent removal that
+        # shifts the array cannot make this delete the wrong entry.
+        cursor = conn.execute(
+            """
+            UPDATE projects
+            SET poster_outputs_json = json_remove(poster_outputs_json, (
+                    SELECT '$[' || key || ']' FROM json_each(projects.poster_outputs_json)
+                    WHERE json_extract(value, '$.id') = ?
+                    LIMIT 1
+                )),
+                updated_at = ?
+            WHERE id = ? AND EXISTS (
+                SELECT 1 FROM json_each(projects.poster_outputs_json)
+                WHERE json_extract(value, '$.id') = ?
+            )
+            """,
+            (poster_id, _utc_now(), project_id, poster_id),
+        )
+        conn.commit()
+    project_cache.invalidate(project_id)
+    return json.loads(row["value"]) if cursor.rowcount else None
 
 
 def _normalize_storyboards_payload(payload: Any) -> dict | None:
@@ -204,14 +332,21 @@ def _normalize_storyboards_payload(payload: Any) -> dict | None:
     return None
 
 
-def parse_storyboards(record: ProjectRecord) -> dict | None:
+def parse_storyboards(record: ProjectRecord, boards: list[dict] | None = None) -> dict | None:
+    """The stored document with its boards put back; pass ``boards`` if already read."""
     if not record.storyboards_json:
         return None
     try:
         payload = json.loads(record.storyboards_json)
     except json.JSONDecodeError:
         return None
-    return _normalize_storyboards_payload(payload)
+    payload = _normalize_storyboards_payload(payload)
+    if payload is not None and "storyboards" in payload and payload["storyboards"] is None:
+        if boards is None:
+            with get_connection() as conn:
+                boards = storyboard_store.read_boards(conn, record.id)
+        payload["storyboards"] = boards
+    return payload
 
 
 def parse_poster_candidates(record: ProjectRecord) -> list[dict] | None:
@@ -226,8 +361,13 @@ def parse_poster_outputs(record: ProjectRecord) -> list[dict] | None:
     return json.loads(record.poster_outputs_json)
 
 
-def compute_progress(record: ProjectRecord) -> int:
-    if record.status != "processing" or not record.processing_started_at:
+def compute_progress(record: ProjectRecord, live: int | None = None) -> int:
+    if record.status != "processing":
+        return record.progress
+    # Reported by a pipeline running in this process; fresher than the row.
+    if live is not None:
+        return live
+    if not record.processing_started_at:
         return record.progress
 
     try:
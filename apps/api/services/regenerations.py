@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from services import events
+
+# Regenerating a storyboard logs the film (once), asks Gemini for the new board and
+# renders its scenes, which takes far longer than a request should. Jobs run here and
+# report on the project's event stream as "regenerate" events; the state of recently
+# finished jobs stays in memory for GET /regenerations/{job_id}.
+
+_FINISHED_MAX = 256
+
+
+class RegenerationJob:
+    def __init__(self, project_id: str, board_number: int) -> None:
+        self.id = _job_id(project_id, board_number)
+        self.project_id = project_id
+        self.board_number = board_number
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress = 0
+        self.error: str | None = None
+
+    def report(self, stage: str, fraction: float) -> None:
+        progress = max(0, min(99, int(fraction * 100)))
+        if progress != self.progress or stage != self.stage:
+            self.stage = stage
+            self.progress = progress
+            self._publish()
+
+    def snapshot(self) -> dict:
+        state = {
+            "job_id": self.id,
+            "project_id": self.project_id,
+            "board_number": self.board_number,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+        }
+        if self.error:
+            state["error"] = self.error
+        return state
+
+    def _publish(self) -> None:
+        events.publish(self.project_id, "regenerate", self.snapshot())
+
+
+_jobs: dict[str, RegenerationJob] = {}
+_finished: OrderedDict[str, dict] = OrderedDict()
+_jobs_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def _job_id(project_id: str, board_number: int) -> str:
+    return f"regen_{project_id}_{board_number}"
+
+
+def _regenerate_workers() -> int:
+    try:
+        return max(1, int(os.getenv("KINO_REGENERATE_WORKERS", "2")))
+    except ValueError:
+        return 2
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _jobs_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_regenerate_workers(), thread_name_prefix="regenerate")
+        return _executor
+
+
+def _run_job(job: RegenerationJob, run: Callable[[RegenerationJob], None]) -> None:
+    try:
+        job.status = "running"
+        job._publish()
+        run(job)
+        job.stage = "done"
+        job.progress = 100
+        job.status = "ready"
+    except Exception as exc:
+        job.status = "failed"
+        job.error = str(exc) or exc.__class__.__name__
+        print(f"[Pipeline:{job.project_id}] Regenerating storyboard {job.board_number} failed: {job.error}")
+    finally:
+        with _jobs_lock:
+            _jobs.pop(job.id, None)
+            _finished[job.id] = job.snapshot()
+            _finished.move_to_end(job.id)
+            while len(_finished) > _FINISHED_MAX:
+                _finished.popitem(last=False)
+        job._publish()
+
+
+def start_regeneration(
+    project_id: str,
+    board_number: int,
+    run: Callable[[RegenerationJob], None],
+) -> RegenerationJob:
+    """Queue ``run`` for the board, or return the job already regenerating it."""
+    job = RegenerationJob(project_id, board_number)
+    with _jobs_lock:
+        existing = _jobs.get(job.id)
+        if existing is not None:
+            return existing
+        _jobs[job.id] = job
+        _finished.pop(job.id, None)
+    job._publish()
+    _get_executor().submit(_run_job, job, run)
+    return job
+
+
+def get_regeneration_state(job_id: str) -> dict | None:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            state = _finished.get(job_id)
+            return dict(state) if state is not None else None
+    return job.snapshot()
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from services.json_stream import WILDCARD, IncrementalJsonParser
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+@dataclass
+class SalvageReport:
+    boards_found: int = 0
+    boards_kept: int = 0
+    scenes_kept: int = 0
+    scenes_dropped: int = 0
+    truncated: bool = False
+    notes: list[str] = field(default_factory=list)
+
+
+def _strip_noise(text: str) -> str:
+    """Drop markdown fences and any chatter around the outermost JSON object."""
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.split("\n", 1)[1] if "\n" in cleaned else ""
+        if cleaned.rstrip().endswith("```"):
+            cleaned = cleaned.rstrip()[:-3]
+    start = cleaned.find("{")
+    if start < 0:
+        return ""
+    return cleaned[start:]
+
+
+def _drop_trailing_commas(text: str) -> str:
+    out: list[str] = []
+    in_string = False
+    escape = False
+    pending_comma: int | None = None
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char in "}]" and pending_comma is not None:
+            del out[pending_comma]
+        if char == ",":
+            pending_comma = len(out)
+        elif not char.isspace():
+            pending_comma = None
+        if char == '"':
+            in_string = True
+        out.append(char)
+    return "".join(out)
+
+
+def repair_truncated_json(text: str) -> tuple[str, bool]:
+    """Close a JSON document that was cut off mid-stream.
+
+    The document is cut back to the last complete element of the innermost
+    container (so a half-written trailing scene disappears) and the open
+    containers are closed. Returns the repaired text and whether it was truncated.
+    """
+    stack: list[str] = []
+    in_string = False
+    escape = False
+    cut_at = 0
+    cut_stack: list[str] = []
+
+    for index, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append(char)
+            # An empty container is a valid prefix on its own.
+            cut_at, cut_stack = index + 1, list(stack)
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            cut_at, cut_stack = index + 1, list(stack)
+            if not stack:
+                return text[: index + 1], False
+        elif char == ",":
+            cut_at, cut_stack = index, list(stack)
+
+    repaired = text[:cut_at] + "".join(_CLOSERS[opener] for opener in reversed(cut_stack))
+    return repaired, True
+
+
+def salvage_storyboard_payload(
+    text: str,
+    validate_scene: Callable[[Any], dict],
+    validate_board: Callable[[dict], dict],
+    validate_poster: Callable[[Any], dict],
+) -> tuple[dict, SalvageReport]:
+    """Recover whatever complete, valid storyboards and scenes a malformed response contains.
+
+    Storyboards come from the repaired document, so a board cut off by truncation
+    keeps the scenes the model finished; scenes it had not closed are dropped. If the
+    document cannot be repaired, only boards whose JSON object was closed are kept.
+    Each scene is validated on its own and invalid ones are dropped. The validators
+    raise on invalid input and return the cleaned dict otherwise.
+    """
+    report = SalvageReport()
+    cleaned = _drop_trailing_commas(_strip_noise(text))
+
+    parser = IncrementalJsonParser(watch=[("storyboards", WILDCARD), ("storyboards", WILDCARD, "scenes", WILDCARD)])
+    closed_boards: list[Any] = []
+    closed_scenes: set[tuple[int, int]] = set()
+    for path, value in parser.feed(cleaned):
+        if len(path) == 2:
+            closed_boards.append(value)
+        else:
+            closed_scenes.add((path[1], path[3]))
+
+    repaired, report.truncated = repair_truncated_json(cleaned)
+    try:
+        document = json.loads(repaired) if repaired else {}
+    except json.JSONDecodeError:
+        document = {}
+        report.notes.append("top-level fields unrecoverable")
+    if not isinstance(document, dict):
+        document = {}
+
+    candidates: list[tuple[Any, list[Any]]] = []
+    if isinstance(document.get("storyboards"), list):
+        for board_index, board in enumerate(document["storyboards"]):
+            raw_scenes = board.get("scenes") if isinstance(board, dict) else None
+            raw_scenes = raw_scenes if isinstance(raw_scenes, list) else []
+            finished = [
+                raw_scene
+                for scene_index, raw_scene in enumerate(raw_scenes)
+                if (board_index, scene_index) in closed_scenes
+            ]
+            report.scenes_dropped += len(raw_scenes) - len(finished)
+            candidates.append((board, finished))
+    else:
+        for board in closed_boards:
+            raw_scenes = board.get("scenes") if isinstance(board, dict) else None
+            candidates.append((board, raw_scenes if isinstance(raw_scenes, list) else []))
+    report.boards_found = len(candidates)
+
+    storyboards: list[dict] = []
+    for board, raw_scenes in candidates:
+        if not isinstance(board, dict):
+            continue
+        scenes: list[dict] = []
+        for raw_scene in raw_scenes:
+            try:
+                scenes.append(validate_scene(raw_scene))
+            except Exception:
+                report.scenes_dropped += 1
+        if not scenes:
+            continue
+        try:
+            storyboards.append(validate_board({**board, "scenes": scenes}))
+        except Exception:
+            report.scenes_dropped += len(scenes)
+            continue
+        report.scenes_kept += len(scenes)
+    report.boards_kept = len(storyboards)
+
+    poster_candidates: list[dict] = []
+    for entry in document.get("poster_candidates") or []:
+        try:
+            poster_candidates.append(validate_poster(entry))
+        except Exception:
+            continue
+
+    payload = {
+        "movie_title": str(document.get("movie_title") or ""),
+        "duration": str(document.get("duration") or ""),
+        "storyboards": storyboards,
+        "poster_candidates": poster_candidates,
+    }
+    return payload, report
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from db import get_connection
+from services.storage import get_private_root, move_out_of_storage
+
+# Content-addressed store for source films: ``sources/{sha256}/source{ext}`` holds
+# one copy of each film and project directories hard-link to it. ``source_refs``
+# records which projects use which film; the store entry, including renders cached
+# under it, is removed when the last project lets go. The store lives under the
+# private root, not the storage root that /media serves: anyone holding a film can
+# compute its hash, so its path must not be reachable without auth.
+#
+# Anything in the store or linked from it is shared: never open these files for
+# writing in place. Unlink the project's path first, then write a new file.
+
+
+def source_store_enabled() -> bool:
+    return os.getenv("KINO_SOURCE_STORE", "true").lower() in {"1", "true", "yes"}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _store_dir(source_hash: str) -> Path:
+    return get_private_root() / "sources" / source_hash
+
+
+def move_legacy_store() -> None:
+    """Move a store kept under the storage root by earlier versions out of /media's reach."""
+    move_out_of_storage("_sources", get_private_root() / "sources")
+
+
+def _link_into(existing: Path, target: Path) -> None:
+    """Point ``target`` at ``existing``'s inode, replacing whatever ``target`` was."""
+    temporary = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.link")
+    os.link(existing, temporary)
+    os.replace(temporary, target)
+
+
+def _release(conn, project_id: str) -> str | None:
+    """Drop the project's reference; returns the hash if nothing uses it any more."""
+    row = conn.execute(
+        "SELECT source_hash FROM source_refs WHERE project_id = ?",
+        (project_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    conn.execute("DELETE FROM source_refs WHERE project_id = ?", (project_id,))
+    remaining = conn.execute(
+        "SELECT COUNT(*) FROM source_refs WHERE source_hash = ?",
+        (row["source_hash"],),
+    ).fetchone()[0]
+    if remaining:
+        return None
+    conn.execute("DELETE FROM sources WHERE source_hash = ?", (row["source_hash"],))
+    return row["source_hash"]
+
+
+def adopt_source(project_id: str, path: Path, source_hash: str) -> str | None:
+    """Store ``path`` by content, or swap it for the stored copy of the same film.
+
+    Returns another project already using this film, if there is one.
+    """
+    store_dir = _store_dir(source_hash)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT filename FROM sources WHERE source_hash = ?",
+                (source_hash,),
+            ).fetchone()
+            stored = store_dir / row["filename"] if row is not None else None
+            if stored is not None and stored.exists():
+                if not os.path.samefile(stored, path):
+                    _link_into(stored, path)
+            else:
+                stored = store_dir / f"source{path.suffix.lower()}"
+                _link_into(path, stored)
+                conn.execute(
+                    "INSERT OR REPLACE INTO sources (source_hash, filename, size_bytes, created_at) VALUES (?, ?, ?, ?)",
+                    (source_hash, stored.name, path.stat().st_size, _now()),
+                )
+            previous = conn.execute(
+                "SELECT source_hash FROM source_refs WHERE project_id = ?",
+                (project_id,),
+            ).fetchone()
+            orphaned = None
+            if previous is not None and previous["source_hash"] != source_hash:
+                orphaned = _release(conn, project_id)
+            conn.execute(
+                "INSERT OR REPLACE INTO source_refs (project_id, source_hash, created_at) VALUES (?, ?, ?)",
+                (project_id, source_hash, _now()),
+            )
+            donor = conn.execute(
+                """
+                SELECT project_id FROM source_refs
+                WHERE source_hash = ? AND project_id != ?
+                ORDER BY created_at
+                LIMIT 1
+                """,
+                (source_hash, project_id),
+            ).fetchone()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    if orphaned:
+        shutil.rmtree(_store_dir(orphaned), ignore_errors=True)
+    return donor["project_id"] if donor is not None else None
+
+
+def release_source(project_id: str) -> None:
+    """Forget the project's film, deleting the stored copy if no other project uses it."""
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            orphaned = _release(conn, project_id)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    if orphaned:
+        shutil.rmtree(_store_dir(orphaned), ignore_errors=True)
+
+
+def render_key(source_hash: str, commands: list[list[str]], placeholders: dict[str, str]) -> str:
+    """Identify a render by its exact ffmpeg commands, with per-project paths masked out."""
+    normalized = []
+    for command in commands:
+        args = []
+        for arg in command:
+            for value, name in placeholders.items():
+                arg = arg.replace(value, name)
+            args.append(arg)
+        normalized.append(args)
+    raw = json.dumps([source_hash, normalized])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _render_paths(source_hash: str, key: str, outputs: list[Path]) -> list[Path]:
+    directory = _store_dir(source_hash) / "renders" / key[:2]
+    return [directory / f"{key}{output.suffix}" for output in outputs]
+
+
+def link_cached_render(source_hash: str, key: str, outputs: list[Path]) -> bool:
+    """Hard-link a previously rendered set of outputs into place, if all are stored."""
+    cached = _render_paths(source_hash, key, outputs)
+    if not all(path.exists() and path.stat().st_size > 0 for path in cached):
+        return False
+    try:
+        for stored, output in zip(cached, outputs):
+            output.parent.mkdir(parents=True, exist_ok=True)
+            _link_into(stored, output)
+    except OSError:
+        return False
+    return True
+
+
+def store_render(source_hash: str, key: str, outputs: list[Path]) -> None:
+    if not _store_dir(source_hash).exists():
+        # Only films in the store have a lifetime to hang renders on.
+        return
+    for stored, output in zip(_render_paths(source_hash, key, outputs), outputs):
+        try:
+            stored.parent.mkdir(parents=True, exist_ok=True)
+            _link_into(output, stored)
+        except OSError:
+            return
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import hashlib
 import os
+import shutil
 from pathlib import Path
 
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
 
 def get_storage_root() -> Path:
     root = Path(os.getenv("KINO_STORAGE_DIR", "data/uploads"))
@@ -10,7 +14,45 @@ def get_storage_root() -> Path:
     return root
 
 
+def get_private_root() -> Path:
+    """Files the API keeps for itself; unlike the storage root, never served under /media.
+
+    Defaults to a ``private`` directory next to the storage root, so hard links
+    between the two stay on one filesystem.
+    """
+    raw = os.getenv("KINO_PRIVATE_DIR")
+    root = Path(raw) if raw else Path(os.getenv("KINO_STORAGE_DIR", "data/uploads")).parent / "private"
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def move_out_of_storage(relative: str, target: Path) -> None:
+    """Move a directory earlier versions kept under the storage root to ``target``."""
+    legacy = get_storage_root() / relative
+    if not legacy.is_dir():
+        return
+    if target.exists():
+        shutil.rmtree(legacy, ignore_errors=True)
+        return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(legacy, target)
+    except OSError:
+        shutil.move(str(legacy), str(target))
+
+
 def get_project_dir(project_id: str) -> Path:
     path = get_storage_root() / project_id
     path.mkdir(parents=True, exist_ok=True)
     return path
+
+
+def hash_file(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while True:
+            chunk = handle.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
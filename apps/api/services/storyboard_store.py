@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+# Boards and scenes live in their own rows (see packages/db/schema.ts); the project
+# keeps only the rest of the Gemini document in ``projects.storyboards_json``, with
+# ``"storyboards": null`` marking where the boards go back in.
+#
+# A key is stored in its column only when the value has the column's type; anything
+# else (unknown keys, nulls, ints where a float is expected) goes to extra_json, so a
+# payload reads back exactly as it was written.
+
+BOARD_COLUMNS: dict[str, type] = {
+    "name": str,
+    "target_length": str,
+    "tone": str,
+    "description": str,
+}
+
+SCENE_COLUMNS: dict[str, type] = {
+    "scene_number": int,
+    "start_tc": str,
+    "end_tc": str,
+    "duration_seconds": float,
+    "thumbnail_tc": str,
+    "description": str,
+    "emotional_beat": str,
+    "music_idea": str,
+    "camera_move": str,
+    "shot_type": str,
+    "clip_url": str,
+    "thumbnail_url": str,
+}
+
+
+def _split(item: dict, columns: dict[str, type], skip: str | None = None) -> tuple[list[Any], str | None]:
+    values: list[Any] = []
+    for key, kind in columns.items():
+        value = item.get(key)
+        values.append(value if type(value) is kind else None)
+    extra = {
+        key: value
+        for key, value in item.items()
+        if key != skip and (key not in columns or type(value) is not columns[key])
+    }
+    return values, json.dumps(extra) if extra else None
+
+
+def _join(row: sqlite3.Row, columns: Iterable[str], prefix: str = "") -> dict:
+    item = {key: row[prefix + key] for key in columns if row[prefix + key] is not None}
+    extra = row[prefix + "extra_json"]
+    if extra:
+        item.update(json.loads(extra))
+    return item
+
+
+def _insert_board(conn: sqlite3.Connection, project_id: str, position: int, board: dict, now: str) -> int:
+    board_id = f"sb_{uuid.uuid4().hex[:12]}"
+    raw_scenes = board.get("scenes")
+    values, extra = _split(board, BOARD_COLUMNS, skip="scenes" if isinstance(raw_scenes, list) else None)
+    conn.execute(
+        f"""
+        INSERT INTO storyboards (id, project_id, position, {", ".join(BOARD_COLUMNS)}, extra_json, created_at)
+        VALUES (?, ?, ?, {", ".join("?" for _ in BOARD_COLUMNS)}, ?, ?)
+        """,
+        (board_id, project_id, position, *values, extra, now),
+    )
+    scenes = [scene for scene in raw_scenes if isinstance(scene, dict)] if isinstance(raw_scenes, list) else []
+    conn.executemany(
+        f"""
+        INSERT INTO scenes (id, storyboard_id, project_id, position, {", ".join(SCENE_COLUMNS)}, extra_json)
+        VALUES (?, ?, ?, ?, {", ".join("?" for _ in SCENE_COLUMNS)}, ?)
+        """,
+        [
+            (f"scn_{uuid.uuid4().hex[:12]}", board_id, project_id, scene_position, *values, extra)
+            for scene_position, (values, extra) in enumerate(
+                (_split(scene, SCENE_COLUMNS) for scene in scenes), start=1
+            )
+        ],
+    )
+    return len(scenes)
+
+
+def delete_boards(conn: sqlite3.Connection, project_id: str) -> None:
+    conn.execute("DELETE FROM scenes WHERE project_id = ?", (project_id,))
+    conn.execute("DELETE FROM storyboards WHERE project_id = ?", (project_id,))
+
+
+def write_payload(conn: sqlite3.Connection, project_id: str, payload: dict) -> tuple[str, int, int]:
+    """Replace a project's boards with ``payload``'s; returns (header json, boards, scenes)."""
+    delete_boards(conn, project_id)
+    header = dict(payload)
+    boards = header.get("storyboards")
+    if not isinstance(boards, list):
+        return json.dumps(header), 0, 0
+
+    header["storyboards"] = None
+    now = datetime.now(timezone.utc).isoformat()
+    boards = [board for board in boards if isinstance(board, dict)]
+    scenes_count = sum(
+        _insert_board(conn, project_id, position, board, now)
+        for position, board in enumerate(boards, start=1)
+    )
+    return json.dumps(header), len(boards), scenes_count
+
+
+def write_board(conn: sqlite3.Connection, project_id: str, position: int, board: dict) -> int:
+    """Replace the board at ``position`` (1-based); returns how many scenes it now has."""
+    conn.execute(
+        "DELETE FROM scenes WHERE storyboard_id IN "
+        "(SELECT id FROM storyboards WHERE project_id = ? AND position = ?)",
+        (project_id, position),
+    )
+    conn.execute(
+        "DELETE FROM storyboards WHERE project_id = ? AND position = ?",
+        (project_id, position),
+    )
+    return _insert_board(conn, project_id, position, board, datetime.now(timezone.utc).isoformat())
+
+
+def read_board_headers(conn: sqlite3.Connection, project_id: str) -> list[dict]:
+    rows = conn.execute(
+        f"SELECT {', '.join(BOARD_COLUMNS)}, extra_json FROM storyboards WHERE project_id = ? ORDER BY position",
+        (project_id,),
+    )
+    return [_join(row, BOARD_COLUMNS) for row in rows]
+
+
+def _read_boards(conn: sqlite3.Connection, where: str, params: list[Any]) -> dict[str, list[dict]]:
+    # One statement, so a concurrent rewrite can never be seen half-applied.
+    board_fields = ", ".join(f"b.{key} AS b_{key}" for key in BOARD_COLUMNS)
+    scene_fields = ", ".join(f"s.{key} AS s_{key}" for key in SCENE_COLUMNS)
+    query = f"""
+        SELECT b.project_id AS b_project_id, b.id AS b_id, {board_fields}, b.extra_json AS b_extra_json,
+               s.id AS s_id, {scene_fields}, s.extra_json AS s_extra_json
+        FROM storyboards b
+        LEFT JOIN scenes s ON s.storyboard_id = b.id
+        WHERE {where}
+        ORDER BY b.project_id, b.position, s.position
+    """
+
+    boards: dict[str, list[dict]] = {}
+    current_id = None
+    for row in conn.execute(query, params):
+        project_boards = boards.setdefault(row["b_project_id"], [])
+        if row["b_id"] != current_id:
+            current_id = row["b_id"]
+            board = _join(row, BOARD_COLUMNS, prefix="b_")
+            board.setdefault("scenes", [])
+            project_boards.append(board)
+        if row["s_id"] is not None:
+            project_boards[-1]["scenes"].append(_join(row, SCENE_COLUMNS, prefix="s_"))
+    return boards
+
+
+def read_boards(conn: sqlite3.Connection, project_id: str, position: int | None = None) -> list[dict]:
+    if position is None:
+        return _read_boards(conn, "b.project_id = ?", [project_id]).get(project_id, [])
+    return _read_boards(conn, "b.project_id = ? AND b.position = ?", [project_id, position]).get(project_id, [])
+
+
+def read_boards_of_projects(conn: sqlite3.Connection, project_ids: list[str]) -> dict[str, list[dict]]:
+    """Every board of each project, by project id; projects without boards are left out."""
+    if not project_ids:
+        return {}
+    placeholders = ", ".join("?" * len(project_ids))
+    return _read_boards(conn, f"b.project_id IN ({placeholders})", list(project_ids))
+
+
+def count_scenes(conn: sqlite3.Connection, project_id: str) -> int:
+    row = conn.execute("SELECT COUNT(*) FROM scenes WHERE project_id = ?", (project_id,)).fetchone()
+    return int(row[0])
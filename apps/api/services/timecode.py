@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from functools import lru_cache, total_ordering
+from math import gcd
+
+# Gemini is asked for HH:MM:SS.FF but also produces SMPTE-style HH:MM:SS:FF,
+# drop-frame separators (;FF), MM:SS.FF and bare SS.FF. The frame field is a frame
+# count, not a decimal fraction, and out-of-range fields carry over (SS=75 is 1:15).
+_FRAME_SEPARATORS = ".;"
+
+
+def _digits(token: str, text: str) -> int:
+    if not token.isdigit() or not token.isascii():
+        raise ValueError(f"Invalid timecode format: {text}")
+    return int(token)
+
+
+@lru_cache(maxsize=16384)
+def _parse_frames(text: str, fps: int) -> int:
+    if not text:
+        raise ValueError("Invalid timecode format: empty")
+
+    parts = text.split(":")
+    if len(parts) == 4:
+        frames_token = parts.pop()
+    else:
+        frames_token = "0"
+        for separator in _FRAME_SEPARATORS:
+            if separator in parts[-1]:
+                parts[-1], frames_token = parts[-1].split(separator, 1)
+                break
+    if len(parts) > 3:
+        raise ValueError(f"Invalid timecode format: {text}")
+
+    fields = [_digits(part, text) for part in parts]
+    while len(fields) < 3:
+        fields.insert(0, 0)
+    hours, minutes, seconds = fields
+    return (((hours * 3600) + (minutes * 60) + seconds) * fps) + _digits(frames_token, text)
+
+
+@lru_cache(maxsize=16384)
+def _parse_mm_ss_ff_frames(text: str, fps: int) -> int | None:
+    parts = text.split(":")
+    if len(parts) != 3:
+        return None
+    first, second, third = parts
+    frames_token = third.split(".", 1)[0]
+    if not (first.isdigit() and second.isdigit() and frames_token.isdigit()):
+        return None
+    seconds = int(second)
+    if seconds >= 60:
+        return None
+    return (((int(first) * 60) + seconds) * fps) + int(frames_token)
+
+
+def parse_frames(value: object, fps: int) -> int | None:
+    """Frame count for ``value``, or None when it is empty or malformed."""
+    if not value:
+        return None
+    try:
+        return _parse_frames(str(value).strip(), max(int(fps), 1))
+    except ValueError:
+        return None
+
+
+def parse_mm_ss_ff_frames(value: object, fps: int) -> int | None:
+    if not value:
+        return None
+    return _parse_mm_ss_ff_frames(str(value).strip(), max(int(fps), 1))
+
+
+@lru_cache(maxsize=16384)
+def format_frames(frames: int, fps: int) -> str:
+    total_seconds, frame = divmod(frames, fps)
+    minutes, seconds = divmod(total_seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{frame:02d}"
+
+
+@total_ordering
+class Timecode:
+    """A non-negative position in a film, stored as an integer frame count.
+
+    Instances are immutable; the HH:MM:SS.FF text is only built when asked for.
+    """
+
+    __slots__ = ("frames", "fps", "_text")
+
+    def __init__(self, frames: int, fps: int) -> None:
+        fps = max(int(fps), 1)
+        object.__setattr__(self, "frames", max(int(frames), 0))
+        object.__setattr__(self, "fps", fps)
+        object.__setattr__(self, "_text", None)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("Timecode is immutable")
+
+    @classmethod
+    def parse(cls, value: str | Timecode, fps: int) -> Timecode:
+        """Strictly parse a timecode string; raises ValueError on anything malformed."""
+        if isinstance(value, Timecode):
+            return value if value.fps == fps else cls.from_seconds(value.seconds, fps)
+        return cls(_parse_frames(str(value).strip(), max(int(fps), 1)), fps)
+
+    @classmethod
+    def try_parse(cls, value: str | Timecode | None, fps: int) -> Timecode | None:
+        if isinstance(value, Timecode):
+            return cls.parse(value, fps)
+        frames = parse_frames(value, fps)
+        return None if frames is None else cls(frames, fps)
+
+    @classmethod
+    def parse_mm_ss_ff(cls, value: str | None, fps: int) -> Timecode | None:
+        """Read ``value`` as MM:SS:FF, the layout Gemini sometimes uses for short films."""
+        frames = parse_mm_ss_ff_frames(value, fps)
+        return None if frames is None else cls(frames, fps)
+
+    @classmethod
+    def from_seconds(cls, seconds: float, fps: int) -> Timecode:
+        # Truncates to the frame containing ``seconds``, like the old string helper did.
+        return cls(int(max(0.0, seconds) * max(int(fps), 1)), fps)
+
+    @property
+    def seconds(self) -> float:
+        return self.frames / self.fps
+
+    def _fields(self) -> tuple[int, int, int, int]:
+        total_seconds, frame = divmod(self.frames, self.fps)
+        minutes, seconds = divmod(total_seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        return hours, minutes, seconds, frame
+
+    def __str__(self) -> str:
+        text = self._text
+        if text is None:
+            text = format_frames(self.frames, self.fps)
+            object.__setattr__(self, "_text", text)
+        return text
+
+    def edl(self) -> str:
+        """SMPTE non-drop-frame form, HH:MM:SS:FF."""
+        hours, minutes, seconds, frame = self._fields()
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}:{frame:02d}"
+
+    def ffmpeg(self) -> str:
+        """Exact seconds for ffmpeg's -ss/-to, which read ``.FF`` as a decimal fraction."""
+        return f"{self.frames / self.fps:.6f}"
+
+    def __repr__(self) -> str:
+        return f"Timecode({str(self)!r}, fps={self.fps})"
+
+    def __add__(self, frames: int) -> Timecode:
+        return Timecode(self.frames + int(frames), self.fps)
+
+    def __sub__(self, other: Timecode | int) -> Timecode | int:
+        if isinstance(other, Timecode):
+            return self.frames - other.frames
+        return Timecode(self.frames - int(other), self.fps)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Timecode):
+            return NotImplemented
+        return self.frames * other.fps == other.frames * self.fps
+
+    def __lt__(self, other: object) -> bool:
+        if not isinstance(other, Timecode):
+            return NotImplemented
+        return self.frames * other.fps < other.frames * self.fps
+
+    def __hash__(self) -> int:
+        # Equal timecodes at different rates (24 frames @ 24 and 48 @ 48) share the
+        # reduced (frames, fps) pair, so the hash agrees with __eq__.
+        divisor = gcd(self.frames, self.fps) or 1
+        return hash((self.frames // divisor, self.fps // divisor))
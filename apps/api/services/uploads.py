@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from db import get_connection
+from services.film_index import delete_film_index
+from services.ingest import IngestResult, discard_tee, open_tee
+from services.keyframes import delete_keyframe_index
+from services.media_info import probe_and_store_media_info, save_media_info
+from services.progress import estimate_processing_seconds
+from services.projects import get_project, update_project
+from services.storage import get_project_dir
+
+# Resumable uploads: the client opens a session with the file's size, then sends
+# byte ranges in order. Each range is written straight into a preallocated
+# ``.{upload_id}.part`` file in the project directory, and ``received_bytes`` is the
+# offset to resume from after a dropped connection.
+
+WRITE_BLOCK_SIZE = 1024 * 1024
+
+# Runs the processing pipeline for a project's finished source (project id, path).
+# The pipeline lives with the project routes, which register it at import.
+_source_processor: Callable[[str, str], None] | None = None
+
+
+@dataclass(frozen=True)
+class UploadSession:
+    id: str
+    project_id: str
+    filename: str
+    size_bytes: int
+    received_bytes: int
+
+    @property
+    def part_path(self) -> Path:
+        return get_project_dir(self.project_id) / f".{self.id}.part"
+
+    @property
+    def complete(self) -> bool:
+        return self.received_bytes >= self.size_bytes
+
+
+def chunk_size_bytes() -> int:
+    try:
+        megabytes = int(os.getenv("KINO_UPLOAD_CHUNK_MB", "16"))
+    except ValueError:
+        megabytes = 16
+    return max(1, megabytes) * 1024 * 1024
+
+
+def safe_filename(filename: str) -> str:
+    name = Path(filename.replace("\\", "/")).name.strip()
+    if not name or name.startswith("."):
+        raise ValueError("Invalid filename")
+    return name
+
+
+def preallocate(path: Path, size: int) -> None:
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        try:
+            # Reserves the blocks up front, so the film is laid out contiguously and
+            # a full disk fails here rather than halfway through the upload.
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError):
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+
+def write_at(fd: int, data: bytes, position: int) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, position)
+        view = view[written:]
+        position += written
+
+
+def _row_to_session(row) -> UploadSession:
+    return UploadSession(
+        id=row["id"],
+        project_id=row["project_id"],
+        filename=row["filename"],
+        size_bytes=row["size_bytes"],
+        received_bytes=row["received_bytes"],
+    )
+
+
+def create_session(project_id: str, filename: str, size_bytes: int) -> UploadSession:
+    """Start an upload, replacing any unfinished one for the project."""
+    delete_project_sessions(project_id)
+    session = UploadSession(
+        id=f"up_{uuid.uuid4().hex}",
+        project_id=project_id,
+        filename=safe_filename(filename),
+        size_bytes=size_bytes,
+        received_bytes=0,
+    )
+    preallocate(session.part_path, size_bytes)
+    open_tee(session.id)
+    now = datetime.now(timezone.utc).isoformat()
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO upload_sessions (id, project_id, filename, size_bytes, received_bytes, created_at, updated_at)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+            """,
+            (session.id, project_id, session.filename, size_bytes, now, now),
+        )
+        conn.commit()
+    return session
+
+
+def get_session(project_id: str, upload_id: str) -> UploadSession:
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT * FROM upload_sessions WHERE id = ? AND project_id = ?",
+            (upload_id, project_id),
+        ).fetchone()
+    if row is None:
+        raise ValueError("Upload not found")
+    return _row_to_session(row)
+
+
+def record_received(upload_id: str, expected: int, received: int) -> bool:
+    """Move the offset from ``expected`` to ``received``; False if it was no longer ``expected``."""
+    with get_connection() as conn:
+        cursor = conn.execute(
+            """
+            UPDATE upload_sessions SET received_bytes = ?, updated_at = ?
+            WHERE id = ? AND received_bytes = ?
+            """,
+            (received, datetime.now(timezone.utc).isoformat(), upload_id, expected),
+        )
+        conn.commit()
+    return cursor.rowcount == 1
+
+
+def delete_session(session: UploadSession, remove_file: bool = True) -> None:
+    with get_connection() as conn:
+        conn.execute("DELETE FROM upload_sessions WHERE id = ?", (session.id,))
+        conn.commit()
+    discard_tee(session.id)
+    if remove_file:
+        session.part_path.unlink(missing_ok=True)
+
+
+def delete_project_sessions(project_id: str) -> None:
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT * FROM upload_sessions WHERE project_id = ?",
+            (project_id,),
+        ).fetchall()
+        conn.execute("DELETE FROM upload_sessions WHERE project_id = ?", (project_id,))
+        conn.commit()
+    for row in rows:
+        discard_tee(row["id"])
+        _row_to_session(row).part_path.unlink(missing_ok=True)
+
+
+def begin_upload(project_id: str, filename: str) -> None:
+    record = get_project(project_id, include_storyboards=False)
+    # The old source may be a link into the shared store; never write through it.
+    for name in {record.video_filename, filename}:
+        if name:
+            (get_project_dir(project_id) / name).unlink(missing_ok=True)
+    update_project(
+        project_id,
+        status="uploading",
+        progress=5,
+        video_filename=filename,
+        source_hash=None,
+        error_message=None,
+    )
+    delete_film_index(project_id)
+    delete_keyframe_index(project_id)
+
+
+def finish_upload(project_id: str, target_path: Path, ingest: IngestResult | None = None) -> None:
+    """Record what is known about a fully written source; the caller queues process_source."""
+    record = get_project(project_id, include_storyboards=False)
+    media_info = ingest.media_info if ingest else None
+    if media_info is not None and media_info.duration_seconds > 0 and media_info.fps > 0:
+        save_media_info(project_id, media_info)
+        print(
+            f"[Pipeline:{project_id}] Probed source while uploading: {media_info.duration_seconds:.1f}s, "
+            f"{media_info.fps:.3f} fps, {media_info.width}x{media_info.height} {media_info.video_codec}."
+        )
+    else:
+        # Piped probes can miss the duration (e.g. a moov atom the pipe never reached).
+        media_info = probe_and_store_media_info(project_id, str(target_path))
+    if ingest and ingest.source_hash:
+        update_project(project_id, source_hash=ingest.source_hash)
+    duration_seconds = record.duration_seconds
+    if media_info is not None and media_info.duration_seconds > 0:
+        duration_seconds = media_info.duration_seconds
+
+    estimate = estimate_processing_seconds(duration_seconds)
+    update_project(
+        project_id,
+        status="processing",
+        progress=20,
+        duration_seconds=duration_seconds,
+        processing_started_at=datetime.now(timezone.utc).isoformat(),
+        processing_estimate_seconds=estimate,
+        error_message=None,
+    )
+
+
+def set_source_processor(processor: Callable[[str, str], None]) -> None:
+    global _source_processor
+    _source_processor = processor
+
+
+def process_source(project_id: str, source_path: str) -> None:
+    if _source_processor is None:
+        raise RuntimeError("No processing pipeline is registered")
+    _source_processor(project_id, source_path)
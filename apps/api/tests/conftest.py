@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """A fresh database and upload directory for the test."""
+    monkeypatch.setenv("KINO_DB_PATH", str(tmp_path / "kinopro.db"))
+    monkeypatch.setenv("KINO_STORAGE_DIR", str(tmp_path / "uploads"))
+    return tmp_path / "uploads"
+
+
+@pytest.fixture
+def client(storage):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
@@ -0,0 +1,22 @@
+import io
+import zipfile
+
+from services.archive import stream_zip
+
+
+def test_zip_round_trips_through_zipfile(tmp_path):
+    film_still = tmp_path / "scene_001.webp"
+    film_still.write_bytes(bytes(range(256)) * 300)
+
+    archive = b"".join(stream_zip([("scene_001.webp", film_still), ("notes/é.txt", b"inline bytes")]))
+
+    with zipfile.ZipFile(io.BytesIO(archive)) as opened:
+        assert opened.testzip() is None
+        assert opened.namelist() == ["scene_001.webp", "notes/é.txt"]
+        assert opened.read("scene_001.webp") == film_still.read_bytes()
+        assert opened.read("notes/é.txt") == b"inline bytes"
+
+
+def test_empty_zip_is_valid():
+    with zipfile.ZipFile(io.BytesIO(b"".join(stream_zip([])))) as opened:
+        assert opened.namelist() == []
@@ -0,0 +1,35 @@
+import services.auth
+
+
+def test_login_needs_the_password(client):
+    response = client.post("/v1/auth/login", auth=("demouser", "demouser"))
+    assert response.status_code == 200
+    token = response.json()["token"]
+
+    assert client.get("/metrics", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    # A session token cannot be traded for a fresh one.
+    assert client.post("/v1/auth/login", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+    assert client.post("/v1/auth/login", auth=("demouser", "wrong")).status_code == 401
+
+
+def test_placeholder_and_short_secrets_are_not_used(monkeypatch):
+    for value in ("change_me", "too-short"):
+        monkeypatch.setenv("KINO_SESSION_SECRET", value)
+        assert services.auth._load_session_secret() != value.encode("utf-8")
+    strong = "x" * 32
+    monkeypatch.setenv("KINO_SESSION_SECRET", strong)
+    assert services.auth._load_session_secret() == strong.encode("utf-8")
+
+
+def test_password_change_revokes_session_tokens(client):
+    from services.auth import create_user, update_password
+
+    create_user("editor", "first-password")
+    token = client.post("/v1/auth/login", auth=("editor", "first-password")).json()["token"]
+    bearer = {"Authorization": f"Bearer {token}"}
+    assert client.get("/metrics", headers=bearer).status_code == 200
+
+    update_password("editor", "second-password")
+    assert client.get("/metrics", headers=bearer).status_code == 401
+    fresh = client.post("/v1/auth/login", auth=("editor", "second-password")).json()["token"]
+    assert client.get("/metrics", headers={"Authorization": f"Bearer {fresh}"}).status_code == 200
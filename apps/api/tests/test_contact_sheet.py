@@ -0,0 +1,42 @@
+import re
+
+from services.contact_sheet import COLUMNS, ROWS, SheetEntry, contact_sheet_pdf
+
+
+def _jpeg(width, height):
+    # Start of image, then a baseline start-of-frame with three components.
+    frame = b"\x08" + height.to_bytes(2, "big") + width.to_bytes(2, "big") + b"\x03" + b"\x00" * 9
+    return b"\xff\xd8\xff\xc0" + (len(frame) + 2).to_bytes(2, "big") + frame + b"\xff\xd9"
+
+
+def _xref(pdf):
+    start = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", pdf).group(1))
+    assert pdf[start:].startswith(b"xref\n")
+    header, *lines = pdf[start:].split(b"trailer")[0].splitlines()[1:]
+    first, count = (int(value) for value in header.split())
+    return {first + index: int(line[:10]) for index, line in enumerate(lines) if line.endswith(b"n ")}, count
+
+
+def test_xref_offsets_point_at_their_objects(tmp_path):
+    still = tmp_path / "still.jpg"
+    still.write_bytes(_jpeg(64, 36))
+    entries = [SheetEntry(f"{idx:03d}", "A scene", still if idx % 2 else None) for idx in range(1, COLUMNS * ROWS + 2)]
+
+    pdf = b"".join(contact_sheet_pdf("Film", entries))
+
+    offsets, size = _xref(pdf)
+    assert sorted(offsets) == list(range(1, size))
+    for number, offset in offsets.items():
+        assert pdf[offset:].startswith(f"{number} 0 obj\n".encode())
+    # Nine scenes need a second page.
+    assert b"/Type /Pages /Kids [" in pdf and b"/Count 2 >>" in pdf
+    assert pdf.count(b"/Type /Page ") == 2
+    assert pdf.count(b"/Subtype /Image") == (len(entries) + 1) // 2
+
+
+def test_text_is_escaped_for_pdf_strings():
+    pdf = b"".join(contact_sheet_pdf("Cut (v2) \\ final", [SheetEntry("Café", "Door (slowly) opens \\ rain")]))
+    assert b"(Cut \\(v2\\) \\\\ final) Tj" in pdf
+    assert b"(Caf\xe9) Tj" in pdf
+    assert b"(Door \\(slowly\\) opens \\\\ rain) Tj" in pdf
+    assert b"/Count 1 >>" in pdf
@@ -0,0 +1,26 @@
+import asyncio
+
+from routes.storyboards import stream_events
+from services import events
+
+
+class _Request:
+    async def is_disconnected(self):
+        return False
+
+
+def test_stream_subscribes_only_while_streaming():
+    async def scenario():
+        response = await stream_events("proj_test", _Request(), "demouser")
+        # Dropped before the body was read: nothing was registered.
+        assert "proj_test" not in events._subscribers
+        del response
+
+        response = await stream_events("proj_test", _Request(), "demouser")
+        body = response.body_iterator
+        assert "connected" in await body.__anext__()
+        assert len(events._subscribers["proj_test"]) == 1
+        await body.aclose()
+        assert "proj_test" not in events._subscribers
+
+    asyncio.run(scenario())
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+import threading
+import time
+
+from services.exports import get_export_job, get_export_state, start_export_job
+from services.projects import create_project
+
+AUTH = ("demouser", "demouser")
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_cancel_kills_the_running_encode(client):
+    project = create_project("Film", None, None, 60.0, None)
+    started = threading.Event()
+    processes = []
+
+    def build(job):
+        # Stands in for ffmpeg: runs until the job kills it.
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+        processes.append(process)
+        job.attach(process)
+        started.set()
+        process.wait()
+        job.check()
+        raise RuntimeError("encode ended without being cancelled")
+
+    job = start_export_job(project.id, "video", "c" * 64, build, lambda filename: filename)
+    assert started.wait(10)
+    assert client.get(f"/v1/exports/{job.id}", auth=AUTH).json()["status"] == "running"
+
+    response = client.delete(f"/v1/exports/{job.id}", auth=AUTH)
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelling"
+
+    _wait_for(lambda: get_export_job(job.id) is None)
+    assert processes[0].poll() is not None
+    assert get_export_state(job.id)["status"] == "cancelled"
+    # Nothing is left to cancel.
+    assert client.delete(f"/v1/exports/{job.id}", auth=AUTH).status_code == 409
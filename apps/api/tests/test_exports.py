@@ -0,0 +1,59 @@
+from services.exports import export_filename, find_export, record_export
+from services.projects import create_project, set_storyboards
+from services.storage import get_project_dir
+
+AUTH = ("demouser", "demouser")
+
+
+def _project_with_scenes():
+    project = create_project("Film", None, None, 60.0, None)
+    scenes = [
+        {"scene_number": 1, "start_tc": "00:00:01:00", "end_tc": "00:00:03:00", "description": "Door opens"},
+        {"scene_number": 2, "start_tc": "00:00:05:00", "end_tc": "00:00:08:00", "description": "Rain"},
+    ]
+    set_storyboards(project.id, {"movie_title": "Film", "storyboards": [{"name": "Cut", "scenes": scenes}]})
+    return project.id
+
+
+def test_identical_request_reuses_the_artifact(client):
+    project_id = _project_with_scenes()
+    first = client.post("/v1/exports", json={"project_id": project_id, "format": "edl"}, auth=AUTH)
+    assert first.status_code == 200
+    path = get_project_dir(project_id) / "exports" / first.json()["download_url"].rsplit("/", 1)[-1]
+    built_at = path.stat().st_mtime_ns
+
+    second = client.post("/v1/exports", json={"project_id": project_id, "format": "edl"}, auth=AUTH)
+    assert second.json()["job_id"] == first.json()["job_id"]
+    assert path.stat().st_mtime_ns == built_at
+
+    # Different inputs are a different artifact.
+    frames = [
+        {
+            "scene_number": 1,
+            "start_tc": "00:00:01:00",
+            "end_tc": "00:00:03:00",
+            "duration_seconds": 2.0,
+            "thumbnail_tc": "00:00:02:00",
+            "description": "Door opens",
+            "emotional_beat": "",
+            "music_idea": "",
+        }
+    ]
+    third = client.post("/v1/exports", json={"project_id": project_id, "format": "edl", "frames": frames}, auth=AUTH)
+    assert third.json()["job_id"] != first.json()["job_id"]
+
+
+def test_only_the_newest_artifacts_per_format_are_kept(storage, monkeypatch):
+    monkeypatch.setenv("KINO_EXPORT_KEEP", "2")
+    project = create_project("Film", None, None, 60.0, None)
+    export_dir = get_project_dir(project.id) / "exports"
+    export_dir.mkdir(parents=True, exist_ok=True)
+    keys = [f"{number:x}" * 64 for number in range(1, 4)]
+    for key in keys:
+        filename = export_filename("edl", key)
+        (export_dir / filename).write_text(key)
+        record_export(project.id, "edl", key, filename, len(key))
+
+    assert find_export(project.id, keys[0]) is None
+    assert not (export_dir / export_filename("edl", keys[0])).exists()
+    assert [find_export(project.id, key).filename for key in keys[1:]] == [export_filename("edl", key) for key in keys[1:]]
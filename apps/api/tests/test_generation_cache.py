@@ -0,0 +1,26 @@
+from services.generation_cache import build_generation_key, load_cached_generation, move_legacy_cache, store_generation
+from services.storage import get_private_root, get_storage_root
+
+FINGERPRINT = {"prompt_hash": "p", "schema_version": "1", "model": "gemini", "temperature": 0.2}
+
+
+def test_cached_generation_is_not_under_the_media_root(client):
+    key = build_generation_key("a" * 64, FINGERPRINT)
+    store_generation(key, {"storyboards": []})
+
+    assert not list(get_storage_root().rglob("*.json"))
+    assert (get_private_root() / "generations" / key.source_hash / f"{key.digest}.json").exists()
+    assert client.get(f"/media/_cache/generations/{key.source_hash}/{key.digest}.json").status_code == 404
+    assert load_cached_generation(key) == {"storyboards": []}
+
+
+def test_cache_under_the_storage_root_is_moved_out(storage):
+    key = build_generation_key("b" * 64, FINGERPRINT)
+    legacy = get_storage_root() / "_cache" / "generations" / key.source_hash
+    legacy.mkdir(parents=True)
+    (legacy / f"{key.digest}.json").write_text('{"storyboards": [1]}')
+
+    move_legacy_cache()
+    assert not (get_storage_root() / "_cache").exists()
+    # The row is gone but the moved file restores it.
+    assert load_cached_generation(key) == {"storyboards": [1]}
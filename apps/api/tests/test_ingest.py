@@ -0,0 +1,41 @@
+import hashlib
+import sys
+
+import services.ingest
+from services.ingest import UploadTee, finish_tee, get_tee, open_tee, reap_idle_tees
+
+
+def test_tee_hash_matches_the_file_hash():
+    data = bytes(range(256)) * 1000
+    tee = UploadTee()
+    for position in range(0, len(data), 4096):
+        tee.feed(data[position : position + 4096], position)
+    result = tee.finish(len(data))
+    assert result.source_hash == hashlib.sha256(data).hexdigest()
+
+
+def test_tee_gives_up_on_out_of_order_bytes():
+    tee = UploadTee()
+    tee.feed(b"abc", 0)
+    tee.feed(b"xyz", 10)
+    assert tee.finish(13).source_hash is None
+
+
+def test_idle_tees_are_closed_with_their_probe(monkeypatch):
+    # A probe that never exits on its own, like ffprobe waiting on an abandoned upload.
+    monkeypatch.setattr(
+        services.ingest,
+        "build_probe_command",
+        lambda path: [sys.executable, "-c", "import time; time.sleep(60)"],
+    )
+    monkeypatch.setenv("KINO_INGEST_TEE_IDLE_SECONDS", "60")
+    tee = open_tee("up_idle")
+    probe = tee._probe
+    assert probe.poll() is None
+
+    assert reap_idle_tees(now=tee.last_active + 30) == []
+    assert reap_idle_tees(now=tee.last_active + 61) == ["up_idle"]
+    assert probe.poll() is not None
+    assert get_tee("up_idle") is None
+    # The upload finishes without a tee and falls back to hashing the file.
+    assert finish_tee("up_idle", 0).source_hash is None
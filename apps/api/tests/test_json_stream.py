@@ -0,0 +1,44 @@
+import json
+
+from services.json_stream import WILDCARD, IncrementalJsonParser
+
+DOCUMENT = json.dumps(
+    {
+        "movie_title": "Film \"quoted\" {not a brace}",
+        "storyboards": [
+            {"title": "A", "scenes": [{"scene_number": 1, "description": "a [b] c"}, {"scene_number": 2}]},
+            {"title": "B", "scenes": []},
+        ],
+    }
+)
+
+
+def _feed_in(chunk_size):
+    parser = IncrementalJsonParser(watch=[("storyboards", WILDCARD), ("storyboards", WILDCARD, "scenes", WILDCARD)])
+    emitted = []
+    for start in range(0, len(DOCUMENT), chunk_size):
+        emitted.extend(parser.feed(DOCUMENT[start : start + chunk_size]))
+    return parser, emitted
+
+
+def test_emits_the_same_containers_whatever_the_chunking():
+    expected = json.loads(DOCUMENT)["storyboards"]
+    for chunk_size in (1, 3, 7, len(DOCUMENT)):
+        parser, emitted = _feed_in(chunk_size)
+        assert [path for path, _ in emitted] == [
+            ("storyboards", 0, "scenes", 0),
+            ("storyboards", 0, "scenes", 1),
+            ("storyboards", 0),
+            ("storyboards", 1),
+        ]
+        assert [value for path, value in emitted if len(path) == 2] == expected
+        assert parser.text == DOCUMENT
+        assert parser.depth == 0
+
+
+def test_text_is_available_mid_stream():
+    parser = IncrementalJsonParser(watch=[])
+    parser.feed('{"a": ')
+    assert parser.text == '{"a": '
+    parser.feed("1}")
+    assert parser.text == '{"a": 1}'
@@ -0,0 +1,5 @@
+def test_metrics_requires_auth(client):
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", auth=("demouser", "demouser"))
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
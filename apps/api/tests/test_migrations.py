@@ -0,0 +1,60 @@
+import json
+import sqlite3
+
+from migrations import MIGRATIONS, SCHEMA_VERSION, migrate, schema_version
+from services import storyboard_store
+
+LEGACY_PAYLOAD = {
+    "movie_title": "Film",
+    "storyboards": [
+        {
+            "name": "Teaser",
+            "tone": "tense",
+            "custom": [1, 2],
+            "scenes": [
+                {"scene_number": 1, "start_tc": "00:00:01.00", "duration_seconds": 2.5, "extra": "x"},
+                {"scene_number": "2", "end_tc": None},
+            ],
+        },
+        "not a board",
+    ],
+    "poster_candidates": [],
+}
+
+
+def _database_at(version, tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "legacy.db"))
+    conn.row_factory = sqlite3.Row
+    for number, _, step in MIGRATIONS:
+        if number > version:
+            break
+        step(conn)
+        conn.execute(f"PRAGMA user_version = {number}")
+    conn.commit()
+    return conn
+
+
+def test_storyboard_rows_migration_round_trips_legacy_documents(tmp_path):
+    conn = _database_at(5, tmp_path)
+    conn.execute(
+        """
+        INSERT INTO projects (id, name, status, created_at, updated_at, storyboards_json)
+        VALUES ('proj_1', 'Film', 'ready', 'now', 'now', ?), ('proj_2', 'List', 'ready', 'now', 'now', ?)
+        """,
+        (json.dumps(LEGACY_PAYLOAD), json.dumps([LEGACY_PAYLOAD])),
+    )
+    conn.commit()
+
+    assert migrate(conn) == SCHEMA_VERSION - 5
+    assert schema_version(conn) == SCHEMA_VERSION
+
+    for project_id in ("proj_1", "proj_2"):
+        row = conn.execute(
+            "SELECT storyboards_json, storyboards_count, frames_count FROM projects WHERE id = ?",
+            (project_id,),
+        ).fetchone()
+        header = json.loads(row["storyboards_json"])
+        assert header["storyboards"] is None and header["movie_title"] == "Film"
+        assert (row["storyboards_count"], row["frames_count"]) == (1, 2)
+        boards = storyboard_store.read_boards(conn, project_id)
+        assert boards == [LEGACY_PAYLOAD["storyboards"][0]]
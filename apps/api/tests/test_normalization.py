@@ -0,0 +1,55 @@
+import copy
+
+import pytest
+
+from services import normalization
+from services.normalization import normalize_payload_timecodes, normalize_scene, normalize_timestamps
+
+
+def _payload(*scenes):
+    return {"storyboards": [{"scenes": [dict(scene) for scene in scenes]}]}
+
+
+def _scalar(payload, duration_seconds, fps):
+    expected = copy.deepcopy(payload)
+    repaired = sum(
+        1 for scene in expected["storyboards"][0]["scenes"] if normalize_scene(scene, duration_seconds, fps)
+    )
+    return expected, repaired
+
+
+@pytest.mark.parametrize("duration_seconds", [120.0, 0.0])
+def test_huge_timecode_matches_scalar_path(duration_seconds):
+    payload = _payload(
+        {"start_tc": "99999999999999999999:00:00.00", "end_tc": "00:00:05.00"},
+        {"start_tc": "00:00:01.00", "end_tc": "00:00:03.00", "thumbnail_tc": "00:00:02.00"},
+    )
+    expected, expected_repaired = _scalar(payload, duration_seconds, 24)
+
+    result, repaired = normalize_payload_timecodes(payload, duration_seconds, 24)
+
+    assert result == expected
+    assert repaired == expected_repaired
+
+
+def test_huge_timestamp_batch_matches_scalar_path():
+    values = ["99999999999999999999:00:00.00", "00:00:04.12", None]
+    expected = [
+        str(normalization.normalized_timestamp(value, duration_seconds=120.0, fps=24)) for value in values
+    ]
+    assert normalize_timestamps(values, 120.0, 24) == expected
+
+
+def test_columnar_path_matches_scalar_path():
+    payload = _payload(
+        {"start_tc": "00:01:30.00", "end_tc": "00:01:20.00"},
+        {"start_tc": "01:30:12", "end_tc": "01:45:00", "thumbnail_tc": "00:00:00.00"},
+        {"start_tc": "", "end_tc": "junk"},
+        {"start_tc": "00:00:10.05", "end_tc": "00:00:12.20", "thumbnail_tc": "00:00:11.00"},
+    )
+    expected, expected_repaired = _scalar(payload, 120.0, 24)
+
+    result, repaired = normalize_payload_timecodes(payload, 120.0, 24)
+
+    assert result == expected
+    assert repaired == expected_repaired
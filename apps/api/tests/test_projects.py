@@ -0,0 +1,65 @@
+from services.projects import create_project
+
+
+def test_project_list_is_paged(client):
+    created = {create_project(f"Film {number}", None, None, 60.0, None).id for number in range(3)}
+    auth = ("demouser", "demouser")
+
+    first = client.get("/v1/projects", params={"limit": 2}, auth=auth)
+    assert first.status_code == 200
+    assert len(first.json()) == 2
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/v1/projects", params={"limit": 2, "cursor": cursor}, auth=auth)
+    assert "X-Next-Cursor" not in second.headers
+    assert {project["id"] for project in first.json() + second.json()} == created
+
+
+def test_project_list_defaults_to_one_page(client):
+    from routes.storyboards import PROJECT_PAGE_SIZE
+
+    for number in range(PROJECT_PAGE_SIZE + 1):
+        create_project(f"Film {number}", None, None, 60.0, None)
+    response = client.get("/v1/projects", auth=("demouser", "demouser"))
+    assert len(response.json()) == PROJECT_PAGE_SIZE
+    assert response.headers["X-Next-Cursor"]
+
+
+def _board(name):
+    scene = {
+        "scene_number": 1,
+        "start_tc": "00:00:01:00",
+        "end_tc": "00:00:02:00",
+        "duration_seconds": 1.0,
+        "thumbnail_tc": "00:00:01:12",
+        "description": "Door opens",
+        "emotional_beat": "dread",
+        "music_idea": "drone",
+    }
+    return {"name": name, "target_length": "30s", "tone": "tense", "description": "", "scenes": [scene]}
+
+
+def test_storyboards_of_a_page_are_read_together(client):
+    from db import get_connection
+    from services.projects import get_projects_with_storyboards, set_storyboards
+
+    ids = []
+    for number in range(3):
+        project = create_project(f"Film {number}", None, None, 60.0, None)
+        if number != 1:
+            set_storyboards(project.id, {"movie_title": f"Film {number}", "storyboards": [_board(f"Cut {number}")]})
+        ids.append(project.id)
+
+    statements = []
+    get_connection().set_trace_callback(statements.append)
+    try:
+        page = get_projects_with_storyboards(list(reversed(ids)))
+    finally:
+        get_connection().set_trace_callback(None)
+    assert len([statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]) == 2
+    assert [record.id for record, _ in page] == list(reversed(ids))
+    assert [payload and payload["storyboards"][0]["name"] for _, payload in page] == ["Cut 2", None, "Cut 0"]
+
+    response = client.get("/v1/projects", params={"include_storyboards": True}, auth=("demouser", "demouser"))
+    names = {project["id"]: [board["name"] for board in project["storyboards"] or []] for project in response.json()}
+    assert names == {ids[0]: ["Cut 0"], ids[1]: [], ids[2]: ["Cut 2"]}
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+import routes.storyboards
+from services.projects import create_project, get_storyboard, set_storyboards, update_project
+from services.storage import get_project_dir
+
+AUTH = ("demouser", "demouser")
+
+
+class _FakeRenderQueue:
+    def __init__(self, project_id, input_path, **_):
+        self.clips_root = get_project_dir(project_id) / "clips"
+        self.thumbs_root = get_project_dir(project_id) / "thumbs"
+        self.scenes = []
+
+    def submit(self, board_idx, scene_idx, scene):
+        self.scenes.append(scene)
+
+    def drain(self, board_scene_counts, progress_callback=None):
+        for done, scene in enumerate(self.scenes, start=1):
+            scene["clip_url"] = f"/media/clip_{done}.mp4"
+            progress_callback(done, len(self.scenes))
+
+
+@pytest.fixture
+def ready_project(storage):
+    project = create_project("Film", None, "film.mp4", 60.0, None)
+    (get_project_dir(project.id) / "film.mp4").write_bytes(b"film")
+    scene = {"scene_number": 1, "start_tc": "00:00:01:00", "end_tc": "00:00:02:00"}
+    boards = [{"name": "One", "scenes": [scene]}, {"name": "Two", "scenes": [scene]}]
+    set_storyboards(project.id, {"movie_title": "Film", "storyboards": boards})
+    update_project(project.id, status="ready")
+    return project.id
+
+
+def _wait_for_state(client, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        state = client.get(f"/v1/regenerations/{job_id}", auth=AUTH).json()
+        if state["status"] in {"ready", "failed"}:
+            return state
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_regenerate_runs_as_a_job(client, ready_project, monkeypatch):
+    seen = {}
+
+    def regenerate(shot_log, boards, index, direction=None):
+        seen["boards"] = boards
+        return {"name": "Two, darker", "scenes": [{"start_tc": "00:00:03:00", "end_tc": "00:00:05:00"}]}
+
+    monkeypatch.setattr(routes.storyboards, "_project_shot_log", lambda record, path, duration: {"shots": []})
+    monkeypatch.setattr(routes.storyboards, "regenerate_storyboard_from_shot_log", regenerate)
+    monkeypatch.setattr(routes.storyboards, "_SceneRenderQueue", _FakeRenderQueue)
+
+    response = client.post(
+        f"/v1/projects/{ready_project}/storyboards/2/regenerate", json={"direction": "darker"}, auth=AUTH
+    )
+    assert response.status_code == 202
+    state = _wait_for_state(client, response.json()["job_id"])
+    assert state["status"] == "ready" and state["progress"] == 100
+
+    # Only the regenerated board's scenes were read.
+    assert "scenes" not in seen["boards"][0]
+    assert seen["boards"][1]["scenes"]
+    board = get_storyboard(ready_project, 2)
+    assert board["name"] == "Two, darker"
+    assert board["scenes"][0]["clip_url"] == "/media/clip_1.mp4"
+
+
+def test_failed_regeneration_is_reported(client, ready_project, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("Gemini returned no storyboard")
+
+    monkeypatch.setattr(routes.storyboards, "_project_shot_log", fail)
+    response = client.post(f"/v1/projects/{ready_project}/storyboards/1/regenerate", auth=AUTH)
+    assert response.status_code == 202
+    state = _wait_for_state(client, response.json()["job_id"])
+    assert state["status"] == "failed"
+    assert state["error"] == "Gemini returned no storyboard"
+    assert get_storyboard(ready_project, 1)["name"] == "One"
+
+
+def test_unknown_board_is_rejected_up_front(client, ready_project):
+    assert client.post(f"/v1/projects/{ready_project}/storyboards/3/regenerate", auth=AUTH).status_code == 404
@@ -0,0 +1,86 @@
+import json
+
+from services.salvage import repair_truncated_json, salvage_storyboard_payload
+
+
+def _scene(number):
+    return {"scene_number": number, "start_tc": f"00:00:0{number}.00", "end_tc": f"00:00:0{number + 1}.00"}
+
+
+def _validate_scene(value):
+    if not isinstance(value, dict) or not {"scene_number", "start_tc", "end_tc"} <= value.keys():
+        raise ValueError("incomplete scene")
+    return dict(value)
+
+
+def _validate_board(value):
+    if not value.get("title"):
+        raise ValueError("untitled board")
+    return dict(value)
+
+
+def _salvage(text):
+    return salvage_storyboard_payload(text, _validate_scene, _validate_board, dict)
+
+
+def _document(boards):
+    return json.dumps({"movie_title": "Film", "duration": "00:02:00", "storyboards": boards})
+
+
+def test_truncated_board_keeps_its_complete_scenes():
+    text = _document([{"title": "Only", "scenes": [_scene(1), _scene(2), _scene(3)]}])
+    # Cut in the middle of the third scene's end_tc.
+    cut = text[: text.index('"end_tc": "00:00:04.00"') + 12]
+
+    payload, report = _salvage(cut)
+
+    assert report.truncated
+    assert [board["title"] for board in payload["storyboards"]] == ["Only"]
+    assert [scene["scene_number"] for scene in payload["storyboards"][0]["scenes"]] == [1, 2]
+    assert report.scenes_dropped == 1
+    assert payload["movie_title"] == "Film"
+
+
+def test_half_written_trailing_scene_is_dropped_even_if_it_would_validate():
+    text = _document([{"title": "A", "scenes": [_scene(1), {**_scene(2), "description": "cut here"}]}])
+    # The second scene has all required fields but was never closed.
+    cut = text[: text.index('"description": "cut here"') - 2]
+
+    payload, report = _salvage(cut)
+
+    assert [scene["scene_number"] for scene in payload["storyboards"][0]["scenes"]] == [1]
+    assert report.scenes_dropped == 1
+
+
+def test_closed_boards_survive_alongside_a_truncated_one():
+    text = _document(
+        [
+            {"title": "A", "scenes": [_scene(1)]},
+            {"title": "B", "scenes": [_scene(1), _scene(2)]},
+        ]
+    )
+    cut = text[: text.index('"scene_number": 2') + 5]
+
+    payload, report = _salvage(cut)
+
+    assert [board["title"] for board in payload["storyboards"]] == ["A", "B"]
+    assert [len(board["scenes"]) for board in payload["storyboards"]] == [1, 1]
+    assert report.boards_found == 2
+
+
+def test_unrepairable_document_falls_back_to_closed_boards():
+    board = json.dumps({"title": "A", "scenes": [_scene(1)]})
+    # A stray closing brace inside the array makes the repaired text invalid JSON.
+    text = '{"storyboards": [' + board + ', }, {"title": "B", "scenes": ['
+
+    payload, report = _salvage(text)
+
+    assert [board["title"] for board in payload["storyboards"]] == ["A"]
+    assert "top-level fields unrecoverable" in report.notes
+
+
+def test_repair_cuts_back_to_last_complete_element():
+    repaired, truncated = repair_truncated_json('{"a": [1, 2, {"b": "x')
+    assert truncated
+    # The half-written object is emptied, not removed; salvage drops it as unclosed.
+    assert json.loads(repaired) == {"a": [1, 2, {}]}
@@ -0,0 +1,49 @@
+import hashlib
+import os
+
+from services.projects import create_project
+from services.sources import adopt_source, move_legacy_store
+from services.storage import get_private_root, get_project_dir, get_storage_root
+
+AUTH = ("demouser", "demouser")
+
+
+def _upload(data):
+    project = create_project("Film", None, "film.mp4", 60.0, None)
+    path = get_project_dir(project.id) / "film.mp4"
+    path.write_bytes(data)
+    return project.id, path
+
+
+def test_shared_source_outlives_all_but_the_last_project(client):
+    data = b"the same film" * 1000
+    source_hash = hashlib.sha256(data).hexdigest()
+    first_id, first_path = _upload(data)
+    second_id, second_path = _upload(data)
+
+    assert adopt_source(first_id, first_path, source_hash) is None
+    assert adopt_source(second_id, second_path, source_hash) == first_id
+    store_dir = get_private_root() / "sources" / source_hash
+    stored = store_dir / "source.mp4"
+    assert os.path.samefile(stored, first_path) and os.path.samefile(stored, second_path)
+
+    # The path follows from the film's contents, so it must not be served.
+    assert client.get(f"/media/_sources/{source_hash}/source.mp4").status_code == 404
+    assert not stored.resolve().is_relative_to(get_storage_root().resolve())
+
+    assert client.delete(f"/v1/projects/{first_id}", auth=AUTH).status_code == 200
+    assert stored.read_bytes() == data
+    assert second_path.read_bytes() == data
+
+    assert client.delete(f"/v1/projects/{second_id}", auth=AUTH).status_code == 200
+    assert not store_dir.exists()
+
+
+def test_store_under_the_storage_root_is_moved_out(storage):
+    legacy = get_storage_root() / "_sources" / "abc"
+    legacy.mkdir(parents=True)
+    (legacy / "source.mp4").write_bytes(b"film")
+
+    move_legacy_store()
+    assert not (get_storage_root() / "_sources").exists()
+    assert (get_private_root() / "sources" / "abc" / "source.mp4").read_bytes() == b"film"
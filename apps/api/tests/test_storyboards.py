@@ -0,0 +1,33 @@
+from services.projects import (
+    create_project,
+    get_storyboard,
+    list_storyboard_headers,
+    replace_storyboard,
+    set_storyboards,
+)
+
+
+def _board(name, scenes):
+    return {
+        "name": name,
+        "tone": "tense",
+        "scenes": [{"scene_number": number, "start_tc": "00:00:01:00", "end_tc": "00:00:02:00"} for number in scenes],
+    }
+
+
+def test_headers_and_single_board_reads(storage):
+    project = create_project("Film", None, None, 60.0, None)
+    set_storyboards(project.id, {"movie_title": "Film", "storyboards": [_board("One", [1, 2]), _board("Two", [1])]})
+
+    headers = list_storyboard_headers(project.id)
+    assert [header["name"] for header in headers] == ["One", "Two"]
+    assert all("scenes" not in header for header in headers)
+
+    second = get_storyboard(project.id, 2)
+    assert second["name"] == "Two"
+    assert [scene["scene_number"] for scene in second["scenes"]] == [1]
+    assert get_storyboard(project.id, 3) is None
+
+    replace_storyboard(project.id, 2, _board("Two again", [1, 2, 3]))
+    assert get_storyboard(project.id, 2)["name"] == "Two again"
+    assert get_storyboard(project.id, 1)["name"] == "One"
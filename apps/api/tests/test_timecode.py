@@ -0,0 +1,25 @@
+import pytest
+
+from services.timecode import Timecode
+
+
+def test_equal_timecodes_hash_alike_across_rates():
+    assert Timecode(24, 24) == Timecode(48, 48)
+    assert hash(Timecode(24, 24)) == hash(Timecode(48, 48))
+    assert hash(Timecode(0, 24)) == hash(Timecode(0, 30))
+    assert len({Timecode(12, 24), Timecode(15, 30), Timecode(13, 24)}) == 2
+
+
+def test_ordering_against_other_types_is_not_implemented():
+    assert Timecode(1, 24).__lt__(1) is NotImplemented
+    with pytest.raises(TypeError):
+        Timecode(1, 24) < 1
+    with pytest.raises(TypeError):
+        Timecode(1, 24) >= "00:00:01.00"
+    assert Timecode(1, 24) != 1
+
+
+def test_ordering_across_rates():
+    assert Timecode(12, 24) < Timecode(16, 30)
+    assert Timecode(16, 30) > Timecode(12, 24)
+    assert max(Timecode(10, 24), Timecode(9, 24)) == Timecode(10, 24)
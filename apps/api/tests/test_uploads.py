@@ -0,0 +1,84 @@
+import pytest
+
+import services.uploads
+from services.projects import create_project, get_project
+
+AUTH = ("demouser", "demouser")
+
+
+@pytest.fixture
+def processed(monkeypatch):
+    """The sources handed to the pipeline, instead of running it."""
+    calls = []
+    monkeypatch.setattr(services.uploads, "_source_processor", lambda project_id, path: calls.append((project_id, path)))
+    return calls
+
+
+def _open(client, size, filename="film.mp4"):
+    project = create_project("Film", None, None, 0.0, None)
+    response = client.post(f"/v1/projects/{project.id}/uploads", json={"filename": filename, "size": size}, auth=AUTH)
+    assert response.status_code == 201
+    return project.id, response.json()["upload_id"]
+
+
+def _put(client, project_id, upload_id, start, data, total):
+    return client.put(
+        f"/v1/projects/{project_id}/uploads/{upload_id}",
+        content=data,
+        headers={"Content-Range": f"bytes {start}-{start + len(data) - 1}/{total}"},
+        auth=AUTH,
+    )
+
+
+def test_chunks_resume_from_the_recorded_offset(client, storage, processed):
+    data = bytes(range(256)) * 40
+    project_id, upload_id = _open(client, len(data))
+
+    first = _put(client, project_id, upload_id, 0, data[:4000], len(data))
+    assert first.status_code == 200
+    assert first.headers["Upload-Offset"] == "4000"
+
+    # After a dropped connection the client asks where to continue.
+    state = client.get(f"/v1/projects/{project_id}/uploads/{upload_id}", auth=AUTH)
+    assert state.json()["offset"] == 4000
+
+    last = _put(client, project_id, upload_id, 4000, data[4000:], len(data))
+    assert last.json()["status"] == "processing"
+    assert (storage / project_id / "film.mp4").read_bytes() == data
+    assert processed == [(project_id, str(storage / project_id / "film.mp4"))]
+    assert get_project(project_id, include_storyboards=False).status == "processing"
+
+
+def test_malformed_content_range_is_rejected(client, processed):
+    project_id, upload_id = _open(client, 100)
+    response = client.put(
+        f"/v1/projects/{project_id}/uploads/{upload_id}",
+        content=b"x" * 10,
+        headers={"Content-Range": "bytes 0-9"},
+        auth=AUTH,
+    )
+    assert response.status_code == 400
+    assert _put(client, project_id, upload_id, 0, b"x" * 10, 99).status_code == 416
+
+
+def test_out_of_order_chunk_conflicts(client, processed):
+    project_id, upload_id = _open(client, 100)
+    response = _put(client, project_id, upload_id, 50, b"x" * 10, 100)
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == "0"
+
+
+def test_chunk_larger_than_the_chunk_size(client, processed, monkeypatch):
+    monkeypatch.setenv("KINO_UPLOAD_CHUNK_MB", "1")
+    size = 2 * 1024 * 1024
+    project_id, upload_id = _open(client, size)
+    response = _put(client, project_id, upload_id, 0, b"x" * (1024 * 1024 + 1), size)
+    assert response.status_code == 413
+
+
+def test_offset_moved_by_another_writer_conflicts(client, processed, monkeypatch):
+    project_id, upload_id = _open(client, 100)
+    monkeypatch.setattr("routes.uploads.record_received", lambda upload_id, expected, received: False)
+    response = _put(client, project_id, upload_id, 0, b"x" * 10, 100)
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == "0"
@@ -101,8 +101,13 @@ export default function App() {
   };
 
   const handleLogin = async (username: string, password: string) => {
-    await loginUser(username, password);
-    const authState = { username, password };
+    const session = await loginUser(username, password);
+    const authState: AuthState = {
+      username,
+      password,
+      token: session.token,
+      tokenExpiresAt: session.expires_at,
+    };
     saveAuth(authState);
     setAuth(authState);
     setCurrentPage('dashboard');
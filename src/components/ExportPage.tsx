@@ -78,7 +78,9 @@ export function ExportPage({ project, onBack }: ExportPageProps) {
     setExportMessage(null);
 
     try {
-      const response = await requestExport(project.id, selectedFormat, project.selectedFrames);
+      const response = await requestExport(project.id, selectedFormat, project.selectedFrames, (progress) => {
+        setExportMessage(`Exporting ${selectedFormat.toUpperCase()}… ${progress}%`);
+      });
       setExportMessage(`Export ready: ${selectedFormat.toUpperCase()}`);
       if (response?.download_url) {
         await triggerDownload(response.download_url as string);
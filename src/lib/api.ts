@@ -170,6 +170,9 @@ function toProject(api: ApiProject, previous?: Project): Project {
 }
 
 function getAuthHeader(auth: AuthState | null): string | undefined {
+  if (auth?.token && auth.tokenExpiresAt && auth.tokenExpiresAt * 1000 > Date.now() + 60_000) {
+    return `Bearer ${auth.token}`;
+  }
   if (!auth?.username || !auth.password) {
     return undefined;
   }
@@ -197,7 +200,7 @@ export function clearAuth() {
   localStorage.removeItem(AUTH_KEY);
 }
 
-async function apiRequest<T>(path: string, options: RequestInit = {}): Promise<T> {
+async function apiResponse(path: string, options: RequestInit = {}): Promise<Response> {
   const auth = loadAuth();
   const headers = new Headers(options.headers);
   headers.set('Content-Type', headers.get('Content-Type') || 'application/json');
@@ -216,6 +219,11 @@ async function apiRequest<T>(path: string, options: RequestInit = {}): Promise<T
     throw new Error(detail || `Request failed (${response.status})`);
   }
 
+  return response;
+}
+
+async function apiRequest<T>(path: string, options: RequestInit = {}): Promise<T> {
+  const response = await apiResponse(path, options);
   return (await response.json()) as T;
 }
 
@@ -226,7 +234,10 @@ export async function registerUser(username: string, password: string) {
   });
 }
 
-export async function loginUser(username: string, password: string) {
+export async function loginUser(
+  username: string,
+  password: string,
+): Promise<{ username: string; status: string; token?: string; expires_at?: number }> {
   const token = btoa(`${username}:${password}`);
   const response = await fetch(`${API_BASE}/v1/auth/login`, {
     method: 'POST',
@@ -242,9 +253,22 @@ export async function loginUser(username: string, password: string) {
   return response.json();
 }
 
+const PROJECT_PAGE_SIZE = 50;
+
 export async function listProjects(): Promise<Project[]> {
-  const apiProjects = await apiRequest<ApiProject[]>('/v1/projects');
-  return apiProjects.map((project) => toProject(project));
+  const projects: Project[] = [];
+  let cursor: string | null = null;
+  do {
+    const params = new URLSearchParams({ limit: String(PROJECT_PAGE_SIZE) });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    const response = await apiResponse(`/v1/projects?${params}`);
+    const apiProjects = (await response.json()) as ApiProject[];
+    projects.push(...apiProjects.map((project) => toProject(project)));
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return projects;
 }
 
 export async function getProject(projectId: string, previous?: Project): Promise<Project> {
@@ -373,34 +397,40 @@ export async function createProject(payload: {
   return toProject(apiProject);
 }
 
-export function uploadProjectFile(
-  projectId: string,
-  file: File,
-  onProgress?: (progress: number) => void,
-): Promise<void> {
-  const auth = loadAuth();
-  const authHeader = getAuthHeader(auth);
+interface ApiUploadSession {
+  upload_id: string;
+  size: number;
+  offset: number;
+  chunk_size: number;
+  status: string;
+}
 
-  return new Promise((resolve, reject) => {
-    const formData = new FormData();
-    formData.append('file', file);
+const UPLOAD_MAX_RETRIES = 5;
 
+function sendUploadChunk(
+  url: string,
+  authHeader: string | undefined,
+  chunk: Blob,
+  start: number,
+  total: number,
+  onChunkProgress: (loaded: number) => void,
+): Promise<ApiUploadSession> {
+  return new Promise((resolve, reject) => {
     const xhr = new XMLHttpRequest();
-    xhr.open('POST', `${API_BASE}/v1/projects/${projectId}/upload`);
+    xhr.open('PUT', url);
     if (authHeader) {
       xhr.setRequestHeader('Authorization', authHeader);
     }
+    xhr.setRequestHeader('Content-Type', 'application/octet-stream');
+    xhr.setRequestHeader('Content-Range', `bytes ${start}-${start + chunk.size - 1}/${total}`);
 
     xhr.upload.onprogress = (event) => {
-      if (event.lengthComputable && onProgress) {
-        const percent = Math.round((event.loaded / event.total) * 100);
-        onProgress(percent);
-      }
+      onChunkProgress(event.loaded);
     };
 
     xhr.onload = () => {
       if (xhr.status >= 200 && xhr.status < 300) {
-        resolve();
+        resolve(JSON.parse(xhr.responseText) as ApiUploadSession);
       } else {
         reject(new Error(xhr.responseText || 'Upload failed'));
       }
@@ -410,12 +440,76 @@ export function uploadProjectFile(
       reject(new Error('Upload failed'));
     };
 
-    xhr.send(formData);
+    xhr.send(chunk);
+  });
+}
+
+export async function uploadProjectFile(
+  projectId: string,
+  file: File,
+  onProgress?: (progress: number) => void,
+): Promise<void> {
+  const session = await apiRequest<ApiUploadSession>(`/v1/projects/${projectId}/uploads`, {
+    method: 'POST',
+    body: JSON.stringify({ filename: file.name, size: file.size }),
   });
+  const url = `${API_BASE}/v1/projects/${projectId}/uploads/${session.upload_id}`;
+  const report = (sent: number) => onProgress?.(Math.round((sent / file.size) * 100));
+
+  let offset = session.offset;
+  let failures = 0;
+  while (offset < file.size) {
+    const chunk = file.slice(offset, offset + session.chunk_size);
+    try {
+      const start = offset;
+      const result = await sendUploadChunk(
+        url,
+        getAuthHeader(loadAuth()),
+        chunk,
+        start,
+        file.size,
+        (loaded) => report(start + loaded),
+      );
+      offset = result.offset;
+      failures = 0;
+      if (result.status === 'processing') {
+        break;
+      }
+    } catch (error) {
+      failures += 1;
+      if (failures > UPLOAD_MAX_RETRIES) {
+        throw error;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** (failures - 1)));
+      // Resume from whatever the server kept of the failed chunk.
+      const current = await apiRequest<ApiUploadSession>(
+        `/v1/projects/${projectId}/uploads/${session.upload_id}`,
+      ).catch(() => null);
+      if (current) {
+        offset = current.offset;
+      }
+    }
+  }
+  report(file.size);
 }
 
-export async function requestExport(projectId: string, format: string, frames: StoryboardFrame[]) {
-  const response = await apiRequest<{ download_url?: string }>('/v1/exports', {
+interface ApiExportJob {
+  job_id?: string;
+  status: string;
+  progress?: number;
+  error?: string;
+  download_url?: string;
+}
+
+const EXPORT_POLL_MS = 1000;
+
+export async function requestExport(
+  projectId: string,
+  format: string,
+  frames: StoryboardFrame[],
+  onProgress?: (progress: number) => void,
+) {
+  let response = await apiRequest<ApiExportJob>('/v1/exports', {
     method: 'POST',
     body: JSON.stringify({
       project_id: projectId,
@@ -432,6 +526,15 @@ export async function requestExport(projectId: string, format: string, frames: S
       })),
     }),
   });
+  // Video and image exports are built in the background; wait for the job.
+  while (response.job_id && (response.status === 'queued' || response.status === 'running')) {
+    onProgress?.(response.progress ?? 0);
+    await new Promise((resolve) => setTimeout(resolve, EXPORT_POLL_MS));
+    response = await apiRequest<ApiExportJob>(`/v1/exports/${response.job_id}`);
+  }
+  if (response.status !== 'ready') {
+    throw new Error(response.error || `Export ${response.status}`);
+  }
   if (response.download_url) {
     response.download_url = resolveMediaUrl(response.download_url);
   }
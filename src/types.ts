@@ -69,4 +69,6 @@ export interface Project {
 export interface AuthState {
   username: string;
   password: string;
+  token?: string;
+  tokenExpiresAt?: number;
 }